@@ -0,0 +1,6 @@
+"""
+Benchmarks for rice_price_collector.
+
+Run from the repository root, e.g.:
+    python -m benchmarks.bench_tokenizer
+"""
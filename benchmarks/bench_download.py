@@ -0,0 +1,64 @@
+"""
+bench_download.py
+
+Download throughput against the local fake CBSL server (no network needed).
+
+Usage:
+    python -m benchmarks.bench_download [--years 2024 2025] [--reports 60]
+        [--latency 0.05] [--error-rate 0.0] [--max-rate 20] [--pdf-size 65536]
+
+Reports PDFs/s and MB/s for a cold download into a temporary folder, plus
+the server's request counters (statuses, peak concurrent requests).
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from rice_price_collector.downloader import download_pdfs_to
+from rice_price_collector.downloader.fake_server import FakeCBSLServer
+from rice_price_collector.downloader.transport import AiohttpTransport
+
+
+async def run(args, outputdir):
+    server = FakeCBSLServer(
+        reports_per_year=args.reports, pdf_size=args.pdf_size, latency=args.latency,
+        error_rate=args.error_rate, max_rate=args.max_rate,
+    )
+    async with server:
+        async with AiohttpTransport(server.base_url) as transport:
+            start = time.perf_counter()
+            await download_pdfs_to(args.years, outputdir, transport=transport)
+            elapsed = time.perf_counter() - start
+    return server.stats, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--years", nargs="+", default=["2024", "2025"])
+    parser.add_argument("--reports", type=int, default=60, help="reports per year")
+    parser.add_argument("--pdf-size", type=int, default=64 * 1024)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-rate", type=float, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as outputdir:
+        stats, elapsed = asyncio.run(run(args, outputdir))
+        saved = sum(
+            name.endswith(".pdf")
+            for year in os.listdir(outputdir)
+            for name in os.listdir(os.path.join(outputdir, year))
+        )
+
+    expected = args.reports * len(args.years)
+    print(f"\nDownloaded {saved}/{expected} PDFs in {elapsed:.2f}s")
+    print(f"{saved / elapsed:8.1f} PDFs/s")
+    print(f"{stats['bytes'] / elapsed / 1e6:8.2f} MB/s")
+    print("Server:", dict(sorted(stats.items())))
+
+
+if __name__ == "__main__":
+    main()
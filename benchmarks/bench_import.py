@@ -0,0 +1,79 @@
+"""
+bench_import.py
+
+Cold-start cost of importing the package and its entry points.
+
+Usage:
+    python -m benchmarks.bench_import [--repeat 5] [--max-ms 50]
+
+Each target is imported in a fresh interpreter (so nothing is cached in
+sys.modules), --repeat times; the best time is reported along with the
+heavy dependencies the import pulled in. With --max-ms, the exit status
+is 1 when importing the top-level package takes longer than that, so CI
+can keep start-up of short-lived jobs and worker processes fast.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+# What a CLI invocation or a worker typically imports first
+TARGETS = [
+    "rice_price_collector",
+    "rice_price_collector.metrics",
+    "rice_price_collector.downloader",
+    "rice_price_collector.parser",
+    "rice_price_collector.downloader.pdf_downloader",
+    "rice_price_collector.parser.batch_extract",
+]
+
+# Dependencies worth knowing about when they are loaded
+HEAVY_MODULES = ["pandas", "numpy", "pdfplumber", "pdfminer", "aiohttp", "bs4", "pyarrow"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {target}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def time_import(target, repeat):
+    """Best-of-repeat import time of target in a fresh interpreter, and the heavy modules it loaded."""
+    best, loaded = None, []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(target=target, heavy=HEAVY_MODULES)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(out)
+        if best is None or result["seconds"] < best:
+            best, loaded = result["seconds"], result["loaded"]
+    return best, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="fail when importing rice_price_collector takes longer")
+    args = parser.parse_args()
+
+    results = {}
+    for target in TARGETS:
+        seconds, loaded = time_import(target, args.repeat)
+        results[target] = seconds
+        print(f"{target:50s} {seconds * 1000:8.1f} ms   {', '.join(loaded) or '-'}")
+
+    top_level_ms = results["rice_price_collector"] * 1000
+    if args.max_ms is not None and top_level_ms > args.max_ms:
+        print(f"\nImporting rice_price_collector took {top_level_ms:.1f} ms "
+              f"(budget {args.max_ms:.0f} ms)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+bench_pipeline.py
+
+Benchmark of the extract → parse pipeline on a generated corpus of
+CBSL-style report PDFs (see pdf_corpus.py).
+
+Usage:
+    python -m benchmarks.bench_pipeline [--reports 100] [--years 2023 2024]
+        [--workers 4] [--save-baseline] [--tolerance 0.25]
+
+Measures:
+    - each stage on its own, summed over the corpus: extract_section_between,
+      parse_price_section, create_smart_column_names, DataFrame concat, CSV write
+    - end-to-end process_year_folders_dict (serial, and with --workers if > 1)
+    - throughput (PDFs/s, rows/s) and peak RSS (this process and its workers)
+
+Results are compared with benchmarks/baselines.json (same corpus settings only);
+any time more than --tolerance slower, or throughput that much lower, is reported
+as a regression and the exit status is 1. --save-baseline stores this run instead.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+from pathlib import Path
+import platform
+import resource
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from rice_price_collector.parser import (
+    create_smart_column_names,
+    extract_section_between,
+    parse_price_section,
+    process_year_folders_dict,
+)
+
+from .pdf_corpus import make_pdf_corpus
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+# Metrics where bigger is better; everything else is a time or a size
+HIGHER_IS_BETTER = ("pdfs_per_s", "rows_per_s")
+
+# Stages faster than this are too short to compare reliably
+MIN_COMPARABLE_SECONDS = 0.05
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process and of its (finished) children, in MB."""
+    scale = 1 if sys.platform == "darwin" else 1024  # bytes on macOS, KB on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return round(max(own, children) / 1e6, 1)
+
+
+def time_stages(pdf_files, output_dir):
+    """Run each pipeline stage over the corpus on its own and time it."""
+    timings = dict.fromkeys(
+        ["extract_section_between", "parse_price_section", "create_smart_column_names",
+         "concat", "csv_write"], 0.0,
+    )
+
+    frames = []
+    for pdf_path in pdf_files:
+        start = time.perf_counter()
+        lines = extract_section_between(str(pdf_path), "RICE", "FISH", 2)
+        timings["extract_section_between"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        df = parse_price_section(lines)
+        timings["parse_price_section"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        columns = create_smart_column_names(lines)
+        timings["create_smart_column_names"] += time.perf_counter() - start
+
+        df.columns = columns[:len(df.columns)]
+        df.insert(0, "date", pdf_path.stem)
+        frames.append(df)
+
+    start = time.perf_counter()
+    combined = pd.concat(frames, ignore_index=True)
+    timings["concat"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    combined.to_csv(Path(output_dir) / "stages.csv", index=False)
+    timings["csv_write"] = time.perf_counter() - start
+
+    return {f"{stage}_s": round(seconds, 4) for stage, seconds in timings.items()}, len(combined)
+
+
+def time_end_to_end(folders, workers, output_dir):
+    """Time process_year_folders_dict (its progress output is silenced)."""
+    cwd = os.getcwd()
+    os.chdir(output_dir)  # yearly CSVs are written to the working directory
+    try:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            df = process_year_folders_dict(folders, workers=workers)
+        elapsed = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+    return elapsed, 0 if df is None else len(df)
+
+
+def compare(metrics, baseline, tolerance):
+    """Return a list of (metric, baseline, current) that regressed by more than tolerance."""
+    regressions = []
+    for name, old in baseline.items():
+        new = metrics.get(name)
+        if new is None or not old or name == "rows":
+            continue
+        if name.endswith("_s") and max(old, new) < MIN_COMPARABLE_SECONDS:
+            continue
+        if name.endswith(HIGHER_IS_BETTER):
+            worse = new < old * (1 - tolerance)
+        else:
+            worse = new > old * (1 + tolerance)
+        if worse:
+            regressions.append((name, old, new))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--reports", type=int, default=100, help="reports per year")
+    parser.add_argument("--years", nargs="+", type=int, default=[2024])
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        folders = make_pdf_corpus(Path(tmpdir) / "raw", args.years, args.reports, args.seed)
+        pdf_files = sorted(p for folder in folders.values() for p in Path(folder).glob("*.pdf"))
+        corpus_mb = sum(p.stat().st_size for p in pdf_files) / 1e6
+        print(f"Corpus: {len(pdf_files)} PDFs, {corpus_mb:.1f} MB")
+
+        metrics, rows = time_stages(pdf_files, tmpdir)
+        metrics["rows"] = rows
+
+        elapsed, rows = time_end_to_end(folders, None, tmpdir)
+        metrics["end_to_end_serial_s"] = round(elapsed, 3)
+        metrics["serial_pdfs_per_s"] = round(len(pdf_files) / elapsed, 1)
+        metrics["serial_rows_per_s"] = round(rows / elapsed, 1)
+
+        if args.workers > 1:
+            elapsed, rows = time_end_to_end(folders, args.workers, tmpdir)
+            metrics["end_to_end_parallel_s"] = round(elapsed, 3)
+            metrics["parallel_pdfs_per_s"] = round(len(pdf_files) / elapsed, 1)
+            metrics["parallel_rows_per_s"] = round(rows / elapsed, 1)
+
+        metrics["peak_rss_mb"] = peak_rss_mb()
+
+    print()
+    for name, value in metrics.items():
+        print(f"{name:32s} {value:>12}")
+
+    settings = {
+        "reports": args.reports, "years": args.years, "workers": args.workers, "seed": args.seed,
+    }
+    key = json.dumps(settings, sort_keys=True)
+    baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+
+    if args.save_baseline:
+        baselines[key] = {
+            "settings": settings,
+            "machine": f"{platform.machine()} / {os.cpu_count()} CPUs / Python {platform.python_version()}",
+            "metrics": metrics,
+        }
+        BASELINES.write_text(json.dumps(baselines, indent=2) + "\n")
+        print(f"\nBaseline saved to {BASELINES}")
+        return 0
+
+    if key not in baselines:
+        print("\nNo baseline for these settings (run with --save-baseline to store one).")
+        return 0
+
+    regressions = compare(metrics, baselines[key]["metrics"], args.tolerance)
+    if not regressions:
+        print(f"\nNo regressions against the baseline (tolerance {args.tolerance:.0%}).")
+        return 0
+    print(f"\nRegressions against the baseline (tolerance {args.tolerance:.0%}):")
+    for name, old, new in regressions:
+        print(f"  {name}: {old} -> {new}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
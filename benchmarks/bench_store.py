@@ -0,0 +1,101 @@
+"""
+bench_store.py
+
+Load and query times of the SQLite PriceStore on generated daily reports.
+
+Usage:
+    python -m benchmarks.bench_store [--years 2020 2021 2022 2023 2024 2025] [--repeat 5]
+
+Builds one wide price table per weekday (every rice item, all ten price
+columns), loads them into a fresh store, then times typical queries
+(best of --repeat runs). Also times the tidy reshape (to_tidy) on its own
+and reports how many rows deduplicating "yesterday" prices saves.
+"""
+
+import argparse
+from datetime import date, timedelta
+from pathlib import Path
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from rice_price_collector.parser import create_smart_column_names, to_tidy
+from rice_price_collector.store import PriceStore
+
+from .corpus import RICE_ITEMS
+
+QUERIES = {
+    "item_market_quarter": dict(start="2024-01-01", end="2024-03-31", items=["Samba"],
+                                channels=["wholesale"], markets=["pettah"], days=["today"]),
+    "item_full_history": dict(items=["Nadu"], days=["today"]),
+    "market_one_month": dict(start="2023-06-01", end="2023-06-30", markets=["dambulla"]),
+    "all_items_one_day": dict(start="2025-01-02", end="2025-01-02"),
+}
+
+
+def make_reports(years, seed=0):
+    """
+    One wide DataFrame per weekday of the given years. As in real reports,
+    each "yesterday" price repeats the previous report's "today" price.
+    """
+    rng = random.Random(seed)
+    columns = create_smart_column_names([])
+    markets = len(columns[2:]) // 2
+    today = {item: [round(rng.uniform(90, 400), 2) for _ in range(markets)] for item in RICE_ITEMS}
+    reports = []
+    for year in years:
+        day = date(year, 1, 1)
+        while day.year == year:
+            if day.weekday() < 5:
+                rows = []
+                for item in RICE_ITEMS:
+                    yesterday = today[item]
+                    today[item] = [round(price * rng.uniform(0.98, 1.02), 2) for price in yesterday]
+                    prices = [price for pair in zip(yesterday, today[item]) for price in pair]
+                    rows.append([item, "Rs./kg"] + prices)
+                df = pd.DataFrame(rows, columns=columns)
+                df.insert(0, "date", day.isoformat())
+                reports.append(df)
+            day += timedelta(days=1)
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--years", nargs="+", type=int, default=list(range(2020, 2026)))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    reports = make_reports(args.years)
+    wide = pd.concat(reports, ignore_index=True)
+    for dedupe in (False, True):
+        start = time.perf_counter()
+        rows = len(to_tidy(wide, dedupe=dedupe))
+        print(f"to_tidy(dedupe={dedupe}): {rows} rows in {(time.perf_counter() - start) * 1000:.0f} ms")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with PriceStore(Path(tmpdir) / "prices.sqlite") as store:
+            start = time.perf_counter()
+            prices = store.load(reports)
+            elapsed = time.perf_counter() - start
+            print(f"Loaded {len(reports)} reports ({prices} prices) in {elapsed:.2f}s "
+                  f"({prices / elapsed:,.0f} prices/s)")
+
+            start = time.perf_counter()
+            store.load(reports[-5:])
+            print(f"Upserted the last 5 days again in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+            print()
+            for name, query in QUERIES.items():
+                best = None
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    rows = len(store.query(**query))
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                print(f"{name:24s} {rows:>8} rows {best * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+bench_tokenizer.py
+
+Microbenchmark: parse_price_section (precompiled tokenizer) against the
+legacy implementation, on the same corpus of RICE section line lists.
+
+Usage:
+    python -m benchmarks.bench_tokenizer [--reports 500] [--repeat 5]
+
+Also checks that both produce identical DataFrames before timing anything.
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from rice_price_collector.parser import parse_price_section
+from rice_price_collector.parser.tokenizer import merge_lines, tokenize_line
+
+from .corpus import make_corpus
+from .legacy import legacy_parse_price_section, legacy_tokenize_line
+
+
+def best_time(func, corpus, repeat):
+    """Best wall time (seconds) over `repeat` runs of func on every section."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for section_lines in corpus:
+            func(section_lines)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def tokenize_all(tokenize):
+    """Run a line tokenizer over every merged line of a section."""
+    def run(section_lines):
+        return [tokenize(line) for line in merge_lines(section_lines)]
+    return run
+
+
+def report(name, legacy, current, reports):
+    per_report = 1e6 / reports
+    print(f"{name}")
+    print(f"  legacy   : {legacy * per_report:8.1f} µs/report")
+    print(f"  current  : {current * per_report:8.1f} µs/report")
+    print(f"  speedup  : {legacy / current:8.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--reports", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    corpus = make_corpus(args.reports)
+
+    for section_lines in corpus:
+        pd.testing.assert_frame_equal(
+            parse_price_section(section_lines), legacy_parse_price_section(section_lines)
+        )
+    print(f"Output identical on {len(corpus)} reports")
+
+    report(
+        "tokenize lines",
+        best_time(tokenize_all(legacy_tokenize_line), corpus, args.repeat),
+        best_time(tokenize_all(tokenize_line), corpus, args.repeat),
+        len(corpus),
+    )
+    report(
+        "parse_price_section",
+        best_time(legacy_parse_price_section, corpus, args.repeat),
+        best_time(parse_price_section, corpus, args.repeat),
+        len(corpus),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+corpus.py
+
+Synthetic corpus of RICE section line lists, shaped like the text that
+extract_section_between gets out of CBSL daily price reports:
+    - item, unit and prices glued together ("SambaRs./kg130.00132.00...")
+    - "n.a." for missing prices and rows with fewer price columns
+    - prices wrapped onto the next line
+    - thousands separators and dot leaders ("1,250.00", "Samba...")
+    - the stray "Marandagahamula" header line
+
+The same seed always gives the same corpus, so timings are comparable.
+"""
+
+import random
+
+RICE_ITEMS = [
+    "Samba",
+    "Nadu",
+    "Kekulu (White)",
+    "Kekulu (Red)",
+    "Keeri Samba",
+    "Suduru Samba",
+    "Raw Red",
+    "Nadu (Imported)",
+]
+
+UNITS = ["Rs./kg", "Rs./kg", "Rs./kg", "Rs./Ltr"]
+
+
+def _price(rng):
+    if rng.random() < 0.05:
+        return "n.a."
+    value = rng.uniform(90, 1400)
+    return f"{value:,.2f}" if rng.random() < 0.5 else f"{value:.2f}"
+
+
+def rice_section_lines(rng):
+    """One report's RICE section, as a list of text lines."""
+    lines = ["Marandagahamula"] if rng.random() < 0.5 else []
+    for item in rng.sample(RICE_ITEMS, rng.randint(5, len(RICE_ITEMS))):
+        price_count = 10 if rng.random() < 0.8 else rng.choice([6, 8])
+        prices = "".join(_price(rng) for _ in range(price_count))
+        name = item + ("..." if rng.random() < 0.2 else "")
+        unit = rng.choice(UNITS)
+
+        if rng.random() < 0.15:
+            # Prices wrapped onto the next line
+            lines.append(f"{name}{unit}")
+            lines.append(prices)
+        else:
+            lines.append(f"{name}{unit}{prices}")
+    return lines
+
+
+def make_corpus(reports=500, seed=0):
+    """A list of `reports` section line lists."""
+    rng = random.Random(seed)
+    return [rice_section_lines(rng) for _ in range(reports)]
@@ -0,0 +1,188 @@
+"""
+pdf_corpus.py
+
+Generated corpus of CBSL-style daily price report PDFs for the pipeline benchmark.
+
+Each report is a small but real PDF (written by hand, no extra dependencies):
+    - page 1: a cover page with a variable amount of text
+    - page 2: the market header, the RICE section (with its Marandagahamula
+      sub-header), then FISH and other
+      commodity sections (so page 2 carries realistic surrounding text)
+    - optionally a few extra pages, so file sizes vary
+
+Layouts vary from report to report, the way they do in the real archive:
+    - with or without the Marandagahamula wholesale market (10 or 8 price columns)
+    - 5 to all 8 rice varieties, "n.a." prices and thousands separators
+    - rows whose prices are missing or wrapped onto the next line
+    - more or fewer sections below RICE
+
+The same seed always gives the same corpus, so timings are comparable.
+"""
+
+from datetime import date, timedelta
+from pathlib import Path
+import random
+
+from .corpus import RICE_ITEMS
+
+OTHER_SECTIONS = {
+    "FISH": ["Kelawalla", "Thalapath", "Balaya", "Salaya", "Hurulla", "Linna"],
+    "VEGETABLES": ["Beans", "Carrot", "Cabbage", "Tomato", "Brinjal", "Pumpkin", "Snake gourd"],
+    "OTHER": ["Red Onion", "Big Onion", "Potato", "Dried Chilli", "Coconut", "Egg"],
+}
+
+# x positions of the ten price columns; 8-column reports drop the Marandagahamula pair
+PRICE_X = [150, 190, 230, 270, 310, 350, 390, 430, 470, 510]
+MARANDAGAHAMULA_COLUMNS = (2, 3)
+
+PAGE_TOP = 800
+LINE_HEIGHT = 11
+
+
+# Minimal PDF writer
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _page_stream(texts):
+    ops = ["BT /F1 7 Tf"]
+    ops.extend(f"1 0 0 1 {x} {y} Tm ({_escape(t)}) Tj" for x, y, t in texts)
+    ops.append("ET")
+    return "\n".join(ops).encode("latin-1")
+
+
+def build_pdf(pages):
+    """PDF bytes for a list of pages, each a list of (x, y, text) placements."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        (
+            "<< /Type /Pages /Kids [%s] /Count %d >>"
+            % (" ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages))), len(pages))
+        ).encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, texts in enumerate(pages):
+        stream = _page_stream(texts)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    ).encode()
+    return bytes(out)
+
+
+# Report content
+
+def _price(rng):
+    if rng.random() < 0.04:
+        return "n.a."
+    value = rng.uniform(90, 1400)
+    return f"{value:,.2f}"
+
+
+def _cover_page(rng, report_date):
+    texts = [
+        (50, PAGE_TOP, "Central Bank of Sri Lanka"),
+        (50, PAGE_TOP - 15, f"Daily Price Report - {report_date:%d %B %Y}"),
+    ]
+    for i in range(rng.randint(5, 40)):
+        texts.append((50, PAGE_TOP - 40 - i * LINE_HEIGHT, "Prices collected from major markets " * 2))
+    return texts
+
+
+def _price_rows(rng, items, columns, y, wrap_rate):
+    texts = []
+    for item in items:
+        texts.append((50, y, item))
+        texts.append((110, y, "Rs./kg"))
+        if rng.random() < wrap_rate:
+            # Prices wrapped onto the next line
+            y -= LINE_HEIGHT
+        for column in columns:
+            texts.append((PRICE_X[column], y, _price(rng)))
+        y -= LINE_HEIGHT
+    return texts, y
+
+
+def _price_page(rng, with_marandagahamula):
+    columns = [
+        c for c in range(len(PRICE_X))
+        if with_marandagahamula or c not in MARANDAGAHAMULA_COLUMNS
+    ]
+    # The page header names Dambulla as the second wholesale market; the RICE
+    # section replaces it with its own "Marandagahamula" sub-header, as in the
+    # real reports. 8-column reports have neither.
+    texts = [
+        (150, PAGE_TOP, "Wholesale Prices"),
+        (310, PAGE_TOP, "Retail Prices"),
+        (50, PAGE_TOP - 10, "Item"),
+        (110, PAGE_TOP - 10, "Unit"),
+        (150, PAGE_TOP - 10, "Pettah"),
+        (310, PAGE_TOP - 10, "Pettah"),
+        (390, PAGE_TOP - 10, "Dambulla"),
+        (470, PAGE_TOP - 10, "Narahenpita"),
+    ]
+    if with_marandagahamula:
+        texts.append((230, PAGE_TOP - 10, "Dambulla"))
+
+    y = PAGE_TOP - 30
+    texts.append((50, y, "R I C E"))
+    if with_marandagahamula:
+        y -= LINE_HEIGHT
+        texts.append((230, y, "Marandagahamula"))
+    items = rng.sample(RICE_ITEMS, rng.randint(5, len(RICE_ITEMS)))
+    rows, y = _price_rows(rng, items, columns, y - LINE_HEIGHT, wrap_rate=0.1)
+    texts.extend(rows)
+
+    # FISH always follows RICE; the other sections come and go
+    sections = ["FISH"] + [name for name in ("VEGETABLES", "OTHER") if rng.random() < 0.7]
+    for name in sections:
+        y -= 6
+        texts.append((50, y, " ".join(name)))
+        names = OTHER_SECTIONS[name][:rng.randint(3, len(OTHER_SECTIONS[name]))]
+        rows, y = _price_rows(rng, names, columns, y - LINE_HEIGHT, wrap_rate=0.0)
+        texts.extend(rows)
+    return texts
+
+
+def report_pdf(rng, report_date):
+    """PDF bytes of one report in a randomly chosen layout."""
+    pages = [_cover_page(rng, report_date), _price_page(rng, rng.random() < 0.8)]
+    for _ in range(rng.choice([0, 0, 0, 1, 3])):
+        pages.append(_cover_page(rng, report_date))
+    return build_pdf(pages)
+
+
+def make_pdf_corpus(root, years=(2024,), reports_per_year=50, seed=0):
+    """
+    Write reports_per_year weekday reports for each year into root/<year>/YYYY-MM-DD.pdf.
+
+    Returns the {year: folder} dictionary process_year_folders_dict expects.
+    """
+    rng = random.Random(seed)
+    folders = {}
+    for year in years:
+        folder = Path(root) / str(year)
+        folder.mkdir(parents=True, exist_ok=True)
+        day = date(year, 1, 1)
+        written = 0
+        while written < reports_per_year and day.year == year:
+            if day.weekday() < 5:
+                (folder / f"{day.isoformat()}.pdf").write_bytes(report_pdf(rng, day))
+                written += 1
+            day += timedelta(days=1)
+        folders[str(year)] = str(folder)
+    return folders
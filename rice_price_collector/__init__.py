@@ -3,14 +3,28 @@ rice_price_collector
 
 Top-level API for rice_price_collector package.
 Exposes main user-facing functions for easy import.
+
+The API is loaded lazily (PEP 562): importing the package is cheap, and the
+downloader (aiohttp, bs4) or the parser (pdfplumber, pandas) is only imported
+the first time one of its functions is used.
 """
 
+import importlib
+
 __version__ = "0.1.0"
 __author__ = "chamodh"
 
-# Expose main API directly
-from .downloader import download_all_pdfs, download_pdfs_to
-from .parser import process_year_folders_dict, parse_price_section, create_smart_column_names, extract_section_between, fix_missing_columns
+# Expose main API directly: {name: (module, attribute)}
+_LAZY_API = {
+	"download_all_pdfs": (".downloader", "download_all_pdfs"),
+	"download_pdfs_to": (".downloader", "download_pdfs_to"),
+	"process_year_folders_dict": (".parser", "process_year_folders_dict"),
+	"parse_price_section": (".parser", "parse_price_section"),
+	"create_smart_column_names": (".parser", "create_smart_column_names"),
+	"extract_section_between": (".parser", "extract_section_between"),
+	"fix_missing_columns": (".parser", "fix_missing_columns"),
+	"PriceStore": (".store", "PriceStore"),
+}
 
 __all__ = [
 	"download_all_pdfs",
@@ -20,4 +34,19 @@ __all__ = [
 	"create_smart_column_names",
 	"extract_section_between",
 	"fix_missing_columns",
+	"PriceStore",
 ]
+
+
+def __getattr__(name):
+	if name not in _LAZY_API:
+		raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+	module_name, attribute = _LAZY_API[name]
+	value = getattr(importlib.import_module(module_name, __name__), attribute)
+	# Cache it, so __getattr__ is only called once per name
+	globals()[name] = value
+	return value
+
+
+def __dir__():
+	return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,7 @@
+"""python -m rice_price_collector: the command line (see cli.py)."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+cli.py
+
+Command-line entry point: download reports, parse them, or both.
+
+    rice-price-collector download 2025 2024 --incremental
+    rice-price-collector parse 2025 2024 --workers 8 --format sqlite --cache-dir data/cache
+    rice-price-collector run --incremental --workers 8 --format parquet
+
+(or python -m rice_price_collector ...). Without years, "download" fetches
+every year CBSL lists and "parse" takes every year folder under --raw-dir.
+
+Each command ends with a summary line (reports, rows, time and throughput),
+and exits with status 1 when a report could not be downloaded or parsed, so
+a scheduler can run the pipeline without a Python wrapper. Stage metrics go to
+the sinks in RICE_METRICS, as for any run (see metrics.py).
+"""
+
+import argparse
+import asyncio
+import os
+from pathlib import Path
+import sys
+import time
+
+from .config import PROCESSED_DIR, RAW_DATA_DIR
+
+
+def _common_options():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("years", nargs="*", help="Years to process (default: all)")
+    common.add_argument("--raw-dir", type=Path, default=RAW_DATA_DIR,
+                        help="Root folder of the PDFs, one folder per year (default: %(default)s)")
+    common.add_argument("--incremental", action="store_true",
+                        help="Only download/parse reports not yet in the manifest")
+    return common
+
+
+def _download_options():
+    from .downloader.config import DOWNLOAD_CONCURRENCY, LISTING_RATE, MAX_CONCURRENCY
+
+    options = argparse.ArgumentParser(add_help=False)
+    group = options.add_argument_group("download")
+    group.add_argument("--concurrency", type=int, default=DOWNLOAD_CONCURRENCY,
+                       help="Concurrent requests to start with (default: %(default)s)")
+    group.add_argument("--max-concurrency", type=int, default=MAX_CONCURRENCY,
+                       help="Ceiling for the adaptive concurrency (default: %(default)s)")
+    group.add_argument("--listing-rate", type=float, default=LISTING_RATE,
+                       help="Listing pages per second (default: %(default)s)")
+    group.add_argument("--base-url", default=None,
+                       help="Site to download from (default: the CBSL website)")
+    return options
+
+
+def _parse_options():
+    from .parser.config import OUTPUT_FORMATS
+
+    options = argparse.ArgumentParser(add_help=False)
+    group = options.add_argument_group("parse")
+    group.add_argument("--output-dir", type=Path, default=PROCESSED_DIR,
+                       help="Where the parsed prices are written (default: %(default)s)")
+    group.add_argument("--workers", type=int, default=os.cpu_count(),
+                       help="Parser processes (default: %(default)s; 1 parses serially)")
+    group.add_argument("--format", dest="output_format", choices=OUTPUT_FORMATS, default="csv",
+                       help="Output format (default: %(default)s)")
+    group.add_argument("--cache-dir", type=Path, default=None,
+                       help="Parse cache folder, so unchanged PDFs are not parsed again "
+                            "(needs pyarrow)")
+    return options
+
+
+def build_parser():
+    """The argparse parser of the command line."""
+    common, download, parse = _common_options(), _download_options(), _parse_options()
+    parser = argparse.ArgumentParser(
+        prog="rice-price-collector",
+        description="Collect daily rice prices from CBSL price reports.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("download", parents=[common, download],
+                        help="Download report PDFs into --raw-dir/<year>/")
+    commands.add_parser("parse", parents=[common, parse],
+                        help="Parse the downloaded PDFs into --output-dir")
+    commands.add_parser("run", parents=[common, download, parse],
+                        help="Download, then parse")
+    return parser
+
+
+def download(args):
+    """Run the download command. Returns True when every listed report is on disk."""
+    from .downloader import DownloaderClient, DownloadJob, run_download
+
+    job = DownloadJob(
+        years=args.years or None, output_dir=args.raw_dir, incremental=args.incremental,
+        concurrency=args.concurrency, max_concurrency=args.max_concurrency,
+        listing_rate=args.listing_rate,
+    )
+
+    async def _run():
+        client = DownloaderClient() if args.base_url is None else DownloaderClient(args.base_url)
+        async with client:
+            return await run_download(job, client)
+
+    # run_download prints the summary line
+    return asyncio.run(_run()).ok
+
+
+def parse(args):
+    """Run the parse command. Returns True when every PDF was parsed."""
+    from . import metrics
+    from .parser import ParseCache, process_year_folders_dict
+
+    years = args.years
+    if not years and args.raw_dir.is_dir():
+        years = sorted(
+            (path.name for path in args.raw_dir.iterdir() if path.is_dir() and path.name.isdigit()),
+            reverse=True,
+        )
+    if not years:
+        print(f"No year folders found in {args.raw_dir}")
+        return False
+
+    cache = ParseCache(args.cache_dir) if args.cache_dir is not None else None
+
+    before = metrics.snapshot()["counters"]
+    started = time.perf_counter()
+    process_year_folders_dict(
+        {str(year): args.raw_dir / str(year) for year in years},
+        output_dir=args.output_dir, workers=args.workers, cache=cache,
+        incremental=args.incremental, output_format=args.output_format,
+    )
+    elapsed = time.perf_counter() - started
+    after = metrics.snapshot()["counters"]
+
+    def counted(name):
+        return after.get(name, 0) - before.get(name, 0)
+
+    failed = counted("pdfs_parse_failed")
+    reports = counted("pdfs_parsed") + failed
+    rows = counted("rows_emitted")
+    print(
+        f"{reports} reports parsed ({counted('parse_cache_hits')} from cache, {failed} failed), "
+        f"{rows} rows in {elapsed:.1f}s ({_rate(reports, elapsed)} PDFs/s, "
+        f"{_rate(rows, elapsed)} rows/s)"
+    )
+    return failed == 0
+
+
+def _rate(count, seconds):
+    return f"{count / seconds if seconds else 0.0:.1f}"
+
+
+def main(argv=None):
+    """Run the command line; returns the exit status."""
+    args = build_parser().parse_args(argv)
+    started = time.perf_counter()
+
+    ok = True
+    if args.command in ("download", "run"):
+        ok = download(args) and ok
+    if args.command in ("parse", "run"):
+        ok = parse(args) and ok
+
+    if args.command == "run":
+        print(f"Finished in {time.perf_counter() - started:.1f}s")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
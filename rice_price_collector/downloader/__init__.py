@@ -3,9 +3,40 @@ rice_price_collector.downloader
 
 Downloader subpackage for fetching CBSL rice price PDFs.
 Exposes main user-facing functions for easy import.
+
+Loaded lazily: aiohttp and bs4 are only imported when one of these is first used.
 """
 
-# Expose only the main user-facing API
-from .pdf_downloader import main as download_all_pdfs, download_pdfs_to
+import importlib
+
+# Expose only the main user-facing API: {name: (module, attribute)}
+_LAZY_API = {
+    "download_all_pdfs": (".pdf_downloader", "main"),
+    "download_pdfs_to": (".pdf_downloader", "download_pdfs_to"),
+    "run_download": (".pdf_downloader", "run_download"),
+    "DownloadJob": (".jobs", "DownloadJob"),
+    "DownloadReport": (".jobs", "DownloadReport"),
+    "DownloaderClient": (".client", "DownloaderClient"),
+}
+
+__all__ = [
+    "download_all_pdfs",
+    "download_pdfs_to",
+    "run_download",
+    "DownloadJob",
+    "DownloadReport",
+    "DownloaderClient",
+]
+
+
+def __getattr__(name):
+    if name not in _LAZY_API:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _LAZY_API[name]
+    value = getattr(importlib.import_module(module_name, __name__), attribute)
+    globals()[name] = value
+    return value
+
 
-__all__ = ["download_all_pdfs", "download_pdfs_to"]
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,130 @@
+"""
+client.py
+
+Long-lived HTTP client for the downloader.
+
+A DownloaderClient owns one aiohttp session with a tuned connection pool
+(total and per-host limits, DNS cache, keep-alive) and timeouts. Create it
+once and pass it to every run, so repeated pulls in a long-running service
+reuse open connections instead of paying for DNS, TCP and TLS setup each time:
+
+    async with DownloaderClient() as client:
+        while True:
+            await download_pdfs_to([2025], "data/raw", incremental=True, transport=client)
+            print(client.pool_stats())
+            await asyncio.sleep(24 * 3600)
+
+A session created elsewhere can be passed in instead (session=...); it is
+then used as-is and not closed by the client.
+"""
+
+from collections import Counter
+
+import aiohttp
+
+from .config import (
+    BASE,
+    CONNECT_TIMEOUT,
+    CONNECTION_LIMIT,
+    CONNECTIONS_PER_HOST,
+    DNS_CACHE_TTL,
+    KEEPALIVE_TIMEOUT,
+    READ_TIMEOUT,
+)
+from .transport import AiohttpTransport
+
+
+class DownloaderClient(AiohttpTransport):
+    """
+    Transport with a tuned, reusable connection pool.
+
+    Parameters:
+        base_url: Site root (default: the CBSL website)
+        session: Existing aiohttp.ClientSession to use instead of creating one
+        limit: Most open connections in total
+        limit_per_host: Most open connections to one host
+        ttl_dns_cache: Seconds a resolved address is reused
+        keepalive_timeout: Seconds an idle connection is kept open for reuse
+        timeout: aiohttp.ClientTimeout (default: connect and per-read timeouts,
+            no total limit so large PDFs can stream)
+    """
+
+    def __init__(self, base_url=BASE, session=None, limit=CONNECTION_LIMIT,
+                 limit_per_host=CONNECTIONS_PER_HOST, ttl_dns_cache=DNS_CACHE_TTL,
+                 keepalive_timeout=KEEPALIVE_TIMEOUT, timeout=None):
+        super().__init__(base_url, session=session)
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.ttl_dns_cache = ttl_dns_cache
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout or aiohttp.ClientTimeout(
+            total=None, connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT
+        )
+        self.stats = Counter()
+
+    @property
+    def session(self):
+        if self._session is None:
+            # Created on first use, inside the running event loop
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.ttl_dns_cache,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=self.timeout, trace_configs=[self._trace_config()]
+            )
+        return self._session
+
+    def _trace_config(self):
+        """Count pool events (only possible on sessions the client creates itself)."""
+        trace = aiohttp.TraceConfig()
+        events = {
+            "on_connection_create_end": "connections_created",
+            "on_connection_reuseconn": "connections_reused",
+            "on_connection_queued_start": "connections_queued",
+            "on_dns_cache_hit": "dns_cache_hits",
+            "on_dns_cache_miss": "dns_cache_misses",
+            "on_request_exception": "request_errors",
+        }
+        for signal, counter in events.items():
+            getattr(trace, signal).append(self._counter(counter))
+        return trace
+
+    def _counter(self, name):
+        async def count(session, context, params):
+            self.stats[name] += 1
+        return count
+
+    def post(self, url, data=None):
+        self.stats["requests"] += 1
+        return super().post(url, data=data)
+
+    def get(self, url, headers=None):
+        self.stats["requests"] += 1
+        return super().get(url, headers=headers)
+
+    def pool_stats(self):
+        """
+        Connection-pool statistics since the client was created: requests made,
+        connections created/reused/queued, DNS cache hits/misses, request errors,
+        and the pool settings. Connection and DNS counters stay 0 for an external session.
+        """
+        stats = {
+            "requests": 0,
+            "connections_created": 0,
+            "connections_reused": 0,
+            "connections_queued": 0,
+            "dns_cache_hits": 0,
+            "dns_cache_misses": 0,
+            "request_errors": 0,
+        }
+        stats.update(self.stats)
+        stats.update(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.ttl_dns_cache,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        return stats
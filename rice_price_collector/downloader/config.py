@@ -4,4 +4,59 @@ AJAX_URL = f"{BASE}/en/views/ajax"
 
 # Folder to save PDFs (always in current working directory)
 from pathlib import Path
-OUTPUT_DIR = Path(__file__).resolve().parent / "data" / "raw"
\ No newline at end of file
+OUTPUT_DIR = Path(__file__).resolve().parent / "data" / "raw"
+
+# Crawler tuning
+
+# Listing page requests per second, shared by every year crawled in one run
+LISTING_RATE = 2.0
+
+# How many listing pages of one year may be in flight ahead of the page being read
+PAGE_LOOKAHEAD = 3
+
+# Requests running at the same time (across all years): the adaptive limit
+# starts at DOWNLOAD_CONCURRENCY and stays below MAX_CONCURRENCY
+DOWNLOAD_CONCURRENCY = 5
+MAX_CONCURRENCY = 16
+
+# Most concurrent connections to one host
+CONNECTIONS_PER_HOST = 8
+
+# Total download bandwidth in bytes per second (None: unlimited)
+MAX_BANDWIDTH = None
+
+# Retries for HTTP 429/5xx, timeouts and connection errors, with jittered
+# exponential backoff between RETRY_BASE_DELAY and RETRY_MAX_DELAY seconds
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+
+# Bytes read from the network (and written to disk) at a time
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# How far from the end of a PDF the "%%EOF" trailer is looked for
+PDF_TRAILER_WINDOW = 1024
+
+# Connection pool of DownloaderClient: total connections, how long resolved
+# addresses and idle keep-alive connections are kept (seconds), and timeouts
+CONNECTION_LIMIT = 32
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 60
+CONNECT_TIMEOUT = 15
+READ_TIMEOUT = 60
+
+# CBSL year IDs (the listing's field_year_tid filter). The downloader reads the
+# current mapping from the listing itself; this table is only the fallback.
+YEAR_IDS = {
+    2025: "88",
+    2024: "87",
+    2023: "86",
+    2022: "85",
+    2021: "84",
+    2020: "83",
+}
+
+# File (in the download folder) caching the discovered mapping, and how long
+# it is trusted before being refreshed (seconds)
+YEAR_IDS_CACHE = "year_ids.json"
+YEAR_IDS_MAX_AGE = 7 * 24 * 3600
@@ -0,0 +1,197 @@
+"""
+controller.py
+
+Shared flow control for one download run: how many requests may run at
+once, how fast listing pages and bytes may flow, and how failed requests
+are retried.
+
+    - AdaptiveConcurrency: AIMD limit on concurrent requests. Every healthy
+      response raises the limit by 1/limit (about +1 per round of requests);
+      an error, a 429 or a response much slower than the fastest one seen
+      halves it (at most once per cooldown).
+    - Per-host limit: never more than connections_per_host requests to one host.
+    - Rate limits: listing pages per second and bytes per second, both
+      RateLimiter token buckets shared by every year in the run.
+    - Retries: HTTP 429/5xx, timeouts and connection errors are retried with
+      jittered exponential backoff, waiting at least as long as Retry-After asks.
+
+Example:
+    controller = DownloadController(max_bandwidth=2_000_000)
+    await run_download(DownloadJob(years=[2024, 2025]), controller=controller)
+"""
+
+import asyncio
+from collections import defaultdict
+from contextlib import asynccontextmanager
+import random
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .config import (
+    CONNECTIONS_PER_HOST,
+    DOWNLOAD_CONCURRENCY,
+    LISTING_RATE,
+    MAX_BANDWIDTH,
+    MAX_CONCURRENCY,
+    MAX_RETRIES,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+)
+from .rate_limiter import RateLimiter
+
+# Statuses worth trying again: throttling and server-side errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TransientHTTPError(Exception):
+    """A response that may succeed if the request is repeated later."""
+
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class DownloadError(Exception):
+    """A request that still failed after every retry."""
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (only the delta-seconds form is used)."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveConcurrency:
+    """
+    Concurrency limit tuned by additive increase / multiplicative decrease.
+
+    Parameters:
+        initial: Starting limit
+        minimum, maximum: Bounds for the limit
+        latency_factor: A response slower than latency_factor times the fastest
+            one seen counts as congestion
+        cooldown: Seconds between two decreases (one burst of errors halves once)
+    """
+
+    def __init__(self, initial=DOWNLOAD_CONCURRENCY, minimum=1, maximum=MAX_CONCURRENCY,
+                 latency_factor=4.0, cooldown=1.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_factor = latency_factor
+        self.cooldown = cooldown
+        self.active = 0
+        self.best_latency = None
+        self._last_decrease = float("-inf")
+        self._changed = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one of the `limit` request slots."""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.active < int(self.limit))
+            self.active += 1
+        try:
+            yield
+        finally:
+            async with self._changed:
+                self.active -= 1
+                self._changed.notify_all()
+
+    def record(self, ok, latency=None):
+        """Feed back one outcome: ok=False for errors/throttling, latency in seconds."""
+        if ok and latency is not None:
+            if self.best_latency is None or latency < self.best_latency:
+                self.best_latency = latency
+            if latency > self.latency_factor * self.best_latency:
+                ok = False
+
+        if ok:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        else:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.cooldown:
+                self.limit = max(self.minimum, self.limit / 2)
+                self._last_decrease = now
+
+
+class DownloadController:
+    """
+    Everything that paces one download run, shared by all its years.
+
+    Parameters:
+        concurrency: AdaptiveConcurrency instance (default: DOWNLOAD_CONCURRENCY to MAX_CONCURRENCY)
+        connections_per_host: Most concurrent requests to one host
+        listing_rate: Listing page requests per second (None: unlimited)
+        max_bandwidth: Download bytes per second over all files (None: unlimited)
+        max_retries: Attempts after the first one before giving up
+        base_delay, max_delay: Exponential backoff bounds in seconds
+    """
+
+    def __init__(self, concurrency=None, connections_per_host=CONNECTIONS_PER_HOST,
+                 listing_rate=LISTING_RATE, max_bandwidth=MAX_BANDWIDTH,
+                 max_retries=MAX_RETRIES, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY):
+        self.concurrency = concurrency or AdaptiveConcurrency()
+        self.connections_per_host = connections_per_host
+        self.listing_limiter = RateLimiter(listing_rate)
+        self.bandwidth = RateLimiter(max_bandwidth, burst=max_bandwidth or 1)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+        self._hosts = defaultdict(lambda: asyncio.Semaphore(connections_per_host))
+
+    @asynccontextmanager
+    async def slot(self, url):
+        """Hold a per-host connection slot and an adaptive concurrency slot."""
+        async with self._hosts[urlsplit(url).netloc]:
+            async with self.concurrency.slot():
+                yield
+
+    def check(self, response, started):
+        """
+        Record a response's outcome (status, time since `started` until headers)
+        and raise TransientHTTPError if the request should be retried.
+        """
+        retryable = response.status in RETRY_STATUSES
+        self.concurrency.record(ok=not retryable, latency=time.monotonic() - started)
+        if retryable:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            raise TransientHTTPError(response.status, retry_after)
+
+    def backoff(self, attempt, retry_after=None):
+        """Seconds to wait before retry number `attempt` (0-based): full jitter, capped."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    async def retry(self, attempt_fn, description):
+        """
+        Run attempt_fn() until it succeeds, retrying transient failures.
+
+        Raises DownloadError once max_retries retries have failed.
+        """
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                return await attempt_fn()
+            except TransientHTTPError as e:
+                error, retry_after = e, e.retry_after
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+                self.concurrency.record(ok=False)
+
+            if attempt == self.max_retries:
+                break
+            delay = self.backoff(attempt, retry_after)
+            self.retries += 1
+            print(f"Retrying {description} in {delay:.1f}s ({str(error) or type(error).__name__})")
+            await asyncio.sleep(delay)
+
+        raise DownloadError(f"{description} failed after {self.max_retries + 1} attempts: {error}")
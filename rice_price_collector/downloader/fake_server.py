@@ -0,0 +1,254 @@
+"""
+fake_server.py
+
+Local stand-in for the CBSL website, for offline tests and benchmarks.
+
+It answers the two requests the downloader makes:
+    - POST /en/views/ajax: the Drupal views JSON, whose "insert" command holds
+      one page (newest first) of report links for the requested field_year_tid
+    - GET /files/price_report_YYYYMMDD_e.pdf: a synthetic PDF (with Range support)
+
+and can misbehave on purpose:
+    - latency: seconds added to every response
+    - error_rate: share of requests answered with HTTP 500 (seeded, reproducible)
+    - fail_first: every URL fails with HTTP 500 this many times before it works
+    - max_rate: requests per second above which requests get HTTP 429 + Retry-After
+
+Example:
+    async with FakeCBSLServer(reports_per_year=30, latency=0.05) as server:
+        async with AiohttpTransport(server.base_url) as transport:
+            await download_pdfs_to([2024], "data/raw", transport=transport)
+        print(server.stats)
+
+Run it standalone with:
+    python -m rice_price_collector.downloader.fake_server --port 8080
+"""
+
+import argparse
+import asyncio
+from collections import Counter, deque
+from datetime import date, timedelta
+import json
+import random
+import time
+
+from aiohttp import web
+
+# CBSL year IDs (field_year_tid) served by default
+DEFAULT_YEAR_IDS = {"88": 2025, "87": 2024, "86": 2023, "85": 2022, "84": 2021, "83": 2020}
+
+
+def synthetic_pdf(report_date, size):
+    """Bytes of a fake report: a PDF header, filler up to `size` bytes and the %%EOF trailer."""
+    head = f"%PDF-1.4\n% Synthetic CBSL price report {report_date.isoformat()}\n".encode()
+    tail = b"\n%%EOF\n"
+    filler = max(0, size - len(head) - len(tail))
+    return head + (b"0" * filler) + tail
+
+
+class FakeCBSLServer:
+    """
+    Parameters:
+        year_ids: {field_year_tid: year} served and listed in the year filter
+            (default: 2020-2025 with the real IDs)
+        reports_per_year: Reports listed per year (weekdays from 2 January on)
+        page_size: Links per listing page
+        pdf_size: Size in bytes of each synthetic PDF
+        latency: Seconds added to every response
+        error_rate: Probability of an HTTP 500 for any request
+        fail_first: Number of HTTP 500s every URL returns before succeeding
+        max_rate: Requests per second allowed before answering HTTP 429 (None: no limit)
+        retry_after: Seconds sent in the Retry-After header of a 429
+        seed: Seed for the error_rate random generator
+        host, port: Where to listen (port 0 picks a free port)
+    """
+
+    def __init__(self, year_ids=None, reports_per_year=24, page_size=10, pdf_size=64 * 1024,
+                 latency=0.0, error_rate=0.0, fail_first=0, max_rate=None, retry_after=1,
+                 seed=0, host="127.0.0.1", port=0):
+        self.year_ids = dict(year_ids or DEFAULT_YEAR_IDS)
+        self.reports_per_year = reports_per_year
+        self.page_size = page_size
+        self.pdf_size = pdf_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.fail_first = fail_first
+        self.max_rate = max_rate
+        self.retry_after = retry_after
+        self.host = host
+        self.port = port
+
+        # Request counters: "requests", "listing", "pdf", "bytes", "status_<code>", "max_in_flight"
+        self.stats = Counter()
+        self._random = random.Random(seed)
+        self._failures = Counter()
+        self._recent = deque()
+        self._in_flight = 0
+        self._runner = None
+
+    # Content
+
+    def report_dates(self, year):
+        """Dates of the reports published in a year, newest first (as CBSL lists them)."""
+        dates = []
+        day = date(year, 1, 2)
+        while len(dates) < self.reports_per_year and day.year == year:
+            if day.weekday() < 5:
+                dates.append(day)
+            day += timedelta(days=1)
+        return dates[::-1]
+
+    @staticmethod
+    def pdf_path(report_date):
+        return f"/files/price_report_{report_date:%Y%m%d}_e.pdf"
+
+    def year_filter_html(self):
+        """The view's exposed year filter, as the real listing includes it."""
+        options = "".join(
+            f'<option value="{year_id}">{year}</option>'
+            for year_id, year in sorted(self.year_ids.items(), key=lambda item: -item[1])
+        )
+        return (
+            '<form class="views-exposed-form"><select name="field_year_tid">'
+            f'<option value="All">- Any -</option>{options}</select></form>'
+        )
+
+    def listing_html(self, year_id, page):
+        year = self.year_ids.get(str(year_id))
+        dates = self.report_dates(year) if year else []
+        page_dates = dates[page * self.page_size:(page + 1) * self.page_size]
+        if not page_dates:
+            content = '<div class="view-empty">No reports found.</div>'
+        else:
+            rows = "".join(
+                f'<li><a href="{self.pdf_path(d)}">Price Report - {d:%d %B %Y}</a></li>'
+                for d in page_dates
+            )
+            content = f'<div class="view-content"><ul>{rows}</ul></div>'
+        return f'<div class="view-price-report">{self.year_filter_html()}{content}</div>'
+
+    # Handlers
+
+    async def handle_listing(self, request):
+        form = await request.post()
+        self.stats["listing"] += 1
+        html = self.listing_html(form.get("field_year_tid"), int(form.get("page", 0)))
+        payload = [
+            {"command": "settings", "settings": {}, "merge": True},
+            {"command": "insert", "method": "replaceWith", "selector": ".view-price-report",
+             "data": html, "settings": None},
+        ]
+        return web.Response(text=json.dumps(payload), content_type="application/json")
+
+    async def handle_pdf(self, request):
+        try:
+            report_date = date(*time.strptime(request.match_info["stamp"], "%Y%m%d")[:3])
+        except ValueError:
+            raise web.HTTPNotFound()
+        if report_date not in self.report_dates(report_date.year):
+            raise web.HTTPNotFound()
+
+        body = synthetic_pdf(report_date, self.pdf_size)
+        self.stats["pdf"] += 1
+
+        byte_range = request.headers.get("Range", "")
+        if byte_range.startswith("bytes="):
+            start = int(byte_range[len("bytes="):].split("-")[0] or 0)
+            if start >= len(body):
+                return web.Response(status=416, headers={"Content-Range": f"bytes */{len(body)}"})
+            self.stats["bytes"] += len(body) - start
+            return web.Response(
+                status=206, body=body[start:], content_type="application/pdf",
+                headers={"Content-Range": f"bytes {start}-{len(body) - 1}/{len(body)}"},
+            )
+        self.stats["bytes"] += len(body)
+        return web.Response(body=body, content_type="application/pdf")
+
+    @web.middleware
+    async def misbehave(self, request, handler):
+        self.stats["requests"] += 1
+        self._in_flight += 1
+        self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self._in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            response = self._fault(request) or await handler(request)
+        except web.HTTPException as e:
+            response = e
+        finally:
+            self._in_flight -= 1
+        self.stats[f"status_{response.status}"] += 1
+        return response
+
+    def _fault(self, request):
+        if self.max_rate is not None:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] > 1:
+                self._recent.popleft()
+            if len(self._recent) >= self.max_rate:
+                return web.Response(status=429, headers={"Retry-After": str(self.retry_after)})
+            self._recent.append(now)
+
+        key = request.path_qs
+        if self._failures[key] < self.fail_first:
+            self._failures[key] += 1
+            return web.Response(status=500, text="Injected failure")
+        if self.error_rate and self._random.random() < self.error_rate:
+            return web.Response(status=500, text="Injected failure")
+        return None
+
+    # Lifecycle
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        app = web.Application(middlewares=[self.misbehave])
+        app.router.add_post("/en/views/ajax", self.handle_listing)
+        app.router.add_get("/files/price_report_{stamp}_e.pdf", self.handle_pdf)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Pick up the real port when port 0 was asked for
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+async def _serve_forever(server):
+    await server.start()
+    print(f"Fake CBSL server listening on {server.base_url} (Ctrl+C to stop)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the CBSL website.")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--reports-per-year", type=int, default=24)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-rate", type=float, default=None)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(_serve_forever(FakeCBSLServer(
+            reports_per_year=args.reports_per_year, latency=args.latency,
+            error_rate=args.error_rate, max_rate=args.max_rate, port=args.port,
+        )))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,118 @@
+"""
+jobs.py
+
+Typed description of a download run and the report it returns.
+
+    job = DownloadJob(years=[2024, 2025], output_dir="data/raw", incremental=True)
+    report = await run_download(job)
+    print(report.summary())
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from .config import (
+    DOWNLOAD_CONCURRENCY,
+    LISTING_RATE,
+    MAX_BANDWIDTH,
+    MAX_CONCURRENCY,
+    MAX_RETRIES,
+    OUTPUT_DIR,
+)
+
+
+@dataclass
+class DownloadJob:
+    """
+    What to download and how hard to push.
+
+    Attributes:
+        years: Years to download (None: every year CBSL lists)
+        output_dir: Root folder; PDFs go to output_dir/<year>/
+        concurrency: Starting number of concurrent requests
+        max_concurrency: Ceiling the adaptive concurrency may grow to
+        listing_rate: Listing pages per second (None: unlimited)
+        max_bandwidth: Bytes per second over all downloads (None: unlimited)
+        max_retries: Retries per request before giving up
+        incremental: Only fetch reports missing from output_dir/manifest.json
+    """
+
+    years: Optional[list] = None
+    output_dir: Path = OUTPUT_DIR
+    concurrency: int = DOWNLOAD_CONCURRENCY
+    max_concurrency: int = MAX_CONCURRENCY
+    listing_rate: Optional[float] = LISTING_RATE
+    max_bandwidth: Optional[float] = MAX_BANDWIDTH
+    max_retries: int = MAX_RETRIES
+    incremental: bool = False
+
+    def __post_init__(self):
+        self.output_dir = Path(self.output_dir)
+        if self.years:
+            self.years = [int(year) for year in self.years]
+
+
+@dataclass
+class YearReport:
+    """Outcome of one year: reports found in the listing and what happened to them."""
+
+    year: int
+    year_id: str
+    found: int = 0
+    downloaded: int = 0
+    skipped: int = 0
+    failed: list = field(default_factory=list)
+    listing_complete: bool = True
+
+
+@dataclass
+class DownloadReport:
+    """Outcome of a whole run."""
+
+    years: list = field(default_factory=list)
+    unknown_years: list = field(default_factory=list)
+    elapsed: float = 0.0
+    retries: int = 0
+    pool_stats: Optional[dict] = None
+
+    @property
+    def found(self):
+        return sum(year.found for year in self.years)
+
+    @property
+    def downloaded(self):
+        return sum(year.downloaded for year in self.years)
+
+    @property
+    def skipped(self):
+        return sum(year.skipped for year in self.years)
+
+    @property
+    def failed(self):
+        """URLs that could not be downloaded."""
+        return [url for year in self.years for url in year.failed]
+
+    @property
+    def ok(self):
+        """True if every listed report is on disk and every listing was read to the end."""
+        return (
+            not self.failed
+            and not self.unknown_years
+            and all(year.listing_complete for year in self.years)
+        )
+
+    def summary(self):
+        """One-line human-readable summary."""
+        rate = self.downloaded / self.elapsed if self.elapsed else 0.0
+        text = (
+            f"{self.found} reports found, {self.downloaded} downloaded, "
+            f"{self.skipped} already on disk, {len(self.failed)} failed "
+            f"in {self.elapsed:.1f}s ({rate:.1f} PDFs/s, {self.retries} retries)"
+        )
+        incomplete = [str(year.year) for year in self.years if not year.listing_complete]
+        if incomplete:
+            text += f"; incomplete listings: {', '.join(incomplete)}"
+        if self.unknown_years:
+            text += f"; unknown years: {', '.join(map(str, self.unknown_years))}"
+        return text
@@ -1,19 +1,70 @@
 import os
 import asyncio
-import aiohttp
+from collections import deque
+import time
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from datetime import datetime
-from .config import BASE, AJAX_URL, OUTPUT_DIR
+from .. import metrics
+from ..manifest import Manifest
+from .config import (
+    OUTPUT_DIR,
+    PAGE_LOOKAHEAD,
+    DOWNLOAD_CHUNK_SIZE,
+    PDF_TRAILER_WINDOW,
+    YEAR_IDS,
+    YEAR_IDS_CACHE,
+    YEAR_IDS_MAX_AGE,
+)
+from .controller import AdaptiveConcurrency, DownloadController, DownloadError
+from .client import DownloaderClient
+from .jobs import DownloadJob, DownloadReport, YearReport
+from .transport import as_transport
+from .year_ids import load_year_ids, parse_year_options, save_year_ids
 
 
 # Fetch Page
 
-async def fetch_page(session, page_num, year_id):
+async def fetch_page(session, page_num, year_id, controller=None):
     """
     Fetch a single page of PDF links from the CBSL website.
     Returns a list of (date_object, pdf_url) tuples.
+
+    session may be an aiohttp.ClientSession (real CBSL site) or any transport
+    (see transport.py), e.g. one pointing at the local fake server.
+
+    The request waits for the controller's listing rate limiter and is retried
+    on throttling, server errors and timeouts; DownloadError is raised when
+    every retry failed (an unreadable page is not the end of the listing).
     """
+    transport = as_transport(session)
+    html_content = await _fetch_listing_html(transport, page_num, year_id, controller)
+    if not html_content:
+        return []
+
+    soup = BeautifulSoup(html_content, "html.parser")
+    pdf_links = []
+
+    for link in soup.select("a[href$='.pdf']"):
+        pdf_url = urljoin(transport.base_url, link["href"])
+        link_text = link.get_text(strip=True)
+
+        date_object = None
+        try:
+            date_object = datetime.strptime(
+                link_text.split("-")[-1].strip(), "%d %B %Y"
+            )
+        except Exception:
+            pass
+
+        pdf_links.append((date_object, pdf_url))
+
+    return pdf_links
+
+
+async def _fetch_listing_html(transport, page_num, year_id, controller=None):
+    """POST one listing request and return the HTML of its "insert" command (or None)."""
+    controller = controller or DownloadController()
     payload = {
         "view_name": "price_report",
         "view_display_id": "block_1",
@@ -25,211 +76,422 @@ async def fetch_page(session, page_num, year_id):
         "field_month_tid": "All",
     }
 
-    async with session.post(AJAX_URL, data=payload) as response:
-        if response.status != 200:
-            print(f"Failed to fetch page {page_num}: HTTP {response.status}")
-            return []
+    async def attempt():
+        await controller.listing_limiter.acquire()
+        async with controller.slot(transport.ajax_url):
+            started = time.monotonic()
+            async with transport.post(transport.ajax_url, data=payload) as response:
+                controller.check(response, started)
+                if response.status != 200:
+                    print(f"Failed to fetch page {page_num}: HTTP {response.status}")
+                    return None
+                return await response.json()
+
+    with metrics.timer("listing_fetch"):
+        json_data = await controller.retry(attempt, f"listing page {page_num} (year_id={year_id})")
+    if json_data is None:
+        return None
+    metrics.incr("pages_fetched")
+
+    html_content = next(
+        (item.get("data") for item in json_data if item.get("command") == "insert"),
+        None,
+    )
+    if not html_content:
+        print(f"No HTML content found on page {page_num}")
+    return html_content
 
-        json_data = await response.json()
 
-        html_content = next(
-            (item.get("data") for item in json_data if item.get("command") == "insert"),
-            None,
-        )
-        if not html_content:
-            print(f"No HTML content found on page {page_num}")
-            return []
+# CBSL year IDs
 
-        soup = BeautifulSoup(html_content, "html.parser")
-        pdf_links = []
+async def discover_year_ids(session, controller=None):
+    """
+    Read the {year: year_id} mapping from the year filter of the CBSL listing.
+    Returns an empty dict if the listing has no year filter.
+    """
+    transport = as_transport(session)
+    html_content = await _fetch_listing_html(transport, 0, "All", controller)
+    return parse_year_options(html_content or "")
 
-        for link in soup.select("a[href$='.pdf']"):
-            pdf_url = urljoin(BASE, link["href"])
-            link_text = link.get_text(strip=True)
 
-            date_object = None
-            try:
-                date_object = datetime.strptime(
-                    link_text.split("-")[-1].strip(), "%d %B %Y"
-                )
-            except Exception:
-                pass
+async def resolve_year_ids(session, cache_path, years=None, controller=None):
+    """
+    {year: year_id} for the run: the cached mapping while it is fresh and covers
+    every requested year, otherwise a freshly discovered one (which is cached).
+    Falls back to the last cached mapping and config.YEAR_IDS if discovery fails.
+    """
+    cached = load_year_ids(cache_path, max_age=YEAR_IDS_MAX_AGE)
+    if cached and all(year in cached for year in years or []):
+        return cached
 
-            pdf_links.append((date_object, pdf_url))
+    try:
+        discovered = await discover_year_ids(session, controller)
+    except DownloadError as e:
+        print(f"Could not read the year list: {e}")
+        discovered = {}
+    if discovered:
+        save_year_ids(cache_path, discovered)
+        return discovered
 
-        return pdf_links
+    print("Year list unavailable; using the built-in year IDs")
+    return {**YEAR_IDS, **(load_year_ids(cache_path) or {})}
 
 
 # Download pdf file
 
-async def download_pdf(session, date_obj, url, output_dir):
-    """Download and save a single PDF file."""
+def is_valid_pdf(path):
+    """
+    Cheap completeness check: the file starts with "%PDF-" and has an "%%EOF"
+    marker near its end (a truncated download is missing the trailer).
+    """
+    try:
+        with open(path, "rb") as f:
+            if f.read(5) != b"%PDF-":
+                return False
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - PDF_TRAILER_WINDOW))
+            return b"%%EOF" in f.read()
+    except OSError:
+        return False
+
+
+async def _stream_to_file(response, part_path, append, bandwidth):
+    """Write the response body to part_path chunk by chunk, off the event loop."""
+    f = await asyncio.to_thread(open, part_path, "ab" if append else "wb")
+    try:
+        async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+            await bandwidth.acquire(len(chunk))
+            await asyncio.to_thread(f.write, chunk)
+            metrics.incr("bytes_downloaded", len(chunk))
+    finally:
+        await asyncio.to_thread(f.close)
+
+
+async def download_pdf(session, date_obj, url, output_dir, controller=None):
+    """
+    Download and save a single PDF file.
+    Returns the file path if the PDF is on disk afterwards, otherwise None.
+
+    The body is streamed to "<name>.pdf.part" and renamed into place only once
+    it is complete and looks like a PDF, so the archive never holds a truncated
+    file. An interrupted download leaves its .part file behind, and the next
+    attempt resumes it with an HTTP Range request.
+
+    Throttling, server errors, timeouts and dropped connections are retried
+    (resuming the partial file) as the controller allows.
+    """
+    path, _ = await _download_pdf(session, date_obj, url, output_dir, controller)
+    return path
+
+
+async def _download_pdf(session, date_obj, url, output_dir, controller=None):
+    """
+    download_pdf, returning (file path or None, outcome), outcome being
+    "downloaded", "skipped" (a complete copy was already on disk) or "failed".
+    """
+    controller = controller or DownloadController()
     os.makedirs(output_dir, exist_ok=True)
 
     filename = (
         f"{date_obj.strftime('%Y-%m-%d')}.pdf" if date_obj else "unknown_date.pdf"
     )
     output_path = os.path.join(output_dir, filename)
+    part_path = output_path + ".part"
 
     if os.path.exists(output_path):
-        print(f"Skipping {filename} (already exists)")
-        return
+        if await asyncio.to_thread(is_valid_pdf, output_path):
+            print(f"Skipping {filename} (already exists)")
+            return output_path, "skipped"
+        print(f"Re-downloading {filename} (existing file is corrupt)")
+        await asyncio.to_thread(os.remove, output_path)
+
+    async def attempt():
+        resume_from = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={resume_from}-"} if resume_from else None
+
+        async with controller.slot(url):
+            started = time.monotonic()
+            async with as_transport(session).get(url, headers=headers) as response:
+                controller.check(response, started)
+                if response.status == 416:
+                    # The partial file is no use to the server; start over next time
+                    await asyncio.to_thread(os.remove, part_path)
+                    print(f"Failed {url}: could not resume, partial file discarded")
+                    return False
+                if response.status not in (200, 206):
+                    print(f"Failed {url}: HTTP {response.status}")
+                    return False
+                # 206 continues the partial file; 200 means the server sent everything again
+                await _stream_to_file(
+                    response, part_path, append=response.status == 206,
+                    bandwidth=controller.bandwidth,
+                )
+        return True
 
     try:
-        async with session.get(url) as response:
-            if response.status != 200:
-                print(f"Failed {url}: HTTP {response.status}")
-                return
-            pdf_content = await response.read()
-            with open(output_path, "wb") as f:
-                f.write(pdf_content)
-            print(f"Saved {output_path}")
+        if not await controller.retry(attempt, filename):
+            return None, "failed"
+
+        if not await asyncio.to_thread(is_valid_pdf, part_path):
+            await asyncio.to_thread(os.remove, part_path)
+            print(f"Failed {url}: downloaded file is not a complete PDF")
+            return None, "failed"
+
+        await asyncio.to_thread(os.replace, part_path, output_path)
+        print(f"Saved {output_path}")
+        return output_path, "downloaded"
     except Exception as e:
         print(f"Error downloading {url}: {e}")
+        return None, "failed"
 
 
-# Main function
+# Discover report links for one year
 
-async def main(years=None, outputdir=None):
+async def iter_year_links(session, year, year_id, controller, known_urls=None,
+                          lookahead=PAGE_LOOKAHEAD):
     """
-    Download PDFs for given list of years.
+    Page through the CBSL listing for one year, yielding each page's
+    (date_object, pdf_url) tuples as soon as that page has arrived.
 
-    Args:
-        years (list[str] or list[int]): Years to download (e.g., ["2025", "2024"])
+    Up to `lookahead` pages are requested ahead of the page being read, each
+    request waiting for a token from the controller's rate limiter, so the crawl is
+    bounded by the rate limit rather than by one round-trip per page. Pages are
+    still yielded in order, and requests running past the end are cancelled.
+
+    The listing is ordered newest first, so when known_urls is given (incremental
+    mode) paging stops at the first page containing an already-downloaded report.
     """
-    async with aiohttp.ClientSession() as session:
-        # CBSL year ID mapping
-        year_map = {
-            "88": 2025,
-            "87": 2024,
-            "86": 2023,
-            "85": 2022,
-            "84": 2021,
-            "83": 2020,
-        }
-
-        # Determine which years to process
-        if not years:
-            years = [str(v) for v in year_map.values()]
-        years = [str(y) for y in years]
-
-        # Reverse lookup: find CBSL ID for each year number
-        reverse_map = {str(v): k for k, v in year_map.items()}
-
-        for year in years:
-            if year not in reverse_map:
-                print(f"Unknown year {year} (skipped)")
-                continue
-
-            year_id = reverse_map[year]
-            print(f"\nFetching reports for {year} (year_id={year_id})...")
-            year_output_dir = OUTPUT_DIR / str(year)
-            year_output_dir.mkdir(parents=True, exist_ok=True)
-
-            all_links = []
-            page = 0
-
-            while True:
-                reports = await fetch_page(session, page, year_id)
-                if not reports:
-                    print(f"No more reports at page {page} for {year}.")
+    in_flight = deque()
+    next_page = 0
+
+    def request_next_page():
+        nonlocal next_page
+        in_flight.append(asyncio.create_task(
+            fetch_page(session, next_page, year_id, controller=controller)
+        ))
+        next_page += 1
+
+    try:
+        for _ in range(max(1, lookahead)):
+            request_next_page()
+
+        while in_flight:
+            page = next_page - len(in_flight)
+            reports = await in_flight.popleft()
+            if not reports:
+                print(f"No more reports at page {page} for {year}.")
+                break
+            print(f"Found {len(reports)} reports on page {page} ({year})")
+
+            if known_urls is not None:
+                new_reports = [(d, url) for d, url in reports if url not in known_urls]
+                if new_reports:
+                    yield new_reports
+                if len(new_reports) < len(reports):
+                    print(f"Reached already-downloaded reports on page {page} ({year}).")
                     break
-                print(f"Found {len(reports)} reports on page {page} ({year})")
-                all_links.extend(reports)
-                page += 1
-                await asyncio.sleep(1)
+            else:
+                yield reports
+
+            request_next_page()
+    finally:
+        for task in in_flight:
+            task.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
+
+
+async def collect_year_links(session, year, year_id, known_urls=None, controller=None):
+    """
+    Page through the CBSL listing for one year and return all (date_object, pdf_url) tuples.
+    """
+    controller = controller or DownloadController()
+    all_links = []
+    async for reports in iter_year_links(session, year, year_id, controller, known_urls):
+        all_links.extend(reports)
+    return all_links
+
+
+# Download links into one folder
+
+# Metrics counter for each _download_pdf outcome
+DOWNLOAD_COUNTERS = {
+    "downloaded": "pdfs_downloaded",
+    "skipped": "pdfs_skipped",
+    "failed": "pdfs_download_failed",
+}
+
+async def _download_and_record(session, date_obj, url, output_dir, controller, manifest):
+    started = time.monotonic()
+    path, outcome = await _download_pdf(session, date_obj, url, output_dir, controller)
+    metrics.incr(DOWNLOAD_COUNTERS[outcome])
+    if outcome == "downloaded":
+        metrics.observe("pdf_download", time.monotonic() - started)
+    if path and manifest is not None:
+        # Hashing the PDF reads the whole file; keep it off the event loop
+        await asyncio.to_thread(
+            manifest.record_download,
+            path, url=url, date=date_obj.strftime("%Y-%m-%d") if date_obj else None,
+        )
+    return outcome
+
+
+async def download_links(session, all_links, year_output_dir, manifest=None, controller=None):
+    """
+    Download (date_object, pdf_url) links into year_output_dir, as many at a
+    time as the (shared) controller allows.
+    Every PDF that ends up on disk is recorded in the manifest, if one is given.
+    """
+    # Deduplicate by URL
+    unique_links = {}
+    for date_obj, url in all_links:
+        if url not in unique_links:
+            unique_links[url] = date_obj
+
+    controller = controller or DownloadController()
+    tasks = [
+        _download_and_record(session, date_obj, url, year_output_dir, controller, manifest)
+        for url, date_obj in unique_links.items()
+    ]
+    await asyncio.gather(*tasks)
+
+
+async def download_year(session, year, year_id, year_output_dir, controller, manifest=None):
+    """
+    Crawl one year's listing and download its reports, starting each download
+    as soon as the page listing it arrives. Returns a YearReport.
+    """
+    print(f"\nFetching reports for {year} (year_id={year_id})...")
+    year_output_dir.mkdir(parents=True, exist_ok=True)
+    known_urls = manifest.known_urls() if manifest is not None else None
+    report = YearReport(year=int(year), year_id=year_id)
 
-            print(f"Total PDFs found for {year}: {len(all_links)}")
+    downloads = {}
+    try:
+        async for reports in iter_year_links(session, year, year_id, controller, known_urls):
+            for date_obj, url in reports:
+                if url in downloads:
+                    continue
+                downloads[url] = asyncio.create_task(_download_and_record(
+                    session, date_obj, url, year_output_dir, controller, manifest
+                ))
+    except DownloadError as e:
+        # Still finish the downloads already found; the next run picks up the rest
+        print(f"Listing for {year} is incomplete: {e}")
+        report.listing_complete = False
+
+    report.found = len(downloads)
+    print(f"Total PDFs found for {year}: {report.found}")
+    outcomes = await asyncio.gather(*downloads.values())
+    for url, outcome in zip(downloads, outcomes):
+        if outcome == "downloaded":
+            report.downloaded += 1
+        elif outcome == "skipped":
+            report.skipped += 1
+        else:
+            report.failed.append(url)
+
+    if manifest is not None:
+        manifest.save()
+    print(f"Completed downloads for {year} → {year_output_dir}")
+    return report
+
+
+# Download engine
+
+def controller_for(job):
+    """DownloadController configured from a DownloadJob."""
+    return DownloadController(
+        concurrency=AdaptiveConcurrency(
+            initial=job.concurrency, maximum=max(job.concurrency, job.max_concurrency)
+        ),
+        listing_rate=job.listing_rate,
+        max_bandwidth=job.max_bandwidth,
+        max_retries=job.max_retries,
+    )
+
+
+async def run_download(job, transport=None, controller=None):
+    """
+    Run a DownloadJob and return its DownloadReport.
 
-            # Deduplicate by URL
-            unique_links = {}
-            for date_obj, url in all_links:
-                if url not in unique_links:
-                    unique_links[url] = date_obj
+    Years are crawled concurrently and share one controller (rate limits,
+    adaptive concurrency, retries), so the load on the CBSL server does not
+    grow with the number of years.
 
-            download_limit = asyncio.Semaphore(5)
+    Args:
+        job (DownloadJob): What to download and how
+        transport: Optional HTTP transport, e.g. a DownloaderClient shared by
+            repeated runs (default: a new DownloaderClient for the CBSL website)
+        controller: Optional DownloadController overriding the job's pacing settings
+    """
+    if transport is None:
+        async with DownloaderClient() as client:
+            return await run_download(job, client, controller)
+
+    started = time.monotonic()
+    controller = controller or controller_for(job)
+    manifest = Manifest.for_raw_dir(job.output_dir) if job.incremental else None
+    year_ids = await resolve_year_ids(
+        transport, job.output_dir / YEAR_IDS_CACHE, job.years, controller
+    )
 
-            async def download_with_limit(date_obj, url):
-                async with download_limit:
-                    await download_pdf(session, date_obj, url, year_output_dir)
+    report = DownloadReport()
+    jobs = []
+    for year in job.years or sorted(year_ids, reverse=True):
+        if year not in year_ids:
+            print(f"Unknown year {year} (skipped)")
+            report.unknown_years.append(year)
+            continue
+        jobs.append(download_year(
+            transport, year, year_ids[year], job.output_dir / str(year), controller, manifest,
+        ))
+    report.years = list(await asyncio.gather(*jobs))
+
+    report.elapsed = time.monotonic() - started
+    report.retries = controller.retries
+    if hasattr(transport, "pool_stats"):
+        report.pool_stats = transport.pool_stats()
+    print(report.summary())
+
+    metrics.observe("download_run", report.elapsed)
+    metrics.incr("http_retries", report.retries)
+    metrics.flush()
+    return report
 
-            tasks = [
-                download_with_limit(date_obj, url)
-                for url, date_obj in unique_links.items()
-            ]
-            import os
-            await asyncio.gather(*tasks)
-            print(f"Completed downloads for {year} → {year_output_dir}")
+
+# Main function
+
+async def main(years=None, outputdir=None, incremental=False, transport=None):
+    """
+    Download PDFs for given list of years.
+
+    Args:
+        years (list[str] or list[int]): Years to download (e.g., ["2025", "2024"])
+        outputdir (str or Path): Output directory (default: config.OUTPUT_DIR)
+        incremental (bool): Only fetch reports missing from the manifest, and stop
+            paging as soon as already-known reports are reached
+        transport: Optional HTTP transport, e.g. a DownloaderClient shared by
+            repeated runs (default: a new DownloaderClient for the CBSL website)
+
+    Returns:
+        DownloadReport
+    """
+    job = DownloadJob(years=years, output_dir=outputdir or OUTPUT_DIR, incremental=incremental)
+    return await run_download(job, transport)
 
 # New async function to download PDFs to a specified output directory
-async def download_pdfs_to(years, outputdir):
+async def download_pdfs_to(years, outputdir, incremental=False, transport=None):
     """
     Download PDFs for the given list of years to the specified output directory.
     Args:
         years (list[str] or list[int]): Years to download (e.g., [2025, 2024])
         outputdir (str or Path): Output directory to save PDFs
+        incremental (bool): Only fetch reports missing from outputdir/manifest.json,
+            and stop paging as soon as already-known reports are reached
+        transport: Optional HTTP transport, e.g. a DownloaderClient shared by
+            repeated runs (default: a new DownloaderClient for the CBSL website)
+
+    Returns:
+        DownloadReport
     """
-    from pathlib import Path
-    output_base = Path(outputdir)
-    async with aiohttp.ClientSession() as session:
-        # CBSL year ID mapping
-        year_map = {
-            "88": 2025,
-            "87": 2024,
-            "86": 2023,
-            "85": 2022,
-            "84": 2021,
-            "83": 2020,
-        }
-
-        # Determine which years to process
-        if not years:
-            years = [str(v) for v in year_map.values()]
-        years = [str(y) for y in years]
-
-        # Reverse lookup: find CBSL ID for each year number
-        reverse_map = {str(v): k for k, v in year_map.items()}
-
-        for year in years:
-            if year not in reverse_map:
-                print(f"Unknown year {year} (skipped)")
-                continue
-
-            year_id = reverse_map[year]
-            print(f"\nFetching reports for {year} (year_id={year_id})...")
-            year_output_dir = output_base / str(year)
-            year_output_dir.mkdir(parents=True, exist_ok=True)
-
-            all_links = []
-            page = 0
-
-            while True:
-                reports = await fetch_page(session, page, year_id)
-                if not reports:
-                    print(f"No more reports at page {page} for {year}.")
-                    break
-                print(f"Found {len(reports)} reports on page {page} ({year})")
-                all_links.extend(reports)
-                page += 1
-                await asyncio.sleep(1)
-
-            print(f"Total PDFs found for {year}: {len(all_links)}")
-
-            # Deduplicate by URL
-            unique_links = {}
-            for date_obj, url in all_links:
-                if url not in unique_links:
-                    unique_links[url] = date_obj
-
-            download_limit = asyncio.Semaphore(5)
-
-            async def download_with_limit(date_obj, url):
-                async with download_limit:
-                    await download_pdf(session, date_obj, url, year_output_dir)
-
-            tasks = [
-                download_with_limit(date_obj, url)
-                for url, date_obj in unique_links.items()
-            ]
-            await asyncio.gather(*tasks)
-            print(f"Completed downloads for {year} → {year_output_dir}")
\ No newline at end of file
+    return await main(years, outputdir, incremental=incremental, transport=transport)
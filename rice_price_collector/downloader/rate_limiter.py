@@ -0,0 +1,56 @@
+"""
+rate_limiter.py
+
+Token-bucket rate limiter shared by all tasks of one download run.
+
+Every listing page request takes one token; tokens refill at `rate` per second,
+so however many years are crawled concurrently, the CBSL server never sees
+more than `rate` requests per second (plus a short burst).
+
+Example:
+    limiter = RateLimiter(rate=2)
+    await limiter.acquire()   # waits until a request may be sent
+"""
+
+import asyncio
+import time
+
+
+class RateLimiter:
+    """
+    Asynchronous token bucket.
+
+    Parameters:
+        rate: Tokens added per second (None disables limiting)
+        burst: Most tokens that can be saved up while idle
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount=1):
+        """
+        Wait until `amount` tokens are available and take them.
+
+        An amount larger than the burst is granted once the bucket is full and
+        leaves it in debt, so later callers wait for the difference.
+        """
+        if self.rate is None:
+            return
+        # The lock makes callers queue up in arrival order
+        async with self._lock:
+            needed = min(amount, self.burst)
+            self._refill()
+            while self._tokens < needed:
+                await asyncio.sleep((needed - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= amount
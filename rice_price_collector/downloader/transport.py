@@ -0,0 +1,89 @@
+"""
+transport.py
+
+HTTP transport used by the downloader.
+
+fetch_page and download_pdf only need two things from the network: POST a
+form to the listing endpoint and GET a URL as a stream. A transport bundles
+those with the site's base URL, so the same crawler can talk to the real
+CBSL website or to the local stand-in server in fake_server.py:
+
+    async with AiohttpTransport() as transport:                  # www.cbsl.gov.lk
+        ...
+    async with FakeCBSLServer() as server:
+        async with AiohttpTransport(server.base_url) as transport:  # offline
+            ...
+
+Any object with the same attributes and methods can be used instead
+(e.g. a recording transport in tests).
+"""
+
+from typing import Protocol
+
+import aiohttp
+
+from .config import BASE
+
+
+class Transport(Protocol):
+    """What the downloader needs from an HTTP client."""
+
+    base_url: str
+    ajax_url: str
+
+    def post(self, url, data=None):
+        """Return an async context manager yielding a response (status, json())."""
+
+    def get(self, url, headers=None):
+        """Return an async context manager yielding a response (status, headers, content)."""
+
+
+class AiohttpTransport:
+    """
+    Transport backed by an aiohttp.ClientSession.
+
+    Parameters:
+        base_url: Site root (default: the CBSL website)
+        session: Existing ClientSession to use; when omitted one is created
+            on first use and closed by close()
+    """
+
+    def __init__(self, base_url=BASE, session=None):
+        self.base_url = base_url.rstrip("/")
+        self.ajax_url = f"{self.base_url}/en/views/ajax"
+        self._session = session
+        self._owns_session = session is None
+
+    @property
+    def session(self):
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    def post(self, url, data=None):
+        return self.session.post(url, data=data)
+
+    def get(self, url, headers=None):
+        return self.session.get(url, headers=headers)
+
+    async def close(self):
+        """Close the session if this transport created it."""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+def as_transport(session_or_transport):
+    """
+    Accept either a transport or a bare aiohttp.ClientSession (which is wrapped
+    in an AiohttpTransport for the CBSL website).
+    """
+    if isinstance(session_or_transport, aiohttp.ClientSession):
+        return AiohttpTransport(session=session_or_transport)
+    return session_or_transport
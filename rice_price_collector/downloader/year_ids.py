@@ -0,0 +1,67 @@
+"""
+year_ids.py
+
+Mapping from calendar year to the CBSL listing's year ID (field_year_tid).
+
+CBSL adds a new ID every January, so the mapping is read from the year
+filter of the listing itself (the <select name="field_year_tid"> the
+views/ajax response includes) and cached in the download folder:
+
+    data/raw/year_ids.json   {"fetched_at": 1735689600, "year_ids": {"2025": "88", ...}}
+
+config.YEAR_IDS is only used when the listing cannot be read.
+"""
+
+import json
+import os
+from pathlib import Path
+import re
+import tempfile
+import time
+
+from bs4 import BeautifulSoup
+
+
+def parse_year_options(html):
+    """Return {year: year_id} from the field_year_tid <select> in a listing's HTML."""
+    soup = BeautifulSoup(html, "html.parser")
+    year_ids = {}
+    for option in soup.select("select[name='field_year_tid'] option"):
+        label = option.get_text(strip=True)
+        value = option.get("value", "")
+        if re.fullmatch(r"\d{4}", label) and value.isdigit():
+            year_ids[int(label)] = value
+    return year_ids
+
+
+def load_year_ids(path, max_age=None):
+    """
+    Read a cached mapping. Returns None if there is none, it cannot be read,
+    or it is older than max_age seconds.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if max_age is not None and time.time() - data["fetched_at"] > max_age:
+            return None
+        return {int(year): str(year_id) for year, year_id in data["year_ids"].items()}
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_year_ids(path, year_ids):
+    """Write the mapping atomically, stamped with the current time."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "fetched_at": int(time.time()),
+        "year_ids": {str(year): year_id for year, year_id in sorted(year_ids.items())},
+    }
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,141 @@
+"""
+manifest.py
+
+Manifest of downloaded and parsed CBSL price reports.
+
+The manifest is a small JSON file kept at the root of the raw PDF folder
+(e.g. data/raw/manifest.json). For every report it records:
+    - url, date, size, modification time and sha256 of the PDF
+    - when it was downloaded
+    - its parse status ("parsed" or "failed") and how many rows it produced
+
+The downloader uses it to stop paging through the CBSL listing as soon as it
+reaches reports it already knows, and the batch parser uses it to parse (and
+append to the yearly CSV) only the reports that have not been parsed yet.
+"""
+
+from datetime import datetime
+import hashlib
+import json
+import os
+from pathlib import Path
+import tempfile
+import threading
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Return the hex SHA-256 digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class Manifest:
+    """
+    Records every report known to the pipeline, keyed by its path relative
+    to the manifest's folder (e.g. "2024/2024-01-02.pdf").
+
+    Parameters:
+        path: Location of the manifest JSON file (created on first save)
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.root = self.path.parent
+        self.reports = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                self.reports = json.load(f).get("reports", {})
+
+    @classmethod
+    def for_raw_dir(cls, raw_dir):
+        """Manifest stored at the root of a raw PDF folder (the one holding year folders)."""
+        return cls(Path(raw_dir) / MANIFEST_NAME)
+
+    def _key(self, pdf_path):
+        pdf_path = Path(pdf_path)
+        try:
+            return pdf_path.resolve().relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            return pdf_path.as_posix()
+
+    # Downloads
+
+    def known_urls(self):
+        """Set of report URLs that have already been downloaded."""
+        return {entry["url"] for entry in self.reports.values() if entry.get("url")}
+
+    def record_download(self, pdf_path, url=None, date=None):
+        """Record a report that is now on disk (size and hash are read from the file)."""
+        pdf_path = Path(pdf_path)
+        sha256 = file_sha256(pdf_path)
+        stat = pdf_path.stat()
+        with self._lock:
+            entry = self.reports.setdefault(self._key(pdf_path), {})
+            if entry.get("sha256") not in (None, sha256):
+                # The file changed, so any earlier parse result is stale
+                entry.pop("parse_status", None)
+            entry.update(
+                url=url or entry.get("url"),
+                date=date or entry.get("date") or pdf_path.stem,
+                size=stat.st_size,
+                mtime=stat.st_mtime,
+                sha256=sha256,
+                downloaded_at=entry.get("downloaded_at") or _now(),
+            )
+
+    def known_sha256(self, pdf_path):
+        """
+        The recorded SHA-256 of a report, or None when the file's size or
+        modification time no longer match what was recorded (or it was never hashed).
+        """
+        entry = self.reports.get(self._key(pdf_path))
+        if not entry or "sha256" not in entry:
+            return None
+        stat = Path(pdf_path).stat()
+        if entry.get("size") != stat.st_size or entry.get("mtime") != stat.st_mtime:
+            return None
+        return entry["sha256"]
+
+    # Parsing
+
+    def needs_parse(self, pdf_path):
+        """True if the report has never been parsed successfully (or has changed since)."""
+        entry = self.reports.get(self._key(pdf_path))
+        if not entry or entry.get("parse_status") != "parsed":
+            return True
+        return entry.get("size") != Path(pdf_path).stat().st_size
+
+    def record_parse(self, pdf_path, status, rows=0):
+        """Record the outcome of parsing a report ("parsed" or "failed")."""
+        pdf_path = Path(pdf_path)
+        with self._lock:
+            entry = self.reports.setdefault(self._key(pdf_path), {"date": pdf_path.stem})
+            entry["size"] = pdf_path.stat().st_size
+            entry.update(parse_status=status, rows=rows, parsed_at=_now())
+
+    # Persistence
+
+    def save(self):
+        """Write the manifest atomically (a crash never leaves a half-written file)."""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            data = {"version": MANIFEST_VERSION, "reports": self.reports}
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, self.path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
@@ -0,0 +1,294 @@
+"""
+metrics.py
+
+Per-stage timers and counters for the download and parse pipeline.
+
+Code records what it does with two calls:
+
+    with metrics.timer("pdf_open"):
+        ...
+    metrics.incr("rows_emitted", len(df))
+
+and everything recorded so far is sent to the configured sinks with
+metrics.flush() (the batch parser and the downloader flush at the end of a run).
+
+Sinks are chosen with the RICE_METRICS environment variable, a comma-separated
+list of:
+    log                  log a summary through the "rice_price_collector.metrics" logger
+    jsonl:<path>         append one JSON line per flush
+    prometheus:<path>    rewrite a Prometheus textfile-collector file (*.prom)
+
+e.g. RICE_METRICS="log,prometheus:/var/lib/node_exporter/rice.prom", or in code
+with metrics.configure([...]). Without any sink, metrics are still collected
+(metrics.snapshot()) but not written anywhere.
+
+Per-PDF profiling: set RICE_PROFILE to a folder and every parsed PDF leaves
+a cProfile dump there (<name>.prof, readable with pstats or snakeviz).
+
+Worker processes record into their own registry; the batch parser sends each
+PDF's metrics back with its result and merges them into the parent's.
+"""
+
+from collections import Counter
+import contextlib
+import contextvars
+import cProfile
+from datetime import datetime
+import json
+import logging
+import os
+from pathlib import Path
+import tempfile
+import threading
+import time
+
+METRICS_ENV = "RICE_METRICS"
+PROFILE_ENV = "RICE_PROFILE"
+
+PROMETHEUS_PREFIX = "rice_price_collector"
+
+logger = logging.getLogger("rice_price_collector.metrics")
+
+
+class Metrics:
+    """A thread-safe set of counters and timers."""
+
+    def __init__(self):
+        self.counters = Counter()
+        # name -> [count, total seconds, max seconds]
+        self.timers = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def observe(self, name, seconds):
+        with self._lock:
+            timer = self.timers.setdefault(name, [0, 0.0, 0.0])
+            timer[0] += 1
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+
+    @contextlib.contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        """Plain-dict copy: {"counters": {...}, "timers": {name: {count, total_s, max_s}}}."""
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "timers": {
+                    name: {"count": count, "total_s": total, "max_s": longest}
+                    for name, (count, total, longest) in self.timers.items()
+                },
+            }
+
+    def merge(self, snapshot):
+        """Add a snapshot (e.g. a worker's) to these metrics."""
+        with self._lock:
+            self.counters.update(snapshot.get("counters", {}))
+            for name, other in snapshot.get("timers", {}).items():
+                timer = self.timers.setdefault(name, [0, 0.0, 0.0])
+                timer[0] += other["count"]
+                timer[1] += other["total_s"]
+                timer[2] = max(timer[2], other["max_s"])
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.timers.clear()
+
+
+# The process-wide registry, and the one code is currently recording into
+REGISTRY = Metrics()
+_current = contextvars.ContextVar("rice_price_collector_metrics", default=REGISTRY)
+
+
+def current():
+    """The registry being recorded into (REGISTRY unless inside collect())."""
+    return _current.get()
+
+
+def incr(name, value=1):
+    """Add value to a counter."""
+    current().incr(name, value)
+
+
+def observe(name, seconds):
+    """Record one duration for a timer."""
+    current().observe(name, seconds)
+
+
+def timer(name):
+    """Context manager timing its block into the named timer."""
+    return current().timer(name)
+
+
+@contextlib.contextmanager
+def collect():
+    """
+    Record into a fresh Metrics object for the duration of the block and yield it.
+
+    Used around work whose metrics are shipped elsewhere (e.g. from a worker
+    process back to the parent), so they are counted exactly once.
+    """
+    local = Metrics()
+    token = _current.set(local)
+    try:
+        yield local
+    finally:
+        _current.reset(token)
+
+
+def merge(snapshot):
+    """Merge a snapshot (e.g. returned by a worker) into the process-wide registry."""
+    if snapshot:
+        REGISTRY.merge(snapshot)
+
+
+def snapshot():
+    """Everything recorded in this process so far."""
+    return REGISTRY.snapshot()
+
+
+def reset():
+    """Forget everything recorded so far (e.g. between runs of a long-lived service)."""
+    REGISTRY.reset()
+
+
+# Profiling
+
+@contextlib.contextmanager
+def profiled(name):
+    """
+    Profile the block with cProfile when RICE_PROFILE names a folder,
+    saving the stats as <RICE_PROFILE>/<name>.prof. A no-op otherwise.
+    """
+    folder = os.environ.get(PROFILE_ENV)
+    if not folder:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        Path(folder).mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(Path(folder) / f"{name}.prof"))
+
+
+# Sinks
+
+class LoggingSink:
+    """Log one summary line per counter and timer."""
+
+    def __init__(self, log=logger, level=logging.INFO):
+        self.log = log
+        self.level = level
+
+    def emit(self, data):
+        for name, value in sorted(data["counters"].items()):
+            self.log.log(self.level, "%s=%s", name, value)
+        for name, timer in sorted(data["timers"].items()):
+            self.log.log(
+                self.level, "%s: %d calls, %.3fs total, %.3fs max",
+                name, timer["count"], timer["total_s"], timer["max_s"],
+            )
+
+
+class JsonLinesSink:
+    """Append one JSON object per flush: {"time": ..., "counters": ..., "timers": ...}."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def emit(self, data):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        record = {"time": datetime.now().isoformat(timespec="seconds"), **data}
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, sort_keys=True) + "\n")
+
+
+class PrometheusTextfileSink:
+    """
+    Rewrite a file in the Prometheus text format, for node_exporter's textfile collector.
+
+    Counters become <prefix>_<name>_total; timers become
+    <prefix>_stage_seconds_{sum,count,max}{stage="<name>"}.
+    """
+
+    def __init__(self, path, prefix=PROMETHEUS_PREFIX):
+        self.path = Path(path)
+        self.prefix = prefix
+
+    def render(self, data):
+        lines = []
+        for name, value in sorted(data["counters"].items()):
+            metric = f"{self.prefix}_{name}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        if data["timers"]:
+            for suffix, key, kind in (("sum", "total_s", "counter"), ("count", "count", "counter"),
+                                      ("max", "max_s", "gauge")):
+                metric = f"{self.prefix}_stage_seconds_{suffix}"
+                lines.append(f"# TYPE {metric} {kind}")
+                for name, timer in sorted(data["timers"].items()):
+                    lines.append(f'{metric}{{stage="{name}"}} {timer[key]}')
+        return "\n".join(lines) + "\n"
+
+    def emit(self, data):
+        # Written atomically: the collector must never read half a file
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.render(data))
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def sinks_from_env(value=None):
+    """Build the sinks described by RICE_METRICS (or the given string)."""
+    value = os.environ.get(METRICS_ENV, "") if value is None else value
+    sinks = []
+    for spec in filter(None, (part.strip() for part in value.split(","))):
+        kind, _, target = spec.partition(":")
+        if kind == "log":
+            sinks.append(LoggingSink())
+        elif kind == "jsonl" and target:
+            sinks.append(JsonLinesSink(target))
+        elif kind == "prometheus" and target:
+            sinks.append(PrometheusTextfileSink(target))
+        else:
+            raise ValueError(f"Unknown {METRICS_ENV} sink {spec!r}")
+    return sinks
+
+
+_sinks = None
+
+
+def configure(sinks=None):
+    """
+    Use these sinks instead of the ones from RICE_METRICS.
+    An empty list disables output; None goes back to RICE_METRICS.
+    """
+    global _sinks
+    _sinks = None if sinks is None else list(sinks)
+
+
+def flush():
+    """Send everything recorded so far to the configured sinks."""
+    sinks = sinks_from_env() if _sinks is None else _sinks
+    if not sinks:
+        return
+    data = snapshot()
+    for sink in sinks:
+        sink.emit(data)
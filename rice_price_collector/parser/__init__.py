@@ -1,16 +1,33 @@
-
 """
 rice_price_collector.parser
 
 Parser subpackage for extracting and cleaning CBSL rice price data.
 Exposes main user-facing functions for easy import.
+
+Loaded lazily: pdfplumber and pandas are only imported when one of these is first used.
 """
 
+import importlib
 
-# Expose only the main user-facing API
-from .parser import process_year_folders_dict, parse_price_section
-from .columns import create_smart_column_names
-from .utils import extract_section_between, fix_missing_columns
+# Expose only the main user-facing API: {name: (module, attribute)}
+_LAZY_API = {
+    "process_year_folders_dict": (".parser", "process_year_folders_dict"),
+    "parse_price_section": (".parser", "parse_price_section"),
+    "create_smart_column_names": (".columns", "create_smart_column_names"),
+    "extract_section_between": (".utils", "extract_section_between"),
+    "fix_missing_columns": (".utils", "fix_missing_columns"),
+    "ParseCache": (".cache", "ParseCache"),
+    "extract_sections": (".sections", "extract_sections"),
+    "extract_sections_with_header": (".sections", "extract_sections_with_header"),
+    "extract_and_parse_sections": (".sections", "extract_and_parse_sections"),
+    "register_section": (".sections", "register_section"),
+    "iter_rice_rows": (".batch_extract", "iter_rice_rows"),
+    "write_csv_stream": (".writers", "write_csv_stream"),
+    "write_parquet_stream": (".writers", "write_parquet_stream"),
+    "write_parquet_dataset": (".writers", "write_parquet_dataset"),
+    "read_parquet_dataset": (".writers", "read_parquet_dataset"),
+    "to_tidy": (".tidy", "to_tidy"),
+}
 
 __all__ = [
     "process_year_folders_dict",
@@ -18,4 +35,28 @@ __all__ = [
     "create_smart_column_names",
     "extract_section_between",
     "fix_missing_columns",
+    "ParseCache",
+    "extract_sections",
+    "extract_sections_with_header",
+    "extract_and_parse_sections",
+    "register_section",
+    "iter_rice_rows",
+    "write_csv_stream",
+    "write_parquet_stream",
+    "write_parquet_dataset",
+    "read_parquet_dataset",
+    "to_tidy",
 ]
+
+
+def __getattr__(name):
+    if name not in _LAZY_API:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _LAZY_API[name]
+    value = getattr(importlib.import_module(module_name, __name__), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,90 @@
+"""
+align.py
+
+Puts each row's prices into the right price column, using where they sit on the page.
+
+A row with a price for every column (a "full" row, where "n.a." counts as a
+price) shows where the columns are: column n is at the median x position of
+the n-th price of the full rows. A row with empty cells has fewer prices, and
+each of them goes to the column nearest to it. So a row missing its wholesale
+prices keeps its retail prices in the retail columns, wherever the gap is.
+
+All rows of a section are placed with one vectorized assignment into a
+preallocated price matrix. Rows that cannot be placed by position (no
+positions, as for plain text lines; no full row in the section to find the
+columns from; two prices nearest the same column) are padded by length
+instead, the way fix_missing_columns does.
+"""
+
+import numpy as np
+
+
+def column_positions(price_xs, total_columns):
+    """
+    The x position of each price column: per column, the median position of
+    that price over the full rows. None when there is no full row with
+    positions, or the positions do not run left to right.
+    """
+    full = [
+        xs for xs in price_xs
+        if xs is not None and len(xs) == total_columns and not np.isnan(xs).any()
+    ]
+    if not full:
+        return None
+    positions = np.median(np.vstack(full), axis=0)
+    if total_columns > 1 and not (np.diff(positions) > 0).all():
+        return None
+    return positions
+
+
+def align_price_rows(price_rows, price_xs, total_columns, insert_position):
+    """
+    Place every row's prices in a (rows x columns) float matrix.
+
+    Parameters:
+        price_rows: One list of prices per row (None for "n.a.")
+        price_xs: One array of x positions per row, matching its prices
+            (NaN: unknown; None: the row has no positions)
+        total_columns: Price columns of the table
+        insert_position: Where rows placed by length get their missing columns
+
+    Returns a matrix with at least total_columns columns (more when a row has
+    more prices); cells without a price are NaN.
+    """
+    lengths = np.fromiter(map(len, price_rows), dtype=np.int64, count=len(price_rows))
+    if len(price_rows) and (lengths == total_columns).all():
+        # Every row is full (the usual case): nothing to place
+        return np.array(price_rows, dtype=float)
+
+    width = max(total_columns, int(lengths.max(initial=0)))
+    matrix = np.full((len(price_rows), width), np.nan)
+    if not lengths.sum():
+        return matrix
+
+    # One entry per price: its row, its place within the row, its value and position
+    rows = np.repeat(np.arange(len(price_rows)), lengths)
+    places = np.arange(len(rows)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    values = np.array([price for prices in price_rows for price in prices], dtype=float)
+
+    # By length: missing columns go in at insert_position (see fix_missing_columns)
+    missing = np.maximum(total_columns - lengths, 0)[rows]
+    columns = places + missing * (places >= np.minimum(insert_position, lengths[rows]))
+
+    short = lengths < total_columns
+    positions = column_positions(price_xs, total_columns) if short.any() else None
+    if positions is not None:
+        xs = np.concatenate([
+            np.full(length, np.nan) if row_xs is None else row_xs
+            for row_xs, length in zip(price_xs, lengths)
+        ])
+        # By position: the nearest column, for short rows whose prices all have a position
+        nearest = np.abs(xs[:, None] - positions[None, :]).argmin(axis=1)
+        placeable = short.copy()
+        placeable[rows[np.isnan(xs)]] = False
+        # Two prices of a row in the same column (or out of order): place it by length
+        same_row = rows[1:] == rows[:-1]
+        placeable[rows[1:][same_row & (np.diff(nearest) <= 0)]] = False
+        columns = np.where(placeable[rows], nearest, columns)
+
+    matrix[rows, columns] = values
+    return matrix
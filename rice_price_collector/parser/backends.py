@@ -0,0 +1,141 @@
+"""
+backends.py
+
+Pluggable backends that read the characters (text and position) of PDF pages.
+
+The parser only needs each char's text, its left edge and its top; how they are
+read is up to the backend:
+    - "pdfium": pypdfium2's text page, read in C. About ten times faster than
+      pdfplumber, and the default
+    - "pdfplumber": pdfplumber's chars, a Python dict per glyph. Slower, but it
+      is what the parser was built on, so it is the fallback when the fast path's
+      output does not look right (see extractors/rice.py)
+
+A backend is any object with a name and a read_pages(pdf_path, page_nums) method
+returning one PageChars per (1-based) page number. pdf_path may be a
+pages.OpenPdf, a PDF the caller already has open (os.fspath gives its path). Register new ones with
+register_backend(); parser/config.py's EXTRACTION_BACKENDS sets the order they
+are tried in.
+"""
+
+import os
+from typing import List, NamedTuple, Protocol
+
+import numpy as np
+import pdfplumber
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+
+from .pages import OpenPdf
+
+
+class PageChars(NamedTuple):
+    """The chars of one page as arrays: distance from the page top, left edge and text."""
+
+    tops: np.ndarray
+    x0s: np.ndarray
+    texts: list
+
+
+def page_chars_from_dicts(chars):
+    """PageChars of a list of pdfplumber-style char dicts (one pass over the dicts)."""
+    count = len(chars)
+    return PageChars(
+        np.fromiter((c["top"] for c in chars), dtype=float, count=count),
+        np.fromiter((c["x0"] for c in chars), dtype=float, count=count),
+        [c["text"] for c in chars],
+    )
+
+
+class ExtractionBackend(Protocol):
+    name: str
+
+    def read_pages(self, pdf_path, page_nums) -> List[PageChars]:
+        ...
+
+
+class PdfplumberBackend:
+    """Chars as pdfplumber lays them out (pdfminer under the hood)."""
+
+    name = "pdfplumber"
+
+    def read_pages(self, pdf_path, page_nums):
+        with pdfplumber.open(os.fspath(pdf_path)) as pdf:
+            pages_chars = [pdf.pages[page_num - 1].chars for page_num in page_nums]
+        return [page_chars_from_dicts(chars) for chars in pages_chars]
+
+
+class PdfiumBackend:
+    """
+    Chars from pdfium's text page.
+
+    Chars pdfium makes up itself (spaces between text runs, line breaks) are
+    dropped, so lines come out the way pdfplumber builds them. Each char's top
+    is taken from its font box, which is the same for every char of a line.
+    """
+
+    name = "pdfium"
+
+    def read_pages(self, pdf_path, page_nums):
+        if isinstance(pdf_path, OpenPdf):
+            # Already open (e.g. to locate the section): reuse its pages and text pages
+            return [self._read_page(*pdf_path.page(page_num - 1)) for page_num in page_nums]
+        pdf = pdfium.PdfDocument(str(pdf_path))
+        try:
+            pages_chars = []
+            for page_num in page_nums:
+                page = pdf[page_num - 1]
+                textpage = page.get_textpage()
+                try:
+                    pages_chars.append(self._read_page(page, textpage))
+                finally:
+                    textpage.close()
+                    page.close()
+            return pages_chars
+        finally:
+            pdf.close()
+
+    @staticmethod
+    def _read_page(page, textpage):
+        height = page.get_height()
+        count = textpage.count_chars()
+        text = textpage.get_text_range(0, count) if count else ""
+        if len(text) != count:
+            # Chars outside the BMP shift text offsets; let the fallback handle the page
+            raise ValueError(f"pdfium returned {len(text)} characters for {count} chars")
+
+        tops, x0s, texts = [], [], []
+        for index in range(count):
+            if pdfium_c.FPDFText_IsGenerated(textpage, index) == 1:
+                continue
+            left, _, _, top = textpage.get_charbox(index, loose=True)
+            tops.append(height - top)
+            x0s.append(left)
+            texts.append(text[index])
+        return PageChars(np.asarray(tops, dtype=float), np.asarray(x0s, dtype=float), texts)
+
+
+# Known backends by name
+BACKENDS = {}
+
+
+def register_backend(backend):
+    """Make a backend available by its name (replaces one of the same name)."""
+    BACKENDS[backend.name] = backend
+    return backend
+
+
+def get_backend(backend):
+    """Return a backend given its name or the backend itself."""
+    if isinstance(backend, str):
+        try:
+            return BACKENDS[backend]
+        except KeyError:
+            raise ValueError(
+                f"Unknown extraction backend {backend!r}; use one of {sorted(BACKENDS)}"
+            ) from None
+    return backend
+
+
+register_backend(PdfiumBackend())
+register_backend(PdfplumberBackend())
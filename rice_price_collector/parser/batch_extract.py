@@ -7,29 +7,241 @@ Usage:
     python -m rice_price_collector.parser.batch_extract 2025 2024 2023
 
 This will look inside:
-    ../data/raw/2025/
-    ../data/raw/2024/
-    ../data/raw/2023/
+    data/raw/2025/
+    data/raw/2024/
+    data/raw/2023/
 
 and extract the "RICE" section from every PDF found in each folder.
-Each year's results are saved as CSV, and a combined file is created.
+Each year's results are saved as CSV in data/processed/. It is the same as
+"rice-price-collector parse 2025 2024 2023" and takes the same options
+(--workers, --format, --cache-dir, --incremental, ...; see cli.py).
 """
 
+import multiprocessing
+import os
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import starmap
 from pathlib import Path
 from datetime import datetime
 import pandas as pd
 
+from .. import metrics
+from ..store import PriceStore
+
 # Local import (your extractor function)
+from .config import DEFAULT_END_WORD, DEFAULT_PAGE_NUMBER, DEFAULT_START_WORD, OUTPUT_FORMATS
 from .extractors.rice import extract_and_parse_rice
+from .writers import write_parquet_dataset
+
+# Arguments passed to the extractor (also part of the parse cache key)
+EXTRACT_PARAMS = {
+    "start_word": DEFAULT_START_WORD,
+    "end_word": DEFAULT_END_WORD,
+    "page_number": DEFAULT_PAGE_NUMBER,
+}
+
+# Where process_year_folder puts the "parquet" and "sqlite" outputs
+PARQUET_DATASET_NAME = "rice_prices"
+SQLITE_STORE_NAME = "rice_prices.sqlite"
+
+# How many parsed-but-not-yet-consumed PDFs may be queued per worker.
+# Keeps memory bounded when results are streamed to a slow consumer.
+PREFETCH_PER_WORKER = 4
+
+
+# Function to parse a single PDF (runs inside worker processes)
+
+def _parse_pdf(pdf_path, sha256=None, cache=None):
+    """
+    Parse one PDF and return (DataFrame, error_message, metrics_snapshot).
+
+    Errors are returned instead of raised so that one bad file never
+    tears down the whole process pool. When a ParseCache is given,
+    unchanged PDFs are loaded from it instead of being parsed again; the
+    PDF is hashed once for both the lookup and the store, or not at all
+    when its sha256 is already known (from the manifest).
+
+    The stage timings recorded while parsing travel back with the result
+    (worker processes have their own metrics registry), and the PDF is
+    profiled when RICE_PROFILE is set.
+    """
+    with metrics.collect() as recorded:
+        df, error = _parse_pdf_timed(pdf_path, cache, sha256)
+    return df, error, recorded.snapshot()
+
+
+def _parse_pdf_timed(pdf_path, cache, sha256=None):
+    try:
+        with metrics.timer("parse_pdf"), metrics.profiled(Path(pdf_path).stem):
+            if cache is not None:
+                key = cache.key(pdf_path, sha256=sha256, **EXTRACT_PARAMS)
+                df = cache.get(pdf_path, key=key)
+                if df is not None:
+                    metrics.incr("parse_cache_hits")
+                    return df, None
+
+            df = extract_and_parse_rice(str(pdf_path), **EXTRACT_PARAMS)
+
+            if cache is not None:
+                cache.put(pdf_path, df, key=key)
+            return df, None
+    except Exception as e:
+        return None, str(e)
+
+
+def _ordered_map(executor, func, items, window):
+    """
+    Like itertools.starmap on an executor, but never has more than `window`
+    results in flight, so a slow consumer does not make finished DataFrames
+    pile up in memory.
+    """
+    pending = deque()
+    for args in items:
+        pending.append(executor.submit(func, *args))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def new_process_pool(workers):
+    """
+    A process pool for parsing, whose workers are not forked from this process.
+
+    Forking a process that runs other threads (such as the per-year threads
+    of process_year_folders_dict) can leave a child stuck on a lock another
+    thread held. Where available, workers are started by a "forkserver"
+    instead: a clean single-threaded process that has already imported the
+    parser, so starting a worker stays cheap.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(max_workers=workers)
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([__name__])
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+
+def _iter_parsed(pdf_files, workers=None, executor=None, cache=None, hashes=None):
+    """
+    Yield (DataFrame, error_message, metrics_snapshot) for each PDF, in the same order as pdf_files.
+
+    Uses the given executor, or a fresh process pool when workers > 1,
+    and falls back to parsing serially in this process otherwise.
+    hashes optionally maps PDFs to their known sha256, for the parse cache.
+    """
+    parse = partial(_parse_pdf, cache=cache)
+    jobs = [(pdf_path, (hashes or {}).get(pdf_path)) for pdf_path in pdf_files]
+    if executor is not None:
+        window = PREFETCH_PER_WORKER * (workers or os.cpu_count() or 1)
+        yield from _ordered_map(executor, parse, jobs, window)
+    elif workers and workers > 1:
+        with new_process_pool(workers) as pool:
+            yield from _ordered_map(pool, parse, jobs, PREFETCH_PER_WORKER * workers)
+    else:
+        yield from starmap(parse, jobs)
+
+
+def _iter_report_frames(pdf_files, workers=None, executor=None, cache=None, manifest=None):
+    """
+    Yield (pdf_path, DataFrame) for every PDF that produced rows, in date order.
+
+    Each DataFrame gets a "date" column taken from the filename. Progress and
+    failures are printed, and recorded in the manifest when one is given.
+    Each PDF's metrics are merged into this process's registry.
+    """
+    hashes = None
+    if cache is not None and manifest is not None:
+        # Reuse the hashes recorded at download time instead of hashing the PDFs again
+        hashes = {pdf_path: manifest.known_sha256(pdf_path) for pdf_path in pdf_files}
+    results = _iter_parsed(
+        pdf_files, workers=workers, executor=executor, cache=cache, hashes=hashes
+    )
+    for idx, (pdf_path, (df, error, recorded)) in enumerate(zip(pdf_files, results), start=1):
+        print(f"[{idx}/{len(pdf_files)}] → {pdf_path.name}")
+        metrics.merge(recorded)
+        if error is not None:
+            print(f"Failed to parse {pdf_path.name}: {error}")
+            metrics.incr("pdfs_parse_failed")
+        else:
+            metrics.incr("pdfs_parsed")
+            metrics.incr("rows_emitted", len(df))
+            if df.empty:
+                print("No 'RICE' section data found.")
+
+        if manifest is not None:
+            status = "failed" if error is not None else "parsed"
+            manifest.record_parse(pdf_path, status, rows=0 if df is None else len(df))
+
+        if error is None and not df.empty:
+            # Add the date (from filename) for tracking
+            df.insert(0, "date", pdf_path.stem)
+            yield pdf_path, df
+
+
+# Streaming API
+
+def iter_rice_rows(year_folder_dict, workers=None, cache=None, as_records=False):
+    """
+    Stream parsed rows for every report in the given year folders.
+
+    Yields one small DataFrame per report (with a "date" column) as soon as it
+    is parsed, in date order, so whole archives can be exported without ever
+    holding the full dataset in memory.
+
+    Parameters:
+        year_folder_dict: {"2023": "/path/to/2023", ...}
+        workers: Number of worker processes (None or 1 parses serially)
+        cache: Optional ParseCache so unchanged PDFs are not parsed again
+        as_records: Yield one dict per row instead of one DataFrame per report
+
+    Example:
+        write_csv_stream(iter_rice_rows(folders, workers=8), "rice_prices.csv")
+    """
+    pdf_files = []
+    for year, folder in year_folder_dict.items():
+        folder_path = Path(folder)
+        if not folder_path.exists():
+            print(f"Folder not found: {folder_path}")
+            continue
+        pdf_files.extend(sorted(folder_path.glob("*.pdf")))
+
+    for _, df in _iter_report_frames(pdf_files, workers=workers, cache=cache):
+        if as_records:
+            yield from df.to_dict("records")
+        else:
+            yield df
 
 
 # Function to process a single year's folder
 
-def process_year_folder(year_folder: Path, output_dir: Path):
+def process_year_folder(year_folder: Path, output_dir: Path, workers=None, executor=None,
+                        cache=None, manifest=None, output_format="csv"):
     """
     Process all PDFs within a given year's folder and save the combined CSV.
+
+    Parameters:
+        year_folder: Folder containing the year's PDFs (named YYYY-MM-DD.pdf)
+        output_dir: Where to write rice_prices_<year>.csv
+        workers: Number of worker processes (None or 1 parses serially)
+        executor: Optional shared executor; takes precedence over workers
+            (workers then only sizes how many files are queued on it)
+        cache: Optional ParseCache so unchanged PDFs are not parsed again
+        manifest: Optional Manifest for incremental runs. Only reports not yet
+            parsed are processed, and their rows are appended to the existing CSV.
+            Returns just the new rows in that case.
+        output_format: "csv" writes rice_prices_<year>.csv; "parquet" adds the rows to
+            the output_dir/rice_prices/ dataset, partitioned by year and month;
+            "sqlite" upserts them into the output_dir/rice_prices.sqlite PriceStore
+
+    Results are always combined in filename (date) order, whatever order
+    the workers finish in.
     """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format {output_format!r}; use one of {OUTPUT_FORMATS}")
+
     print(f"\nProcessing year {year_folder.name} ...")
 
     pdf_files = sorted(year_folder.glob("*.pdf"))
@@ -37,27 +249,91 @@ def process_year_folder(year_folder: Path, output_dir: Path):
         print(f"No PDFs found in {year_folder}")
         return None
 
-    all_dfs = []
-    for idx, pdf_path in enumerate(pdf_files, start=1):
-        print(f"[{idx}/{len(pdf_files)}] → {pdf_path.name}")
-        try:
-            df = extract_and_parse_rice(str(pdf_path))
-            if not df.empty:
-                # Add the date (from filename) for tracking
-                df.insert(0, "date", pdf_path.stem)
-                all_dfs.append(df)
-            else:
-                print("No 'RICE' section data found.")
-        except Exception as e:
-            print(f"Failed to parse {pdf_path.name}: {e}")
+    output_file = output_dir / f"rice_prices_{year_folder.name}.csv"
+    append = manifest is not None and output_file.exists()
+    if manifest is not None:
+        pdf_files = _select_new_reports(pdf_files, output_file, manifest)
+        if not pdf_files:
+            print(f"No new reports to parse for {year_folder.name}")
+            manifest.save()
+            return None
+
+    all_dfs = [
+        df
+        for _, df in _iter_report_frames(
+            pdf_files, workers=workers, executor=executor, cache=cache, manifest=manifest
+        )
+    ]
+
+    if manifest is not None:
+        manifest.save()
 
     if not all_dfs:
         print(f"No usable data extracted for {year_folder.name}")
         return None
 
-    # Combine and save
-    df_year = pd.concat(all_dfs, ignore_index=True)
-    output_file = output_dir / f"rice_prices_{year_folder.name}.csv"
-    df_year.to_csv(output_file, index=False)
-    print(f"Saved {len(df_year)} rows → {output_file.resolve()}")
+    # Combine and save (or append only the new rows in incremental mode)
+    with metrics.timer("concat"):
+        df_year = pd.concat(all_dfs, ignore_index=True)
+    with metrics.timer(f"write_{output_format}"):
+        if output_format == "parquet":
+            # The dataset replaces days it already has, so appending needs no special case
+            write_parquet_dataset([df_year], output_dir / PARQUET_DATASET_NAME)
+        elif output_format == "sqlite":
+            # Upserts replace days already stored, so appending needs no special case either
+            with PriceStore(output_dir / SQLITE_STORE_NAME) as store:
+                prices = store.load(df_year)
+            print(f"Stored {prices} prices → {(output_dir / SQLITE_STORE_NAME).resolve()}")
+        elif append:
+            _append_csv(df_year, output_file)
+            print(f"Appended {len(df_year)} rows → {output_file.resolve()}")
+        else:
+            df_year.to_csv(output_file, index=False)
+            print(f"Saved {len(df_year)} rows → {output_file.resolve()}")
     return df_year
+
+
+def _append_csv(df, output_file):
+    """
+    Append rows to an existing CSV, in the columns of its header.
+
+    Reports of a layout with an extra market bring columns the file does not
+    have yet. The file is then rewritten with those columns added (empty for
+    the rows already there), so every row still matches the header.
+    """
+    columns = list(pd.read_csv(output_file, nrows=0).columns)
+    new_columns = [col for col in df.columns if col not in columns]
+    if new_columns:
+        existing = pd.read_csv(output_file)
+        combined = pd.concat([existing, df], ignore_index=True)
+        combined.reindex(columns=columns + new_columns).to_csv(output_file, index=False)
+    else:
+        df.reindex(columns=columns).to_csv(output_file, mode="a", header=False, index=False)
+
+
+def _select_new_reports(pdf_files, output_file, manifest):
+    """
+    Return the PDFs that still need parsing according to the manifest.
+
+    Reports whose date is already in the existing CSV (e.g. written by a full run
+    before the manifest existed) are marked as parsed instead of parsed twice.
+    """
+    existing_dates = set()
+    if output_file.exists():
+        existing_dates = set(pd.read_csv(output_file, usecols=["date"])["date"].astype(str))
+
+    new_files = []
+    for pdf_path in pdf_files:
+        if not manifest.needs_parse(pdf_path):
+            continue
+        if pdf_path.stem in existing_dates:
+            manifest.record_parse(pdf_path, "parsed")
+            continue
+        new_files.append(pdf_path)
+    return new_files
+
+
+if __name__ == "__main__":
+    from ..cli import main
+
+    sys.exit(main(["parse", *sys.argv[1:]]))
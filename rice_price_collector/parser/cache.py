@@ -0,0 +1,190 @@
+"""
+cache.py
+
+Persistent on-disk cache of parsed price tables.
+
+CBSL price reports never change once they are published, so a PDF only has
+to be parsed once. Each entry is keyed by:
+    - the SHA-256 of the PDF's bytes (renamed or re-downloaded files still hit)
+    - PARSER_VERSION (bump it whenever parsing output changes)
+    - the extraction arguments (start_word, end_word, page_number)
+
+Entries are stored as Parquet files, so pyarrow must be installed:
+    pip install "rice_price_collector[parquet]"
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+from pathlib import Path
+import tempfile
+import time
+
+import pandas as pd
+
+from ..manifest import file_sha256
+from .config import PARSER_VERSION
+
+
+class ParseCache:
+    """
+    Content-addressed cache of DataFrames returned by extract_and_parse_rice.
+
+    Parameters:
+        cache_dir: Folder where cache entries are stored
+        max_bytes: Optional total size limit applied by evict()
+        max_age: Optional age limit in seconds applied by evict()
+
+    Example:
+        cache = ParseCache("data/cache")
+        df = process_year_folders_dict(folders, cache=cache)
+    """
+
+    suffix = ".parquet"
+
+    def __init__(self, cache_dir, max_bytes=None, max_age=None):
+        if importlib.util.find_spec("pyarrow") is None:
+            raise ImportError(
+                "ParseCache stores Parquet files and needs pyarrow: "
+                'pip install "rice_price_collector[parquet]"'
+            )
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    # Keys and paths
+
+    def key(self, pdf_path, sha256=None, **params):
+        """
+        Build the cache key for a PDF and the extraction arguments used on it.
+
+        sha256 is the PDF's hash when the caller already knows it (e.g. from
+        the manifest); otherwise the file is read and hashed.
+        """
+        if sha256 is None:
+            sha256 = file_sha256(pdf_path)
+        payload = json.dumps(
+            {"sha256": sha256, "version": PARSER_VERSION, "params": params},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key):
+        # Two-level fan-out keeps directories small for multi-year archives
+        return self.cache_dir / key[:2] / f"{key}{self.suffix}"
+
+    def _entries(self):
+        if not self.cache_dir.exists():
+            return []
+        return list(self.cache_dir.glob(f"*/*{self.suffix}"))
+
+    # Reading and writing
+
+    def get(self, pdf_path, key=None, **params):
+        """
+        Return the cached DataFrame for this PDF, or None on a cache miss.
+
+        Pass the key from key() to skip hashing the PDF again (e.g. when the
+        same key is then used to put() the parsed table on a miss).
+        """
+        if key is None:
+            key = self.key(pdf_path, **params)
+        entry = self._entry_path(key)
+        try:
+            df = pd.read_parquet(entry)
+        except FileNotFoundError:
+            return None
+        # Refresh the timestamp so size-based eviction drops the least recently used
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return df
+
+    def put(self, pdf_path, df, key=None, **params):
+        """Store a parsed DataFrame for this PDF (key: as for get())."""
+        if key is None:
+            key = self.key(pdf_path, **params)
+        entry = self._entry_path(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temp file first so concurrent workers never see half an entry
+        fd, tmp_path = tempfile.mkstemp(dir=entry.parent, suffix=".tmp")
+        os.close(fd)
+        try:
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, entry)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    # Housekeeping
+
+    def invalidate(self, pdf_path=None, **params):
+        """
+        Remove cache entries.
+
+        With pdf_path, removes only that PDF's entry for the given arguments.
+        Without it, clears the whole cache. Returns the number of entries removed.
+        """
+        if pdf_path is not None:
+            entries = [self._entry_path(self.key(pdf_path, **params))]
+        else:
+            entries = self._entries()
+
+        removed = 0
+        for entry in entries:
+            try:
+                entry.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def evict(self, max_bytes=None, max_age=None):
+        """
+        Drop entries older than max_age seconds, then the least recently used
+        entries until the cache fits in max_bytes.
+
+        Limits default to the ones given to the constructor.
+        Returns the number of entries removed.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        max_age = self.max_age if max_age is None else max_age
+
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        entries.sort()  # oldest first
+
+        to_remove = []
+        if max_age is not None:
+            cutoff = time.time() - max_age
+            to_remove = [e for e in entries if e[0] < cutoff]
+            entries = [e for e in entries if e[0] >= cutoff]
+
+        if max_bytes is not None:
+            total = sum(size for _, size, _ in entries)
+            for e in entries:
+                if total <= max_bytes:
+                    break
+                to_remove.append(e)
+                total -= e[1]
+
+        removed = 0
+        for _, _, entry in to_remove:
+            try:
+                entry.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def size_bytes(self):
+        """Total size of all cache entries on disk."""
+        return sum(entry.stat().st_size for entry in self._entries())
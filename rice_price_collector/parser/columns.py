@@ -1,56 +1,272 @@
-def create_smart_column_names(section_lines):
+"""
+columns.py
+
+Works out which markets a report's price table has, and names its columns.
+
+The header at the top of the price page lists the markets, left to right:
+
+    Wholesale Prices          Retail Prices
+    Pettah    Dambulla        Pettah    Dambulla    Narahenpita
+
+A section can name a market of its own in a sub-header, right below its title.
+The RICE section does: its wholesale prices come from Marandagahamula, the
+rice market, instead of Dambulla:
+
+    R I C E
+              Marandagahamula
+
+So the usual rice layout has wholesale Pettah and Marandagahamula, and retail
+Pettah, Dambulla and Narahenpita (10 price columns). Some reports leave out a
+market (8 columns), and a new market may appear. Each report's header block
+(page header plus section sub-header) is fingerprinted, and the layout
+resolved for a fingerprint is cached, so thousands of reports printed from the
+same template only detect it once. A layout not seen before in this process is
+counted in the "layouts_detected" metric, and printed when its markets are not
+the default ones.
+"""
+
+from collections import OrderedDict
+import hashlib
+import re
+from typing import NamedTuple
+
+from .. import metrics
+from .config import (
+    DEFAULT_RETAIL_MARKETS,
+    DEFAULT_WHOLESALE_MARKETS,
+    HEADER_WORDS,
+    RETAIL_ONLY_MARKETS,
+)
+
+# Words of a header line: "Pettah", "PETTAH", also when glued together ("PettahDambulla")
+_WORD = re.compile(r"[A-Z][a-z]+|[A-Z]{2,}(?![a-z])")
+
+_NOT_LETTERS = re.compile(r"[^a-z]+")
+
+
+class Layout(NamedTuple):
+    """The markets of a price table, left to right, and the fingerprint they were found under."""
+
+    fingerprint: str
+    wholesale: tuple
+    retail: tuple
+
+    @property
+    def price_columns(self):
+        """<channel>_<market>_<day> names, in table order."""
+        names = []
+        for channel, markets in (("wholesale", self.wholesale), ("retail", self.retail)):
+            for market in markets:
+                names.append(f"{channel}_{market}_yesterday")
+                names.append(f"{channel}_{market}_today")
+        return names
+
+    @property
+    def columns(self):
+        return ["item", "unit"] + self.price_columns
+
+
+DEFAULT_LAYOUT = Layout("default", DEFAULT_WHOLESALE_MARKETS, DEFAULT_RETAIL_MARKETS)
+
+# Market names a header line is recognised by
+KNOWN_MARKETS = set(DEFAULT_WHOLESALE_MARKETS + DEFAULT_RETAIL_MARKETS)
+
+# Layouts remembered per process (least recently used forgotten first)
+MAX_CACHED_LAYOUTS = 256
+
+# {fingerprint: Layout}, per process
+_layout_cache = OrderedDict()
+
+
+def header_block(lines):
+    """
+    The lines of a header block: those naming a known market or a price channel.
+
+    Lines with digits (the dated page title, price rows) are left out, so
+    every report printed from the same template has the same header block.
+    """
+    keywords = KNOWN_MARKETS | {"wholesale", "retail"}
+    block = []
+    for line in lines:
+        if any(char.isdigit() for char in line):
+            continue
+        letters = _NOT_LETTERS.sub("", line.lower())
+        if any(keyword in letters for keyword in keywords):
+            block.append(letters)
+    return block
+
+
+def layout_fingerprint(block):
+    """A short, stable id of a header block (see header_block)."""
+    return hashlib.sha1("\n".join(block).encode("utf-8")).hexdigest()[:12]
+
+
+def section_subheaders(section_lines):
+    """
+    The sub-header lines of a section: lines before its first price row that
+    name known markets and nothing else (e.g. "Marandagahamula" below "R I C E").
+    """
+    subheaders = []
+    for line in section_lines:
+        if "Rs." in line or any(char.isdigit() for char in line):
+            break
+        words = [word.lower() for word in _WORD.findall(line)]
+        if words and all(word in KNOWN_MARKETS for word in words):
+            subheaders.append(line)
+    return subheaders
+
+
+def detect_layout(lines, section_lines=()):
+    """
+    Return the Layout of a report, given the lines of its header block.
+
+    Parameters:
+        lines: Text lines holding the table header (e.g. the lines above the
+            RICE header; section lines work too, they just rarely name markets)
+        section_lines: Lines of the section itself, whose sub-header (see
+            section_subheaders) overrides markets of the page header
+
+    Returns the cached Layout for the header's fingerprint, detecting it the
+    first time. DEFAULT_LAYOUT is returned when no markets are found.
+    """
+    subheaders = section_subheaders(section_lines)
+    block = header_block(lines) + [f"section:{letters}" for letters in header_block(subheaders)]
+    if not block:
+        return DEFAULT_LAYOUT
+
+    fingerprint = layout_fingerprint(block)
+    layout = _layout_cache.get(fingerprint)
+    if layout is None:
+        layout = _resolve_layout(fingerprint, lines, subheaders)
+        _layout_cache[fingerprint] = layout
+        while len(_layout_cache) > MAX_CACHED_LAYOUTS:
+            _layout_cache.popitem(last=False)
+        if layout is not DEFAULT_LAYOUT:
+            _report_new_layout(layout)
+    _layout_cache.move_to_end(fingerprint)
+    return layout
+
+
+def _market_words(line):
+    """(market, x) for each market word of a line; x is None for lines without positions."""
+    x0s = getattr(line, "x0s", None)
+    return [
+        (match.group().lower(), None if x0s is None else float(x0s[match.start()]))
+        for match in _WORD.finditer(line)
+        if match.group().lower() not in HEADER_WORDS
+    ]
+
+
+def _known_count(words):
+    return sum(market in KNOWN_MARKETS for market, _ in words)
+
+
+def _resolve_layout(fingerprint, lines, subheaders=()):
+    """
+    Read the markets off the header line that names the most known markets,
+    then put in the markets of the section's sub-header.
+    """
+    best = []
+    for line in lines:
+        words = _market_words(line)
+        if _known_count(words) > _known_count(best):
+            best = words
+
+    # One market on its own (e.g. the "Marandagahamula" sub-header) is not a header
+    wholesale, retail = _split_channels(best) if len(best) >= 2 else ([], [])
+    found = bool(wholesale and retail)
+    if not found:
+        wholesale = [(market, None) for market in DEFAULT_WHOLESALE_MARKETS]
+        retail = [(market, None) for market in DEFAULT_RETAIL_MARKETS]
+
+    for line in subheaders:
+        for market, x in _market_words(line):
+            _replace_market(wholesale, retail, market, x)
+
+    layout = Layout(fingerprint, tuple(m for m, _ in wholesale), tuple(m for m, _ in retail))
+    default_markets = (DEFAULT_LAYOUT.wholesale, DEFAULT_LAYOUT.retail)
+    if not found and (layout.wholesale, layout.retail) == default_markets:
+        return DEFAULT_LAYOUT
+    return layout
+
+
+def _split_channels(markets):
+    """
+    Split the (market, x) words of a header line into wholesale and retail.
+
+    Wholesale markets come first; the retail group starts at the first market
+    named a second time (e.g. Pettah) or at the first retail-only market.
+    """
+    names = [market for market, _ in markets]
+    for index, market in enumerate(names):
+        if index and (market in names[:index] or market in RETAIL_ONLY_MARKETS):
+            return list(markets[:index]), list(markets[index:])
+    return list(markets), []
+
+
+def _replace_market(wholesale, retail, market, x):
+    """
+    Put a sub-header market in place of the header market it stands under
+    (the nearest one by position), or, without positions, in place of the
+    last wholesale market after the first. Markets already there stay.
+    """
+    if market in [m for m, _ in wholesale]:
+        return
+    placed = [
+        (abs(header_x - x), group, index)
+        for group in (wholesale, retail)
+        for index, (_, header_x) in enumerate(group)
+        if x is not None and header_x is not None
+    ]
+    if placed:
+        _, group, index = min(placed, key=lambda entry: entry[0])
+        group[index] = (market, x)
+    elif len(wholesale) > 1:
+        wholesale[-1] = (market, x)
+    else:
+        wholesale.append((market, x))
+
+
+def _report_new_layout(layout):
+    metrics.incr("layouts_detected")
+    new_markets = sorted(set(layout.wholesale + layout.retail) - KNOWN_MARKETS)
+    if new_markets:
+        metrics.incr("layouts_with_new_markets")
+    if (layout.wholesale, layout.retail) != (DEFAULT_LAYOUT.wholesale, DEFAULT_LAYOUT.retail):
+        message = (f"New report layout {layout.fingerprint}: wholesale {', '.join(layout.wholesale)}; "
+                   f"retail {', '.join(layout.retail)}")
+        if new_markets:
+            message += f" (new markets: {', '.join(new_markets)})"
+        print(message)
+
+
+def create_smart_column_names(section_lines, header_lines=None):
     """
     Creates meaningful column names based on what locations are in the data.
-    
+
     Why? The data has prices from different markets and different days.
     Instead of "Col1, Col2, Col3...", we want names like:
         "wholesale_pettah_yesterday", "wholesale_pettah_today", etc.
-    
+
     How it works:
-        1. Looks at the first 50 lines to see what locations are mentioned
-        2. Checks if "Marandagahamula" market exists
+        1. Looks at the header lines (or, without them, the first 50 section
+           lines) and the section's own sub-header for market names
+        2. Works out the wholesale and retail markets, left to right (see detect_layout)
         3. Creates column names for each location and day
-    
-    Typical structure:
-        - Wholesale markets: Pettah, Dambulla (sometimes Marandagahamula)
+
+    Typical structure (RICE):
+        - Wholesale markets: Pettah, Marandagahamula (from the section sub-header)
         - Retail markets: Pettah, Dambulla, Narahenpita
         - Each location has: Yesterday's price + Today's price
-    
+
     Parameters:
         section_lines: List of text lines from the document
-    
+        header_lines: Lines of the table header above the section, if known
+
     Returns:
         List of column names like:
-            ["item", "unit", "wholesale_pettah_yesterday", 
+            ["item", "unit", "wholesale_pettah_yesterday",
              "wholesale_pettah_today", ...]
     """
-    
-    # Combine first 50 lines to search for location names
-    # We only check the beginning because location names appear at the top
-    first_50_lines = section_lines[:50]
-    combined_text = " ".join(first_50_lines).lower()
-
-    # Start with basic columns
-    column_names = ["item", "unit"]
-
-    # Define default locations
-    # These are the markets where wholesale prices come from
-    wholesale_locations = ["pettah", "marandagahamula"]
-    
-    # These are the markets where retail (customer) prices come from
-    retail_locations = ["pettah", "dambulla", "narahenpita"]
-
-    # Build wholesale column names
-    # For each wholesale market, add yesterday and today columns
-    for location in wholesale_locations:
-        column_names.append(f"wholesale_{location}_yesterday")
-        column_names.append(f"wholesale_{location}_today")
-    
-    
-    # Build retail column names
-    # For each retail market, add yesterday and today columns
-    for location in retail_locations:
-        column_names.append(f"retail_{location}_yesterday")
-        column_names.append(f"retail_{location}_today")
-    
-    return column_names
+    lines = section_lines[:50] if header_lines is None else header_lines
+    return detect_layout(lines, section_lines).columns
@@ -1,13 +1,36 @@
 from ..config import BASE_DIR, RAW_DATA_DIR, PROCESSED_DIR
 
+# Parser output version (bump when parsing changes, to invalidate cached results)
+PARSER_VERSION = "6"
+
 # Default parsing settings
 DEFAULT_START_WORD = "RICE"
 DEFAULT_END_WORD = "FISH"
 DEFAULT_PAGE_NUMBER = 2
 
+# Extraction backends (see backends.py), in the order they are tried:
+# a report is re-read with the next one when the table it gives fails validation
+EXTRACTION_BACKENDS = ("pdfium", "pdfplumber")
+
 # Column handling
 TOTAL_PRICE_COLUMNS = 10
 INSERT_POSITION = 6
 
+# Market layout of the price tables (see columns.py). The default is the one
+# most reports use, and the one assumed when a report's header is not found
+DEFAULT_WHOLESALE_MARKETS = ("pettah", "marandagahamula")
+DEFAULT_RETAIL_MARKETS = ("pettah", "dambulla", "narahenpita")
+
+# Markets only ever reported at retail: in a header, the retail group starts at
+# the first of these (or at the first market named a second time)
+RETAIL_ONLY_MARKETS = ("narahenpita",)
+
+# Words of the header block that are not market names
+HEADER_WORDS = ("wholesale", "retail", "prices", "price", "average", "item", "items",
+                "unit", "yesterday", "today", "rs", "kg", "commodity")
+
+# Output formats of the batch parser (see batch_extract.process_year_folder)
+OUTPUT_FORMATS = ("csv", "parquet", "sqlite")
+
 # File naming
 TIMESTAMP_FORMAT = "%Y-%m-%d_%H-%M-%S"
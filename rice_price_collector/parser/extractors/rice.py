@@ -1,43 +1,124 @@
-from ..utils import extract_section_between
+from ... import metrics
+from ..config import EXTRACTION_BACKENDS, TOTAL_PRICE_COLUMNS
+from ..utils import extract_section_with_header
 from ..parser import parse_price_section
-from ..columns import create_smart_column_names
+from ..columns import DEFAULT_LAYOUT, detect_layout
+from ..sections import register_section
 
 
-def extract_and_parse_rice(pdf_path, start_word="RICE", end_word="FISH", page_number=2):
+def extract_and_parse_rice(pdf_path, start_word="RICE", end_word="FISH", page_number=2,
+                           backends=EXTRACTION_BACKENDS):
     """
     Extracts the RICE section from a PDF and converts it to a table with smart column names.
     
     This function does three things:
         1. Finds and extracts text between "RICE" and "FISH" in the PDF
         2. Parses that text into a clean DataFrame
-        3. Adds meaningful column names based on detected locations
+        3. Adds meaningful column names based on the markets in the table header
+    
+    The PDF is read with the first extraction backend (the fast pdfium one by
+    default). If that fails, or the table it gives does not pass
+    is_valid_rice_table, the next backend (pdfplumber) reads the file again.
     
     Parameters:
         pdf_path: Path to the PDF file
         start_word: Word that marks the beginning of the section (default: "RICE")
         end_word: Word that marks the end of the section (default: "FISH")
-        page_number: Which page to look at (default: 2)
+        page_number: Page probed first for the section (default: 2)
+        backends: Extraction backends to try, in order (see parser/backends.py)
     
     Returns:
         A pandas DataFrame with the parsed price data and smart column names
     """
     
-    # extract_section_between function should read the PDF and return lines of text
-    section_lines = extract_section_between(pdf_path, start_word, end_word, page_number)
-    
-    # Parse the extracted lines into a DataFrame
-    df = parse_price_section(section_lines)
+    for attempt, backend in enumerate(backends, start=1):
+        last = attempt == len(backends)
+        try:
+            # Read the PDF: the table header above RICE, and the lines of the section
+            header_lines, section_lines = extract_section_with_header(
+                pdf_path, start_word, end_word, page_number, backend=backend
+            )
+            df = parse_rice_section(section_lines, header_lines)
+        except Exception:
+            if last:
+                raise
+            metrics.incr("extraction_fallbacks")
+            continue
+
+        if last or is_valid_rice_table(df):
+            metrics.incr(f"extracted_with_{getattr(backend, 'name', backend)}")
+            return df
+        metrics.incr("extraction_fallbacks")
+
+
+# Prices a typical row may miss ("n.a.") before the table counts as misread
+MAX_MISSING_PRICES_PER_ROW = 2
+
+# Price columns the report has but its layout does not name are called unlabeled_<n>
+UNLABELED_PREFIX = "unlabeled_"
+
+
+def is_valid_rice_table(df):
+    """
+    Sanity check of a parsed RICE table, used to decide whether to re-read
+    the PDF with the fallback backend. It must have rows, every price column
+    must be named by the report's layout, and the typical (median) row may
+    miss at most MAX_MISSING_PRICES_PER_ROW of its layout's prices; single
+    "n.a." prices do not matter, but a backend that loses or merges columns fails.
+    """
+    if df.empty or any(str(col).startswith(UNLABELED_PREFIX) for col in df.columns):
+        return False
+    expected = df.attrs.get("price_columns", TOTAL_PRICE_COLUMNS)
+    prices_per_row = df.iloc[:, 2:].notna().sum(axis=1)
+    return prices_per_row.median() >= expected - MAX_MISSING_PRICES_PER_ROW
+
+
+def parse_rice_section(section_lines, header_lines=None):
+    """
+    Converts the lines of a RICE section into a table with smart column names.
+
+    Used by extract_and_parse_rice and by the multi-section engine
+    (see parser/sections.py), which extracts the lines itself.
+
+    The markets are read from header_lines (the lines above the RICE header),
+    or from the section lines when those are not given, and from the
+    section's own sub-header ("Marandagahamula", see columns.py).
+    Whatever the report's layout, the table has the columns of the default
+    layout, in its order: markets a report leaves out are empty (NaN), and
+    markets it adds come after them.
+    """
+
+    # Work out which markets this report has (cached per header layout)
+    with metrics.timer("column_names"):
+        layout = detect_layout(
+            section_lines[:50] if header_lines is None else header_lines, section_lines
+        )
+    smart_columns = layout.columns
+
+    # Parse the extracted lines into a DataFrame, one price column per layout column
+    with metrics.timer("parse_prices"):
+        df = parse_price_section(section_lines, total_columns=len(layout.price_columns))
+
+    # A row with more prices than the layout has markets for: keep the extra
+    # prices under placeholder names rather than dropping or mislabeling them
+    extra = len(df.columns) - len(smart_columns)
+    if extra > 0:
+        print(f"Warning: {len(df.columns) - 2} price columns but layout {layout.fingerprint} "
+              f"names {len(layout.price_columns)}; extra columns kept as {UNLABELED_PREFIX}<n>")
+        metrics.incr("layout_column_mismatches")
+        smart_columns = smart_columns + [f"{UNLABELED_PREFIX}{n}" for n in range(1, extra + 1)]
 
-    # Add Smart Column Names
-    # Generate meaningful column names based on locations
-    smart_columns = create_smart_column_names(section_lines)
-    
-    # Only use as many column names as we have columns in the DataFrame
-    # (Sometimes we have fewer columns than expected)
-    smart_columns = smart_columns[:len(df.columns)]
-    
     # Replace the generic column names (Item, Unit, Col1, Col2...)
     # with meaningful names (item, unit, wholesale_pettah_yesterday...)
-    df.columns = smart_columns
-    
+    # An empty table only has Item and Unit
+    df.columns = smart_columns[:len(df.columns)]
+
+    # Same columns for every layout, so reports of different layouts line up
+    default_columns = DEFAULT_LAYOUT.columns
+    df = df.reindex(columns=default_columns + [c for c in smart_columns if c not in default_columns])
+    df.attrs["price_columns"] = len(layout.price_columns)
     return df
+
+
+# Let the multi-section engine slice RICE out of every report
+register_section("RICE", start_word="RICE", end_word="FISH", parser=parse_rice_section)
@@ -0,0 +1,170 @@
+"""
+pages.py
+
+Finds which page(s) of a report hold a section, without laying out every page.
+
+CBSL reports usually carry the price tables on page 2, but cover pages come and
+go and a long table can run onto the next page. Instead of guessing a page
+number (and re-opening the PDF for every guess), the locator:
+    1. Opens the PDF with pdfium, which reads a page's plain text in C,
+       far more cheaply than pdfplumber's per-char layout
+    2. Probes pages for the section's start and end headers, starting with the
+       page that matched for the last report of the same layout
+    3. Returns the matching page, or two pages when the section spills over
+
+Only those pages are then read with the extraction backend (see utils.read_pages_lines).
+To find several sections, open the PDF once as an OpenPdf and pass that instead
+of the path: its page texts are probed once for all of them, and the pdfium
+backend reads the pages from the same open document.
+
+A report's layout fingerprint is its page count and page sizes: reports
+printed from the same template share it, so after the first report of a
+layout usually only a single page is probed.
+"""
+
+from collections import OrderedDict
+import re
+
+import pypdfium2 as pdfium
+
+# Layout fingerprints remembered per process (oldest forgotten first)
+MAX_CACHED_LAYOUTS = 256
+
+_WHITESPACE = re.compile(r"\s+")
+
+# {(fingerprint, start_letters, end_letters): first page index of the section}
+_layout_cache = OrderedDict()
+
+
+def layout_fingerprint(pdf):
+    """Page count and (rounded) page sizes of an open PdfDocument."""
+    sizes = tuple(
+        tuple(round(side) for side in pdf.get_page_size(index)) for index in range(len(pdf))
+    )
+    return len(pdf), sizes
+
+
+def _compact(text):
+    """Page text without any whitespace, so spaced headers ("R I C E") still match."""
+    return _WHITESPACE.sub("", text)
+
+
+class OpenPdf:
+    """
+    A PDF opened once with pdfium, with the pages it has loaded kept open.
+
+    Use it as a context manager; pass it wherever a PDF path is taken to
+    locate sections and read their pages without opening the file again.
+    A page's text page is built once, for probing it and for reading its
+    chars (see backends.PdfiumBackend), and closed with the document.
+    """
+
+    def __init__(self, pdf_path):
+        self.path = pdf_path
+        self.pdf = pdfium.PdfDocument(str(pdf_path))
+        self._pages = {}
+        self._texts = {}
+        self._fingerprint = None
+
+    def __len__(self):
+        return len(self.pdf)
+
+    def __fspath__(self):
+        return str(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def fingerprint(self):
+        """The layout fingerprint of the document (see layout_fingerprint)."""
+        if self._fingerprint is None:
+            self._fingerprint = layout_fingerprint(self.pdf)
+        return self._fingerprint
+
+    def page(self, index):
+        """(page, textpage) of a page (0-based index), loaded the first time it is asked for."""
+        if index not in self._pages:
+            page = self.pdf[index]
+            self._pages[index] = (page, page.get_textpage())
+        return self._pages[index]
+
+    def text(self, index):
+        """The compact text of a page (0-based index), read the first time it is asked for."""
+        if index not in self._texts:
+            _, textpage = self.page(index)
+            self._texts[index] = _compact(textpage.get_text_range())
+        return self._texts[index]
+
+    def close(self):
+        for page, textpage in self._pages.values():
+            textpage.close()
+            page.close()
+        self._pages.clear()
+        self.pdf.close()
+
+
+def _probe_order(page_count, cached, hint):
+    """Page indexes to probe: the cached page, the hinted page, then the rest in order."""
+    first = [index for index in (cached, hint) if index is not None and 0 <= index < page_count]
+    seen = set(first)
+    return list(dict.fromkeys(first)) + [i for i in range(page_count) if i not in seen]
+
+
+def locate_section_pages(pdf_path, start_letters, end_letters, page_hint=2):
+    """
+    Return the 1-based page number(s) holding the section between two headers.
+
+    Parameters:
+        pdf_path: Path to the PDF file, or an OpenPdf (which is left open)
+        start_letters: Header that marks the beginning of the section
+        end_letters: Header that marks the end (None: the section ends with its page)
+        page_hint: Page to probe first when the layout has not been seen before
+
+    Returns [page] when both headers are on one page, [page, page + 1] when the
+    section starts on one page and ends on the next, and [page_hint] when the
+    headers are not found (so the caller reports the usual "not found" error).
+    """
+    if not isinstance(pdf_path, OpenPdf):
+        with OpenPdf(pdf_path) as pdf:
+            return locate_section_pages(pdf, start_letters, end_letters, page_hint)
+
+    pdf = pdf_path
+    start = start_letters.replace(" ", "")
+    end = end_letters.replace(" ", "") if end_letters is not None else None
+    key = (pdf.fingerprint, start, end)
+
+    order = _probe_order(len(pdf), _layout_cache.get(key), page_hint - 1)
+    pages = _find_on_one_page(order, pdf.text, start, end)
+    if pages is None and end is not None:
+        pages = _find_across_pages(order, len(pdf), pdf.text, start, end)
+
+    if pages is None:
+        return [page_hint]
+
+    _layout_cache[key] = pages[0]
+    _layout_cache.move_to_end(key)
+    while len(_layout_cache) > MAX_CACHED_LAYOUTS:
+        _layout_cache.popitem(last=False)
+    return [index + 1 for index in pages]
+
+
+def _find_on_one_page(order, text_of, start, end):
+    for index in order:
+        text = text_of(index)
+        position = text.find(start)
+        if position < 0:
+            continue
+        if end is None or text.find(end, position + len(start)) >= 0:
+            return [index]
+    return None
+
+
+def _find_across_pages(order, page_count, text_of, start, end):
+    for index in order:
+        if index + 1 < page_count and start in text_of(index) and end in text_of(index + 1):
+            return [index, index + 1]
+    return None
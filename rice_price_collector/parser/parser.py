@@ -1,24 +1,87 @@
 # Utility: process a dict of years and folders
-def process_year_folders_dict(year_folder_dict, output_dir=None):
+def process_year_folders_dict(year_folder_dict, output_dir=None, workers=None, cache=None,
+                              incremental=False, output_format="csv"):
     """
     Process a dictionary mapping years to folder paths, combine results into a DataFrame.
     Args:
         year_folder_dict (dict): {"2023": "/path/to/2023", ...}
-        output_dir (Path or str, optional): Where to save combined CSV (if provided)
+        output_dir (Path or str, optional): Where to write the yearly outputs
+            (default: the current directory; created if missing)
+        workers (int, optional): Number of worker processes. When greater than 1,
+            all years share one process pool and are processed at the same time.
+        cache (ParseCache, optional): Reuse parsed tables for PDFs that have not changed.
+            Its size/age limits are applied once the run has finished.
+        incremental (bool): Only parse reports not yet marked as parsed in the manifest
+            next to the year folders (<raw>/manifest.json), append their rows to the
+            existing yearly CSVs, and return only those new rows.
+        output_format (str): "csv" (one file per year), "parquet" (a rice_prices/
+            dataset partitioned by year and month, with typed columns) or "sqlite"
+            (a rice_prices.sqlite PriceStore, see rice_price_collector/store.py)
     Returns:
         pd.DataFrame: Combined DataFrame for all years
+
+    Stage timings and counters are sent to the metrics sinks (RICE_METRICS)
+    once the run has finished; see rice_price_collector/metrics.py.
     """
+    from concurrent.futures import ThreadPoolExecutor
     from pathlib import Path
-    from .batch_extract import process_year_folder
-    combined = []
+    import time
+    from .. import metrics
+    from ..manifest import Manifest
+    from .batch_extract import new_process_pool, process_year_folder
+
+    started = time.perf_counter()
+    output_dir = Path(".") if output_dir is None else Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    folders = []
     for year, folder in year_folder_dict.items():
         folder_path = Path(folder)
         if not folder_path.exists():
             print(f"Folder not found: {folder_path}")
             continue
-        df_year = process_year_folder(folder_path, Path("."))
-        if df_year is not None:
-            combined.append(df_year)
+        folders.append(folder_path)
+
+    # Year folders that live under the same raw root share one manifest
+    manifests = {}
+    if incremental:
+        for folder_path in folders:
+            root = folder_path.resolve().parent
+            if root not in manifests:
+                manifests[root] = Manifest.for_raw_dir(root)
+
+    def manifest_for(folder_path):
+        return manifests.get(folder_path.resolve().parent)
+
+    if workers and workers > 1 and folders:
+        # One process pool shared by every year; a thread per year keeps
+        # each year's files queued on the pool at the same time. The pool's
+        # workers are not forked from these threads (see new_process_pool).
+        with new_process_pool(workers) as pool, \
+                ThreadPoolExecutor(max_workers=len(folders)) as year_pool:
+            year_results = list(year_pool.map(
+                lambda folder_path: process_year_folder(
+                    folder_path, output_dir, workers=workers, executor=pool, cache=cache,
+                    manifest=manifest_for(folder_path), output_format=output_format,
+                ),
+                folders,
+            ))
+    else:
+        year_results = [
+            process_year_folder(
+                folder_path, output_dir, cache=cache, manifest=manifest_for(folder_path),
+                output_format=output_format,
+            )
+            for folder_path in folders
+        ]
+
+    if cache is not None:
+        cache.evict()
+
+    metrics.observe("parse_run", time.perf_counter() - started)
+    metrics.flush()
+
+    combined = [df_year for df_year in year_results if df_year is not None]
     if combined:
         full_df = pd.concat(combined, ignore_index=True)
         return full_df
@@ -27,9 +90,12 @@ def process_year_folders_dict(year_folder_dict, output_dir=None):
         return None
 import re
 import pandas as pd
-from .utils import fix_missing_columns
+from .align import align_price_rows
+from .tokenizer import merge_lines, tokenize_positioned_line
+from .config import INSERT_POSITION, TOTAL_PRICE_COLUMNS
 
-def parse_price_section(section_lines):
+def parse_price_section(section_lines, total_columns=TOTAL_PRICE_COLUMNS,
+                        insert_position=INSERT_POSITION):
     """
     Takes messy price text and creates a neat table (DataFrame).
     
@@ -45,156 +111,95 @@ def parse_price_section(section_lines):
          "Rs./kg 125.00 128.00"]
     
     Output: A pandas table with columns [Item, Unit, Col1, Col2, ...]
+    
+    Rows with fewer prices than total_columns (10, or the number of price
+    columns of the report's layout, see columns.py) have their prices put in
+    the columns they sit under on the page (see align.py), or, when that is
+    not known, padded at insert_position.
     """
     
     # Combine Lines That Belong Together
     # Sometimes one item is split across multiple lines. We fix that here.
     
-    merged_lines = []
-    
-    for line in section_lines:
-        # Skip empty lines or lines with "Marandagahamula"
-        if not line.strip() or "Marandagahamula" in line:
-            continue
-        
-        # Does this line start with a letter? Then it's a NEW item
-        if re.match(r"^[A-Za-z]", line):
-            merged_lines.append(line)
-        
-        # Otherwise, add it to the PREVIOUS item
-        elif len(merged_lines) > 0:
-            merged_lines[-1] = merged_lines[-1] + " " + line
+    merged_lines = merge_lines(section_lines)
     
     # Process Each Line
+    # Build the columns directly: item names, units, and one price list per row
     
-    parsed_rows = []  # Will store all our cleaned data
+    items = []
+    units = []
+    price_rows = []
+    price_xs = []
     
     for line in merged_lines:
         
-        # Clean up the text
-        clean_line = line
-        clean_line = clean_line.replace(",", "")      # Remove commas
-        clean_line = clean_line.replace("...", "")    # Remove dots
-        clean_line = clean_line.replace("—", "-")     # Fix dashes
-        
-        # Add space between letters and "Rs."
-        # "SambaRs." becomes "Samba Rs."
-        clean_line = re.sub(r"([a-zA-Z)])(Rs\.)", r"\1 \2", clean_line)
-        
-        # Separate numbers that are stuck together
-        # "130.00132.00" becomes "130.00 132.00"
-        clean_line = re.sub(r"(\d+\.\d{1,2})(?=\d+\.\d{1,2})", r"\1 ", clean_line)
-        
-        # Break line into pieces (tokens)
-        # Find: "n.a.", "Rs./kg", words, and decimal numbers
-        tokens = re.findall(
-            r"n\.a\.|N\.A\.|Rs\.\/[A-Za-z]+|[A-Za-z()]+|\d+\.\d{1,2}|\d+",
-            clean_line
-        )
-        
-        # Need at least 3 pieces (item name, unit, one price)
-        if len(tokens) < 3:
-            continue  # Skip this line, not enough data
-        
-        # Find the unit marker (Rs./kg or Rs./Ltr)
-        unit_index = None
-        for i, token in enumerate(tokens):
-            if "Rs" in token:
-                unit_index = i
-                break
+        # Split the line into item name, unit, prices (already floats)
+        # and where each price is on the page
+        # See tokenizer.py for the cleaning rules
+        tokens = tokenize_positioned_line(line)
         
-        # If no unit found, skip this line
-        if unit_index is None:
+        # Skip lines without an item name, a unit and at least one price
+        if tokens is None:
             continue
         
-        # Split tokens into parts
-        item_name = " ".join(tokens[:unit_index]).strip()  # Everything before "Rs./kg"
-        unit = tokens[unit_index].strip()                  # "Rs./kg"
-        value_tokens = tokens[unit_index + 1:]             # All prices after unit
+        item_name, unit = _clean_item_and_unit(*tokens[:2])
         
-        # Extract Price Numbers
-        
-        prices = []
-        for value in value_tokens:
-            # Find decimal numbers in this token
-            numbers = re.findall(r"\d+\.\d{1,2}", value)
-            
-            if numbers:
-                # Add all numbers found
-                prices.extend(numbers)
-            elif value.lower() == "n.a.":
-                # "n.a." means missing data
-                prices.append(None)
-            else:
-                # Unknown value, treat as missing
-                prices.append(None)
-        
-        # Fix Missing Columns
-
-        # Make sure we have exactly 10 price columns
-        # Missing columns are added after position 6
-        
-        prices = fix_missing_columns(prices, total_columns=10, insert_position=6)
-        
-        # Create row: [Item, Unit, Price1, Price2, ...]
-        row = [item_name, unit] + prices
-        parsed_rows.append(row)
+        items.append(item_name)
+        units.append(unit)
+        price_rows.append(tokens[2])
+        price_xs.append(tokens[3])
     
     # ─────────────────────────────────────────────────────────────────
     # STEP 5: Create the DataFrame (Table)
     # ─────────────────────────────────────────────────────────────────
     
     # If no data was found, return an empty table
-    if len(parsed_rows) == 0:
+    if len(price_rows) == 0:
         return pd.DataFrame(columns=["Item", "Unit"])
     
-    # Find the longest row
-    max_length = max(len(row) for row in parsed_rows)
-    
-    # Make all rows the same length by adding None to the end
-    for row in parsed_rows:
-        while len(row) < max_length:
-            row.append(None)
+    # Fix Missing Columns
+    # One float block for all prices, with each price in its column
+    # (at least total_columns; missing prices stay NaN)
+    price_block = align_price_rows(price_rows, price_xs, total_columns, insert_position)
+    num_price_cols = price_block.shape[1]
     
     # Create column names: Item, Unit, Col1, Col2, Col3...
-    num_price_cols = max_length - 2
     column_names = ["Item", "Unit"] + [f"Col{i}" for i in range(1, num_price_cols + 1)]
     
-    # Create the DataFrame
-    df = pd.DataFrame(parsed_rows, columns=column_names)
-    
-    # Clean Up Item Names and Units
-    
-    # Remove "Rs" from end of item names
-    df["Item"] = df["Item"].str.replace(r"Rs$", "", regex=True).str.strip()
+    # An item of "n.a." became None; keep such a column as plain objects
+    if None in items:
+        items = pd.Series(items, dtype=object)
     
-    # Clean unit column (keep only letters, slash, dot)
-    df["Unit"] = df["Unit"].str.replace(r"[^A-Za-z/.]", "", regex=True).str.strip()
-    
-    # Fix cases where "Rs./kg" ended up in the Item column
-    # Example: "Samba Rs./kg" should be split into "Samba" | "Rs./kg"
+    # Create the DataFrame once, with its final dtypes
+    columns = [items, units] + list(price_block.T)
+    return pd.DataFrame(dict(zip(column_names, columns)))
+
+
+# Precompiled patterns for cleaning item names and units
+ITEM_TRAILING_RS = re.compile(r"Rs$")
+UNIT_JUNK = re.compile(r"[^A-Za-z/.]")
+ITEM_WITH_UNIT = re.compile(r"(.*?)(Rs\.\/[A-Za-z]+)")
+
+
+def _clean_item_and_unit(item_name, unit):
+    """
+    Cleans one row's item name and unit.
     
-    # Find rows where Unit is empty but Item contains "Rs"
-    has_problem = (df["Unit"] == "") | (df["Unit"].isna())
-    has_problem = has_problem & df["Item"].str.contains("Rs", na=False)
+        - Removes "Rs" from the end of item names
+        - Keeps only letters, slash and dot in the unit
+        - Splits "Samba Rs./kg" into "Samba" | "Rs./kg" when the unit ended up in the item
+        - Turns an item name of "n.a." into None (missing value)
+    """
+    item_name = ITEM_TRAILING_RS.sub("", item_name).strip()
+    unit = UNIT_JUNK.sub("", unit).strip()
     
-    for index in df[has_problem].index:
-        item_text = df.at[index, "Item"]
-        
-        # Try to split "Samba Rs./kg" into two parts
-        match = re.search(r"(.*?)(Rs\.\/[A-Za-z]+)", item_text)
+    if not unit and "Rs" in item_name:
+        match = ITEM_WITH_UNIT.search(item_name)
         if match:
-            df.at[index, "Item"] = match.group(1).strip()  # "Samba"
-            df.at[index, "Unit"] = match.group(2).strip()  # "Rs./kg"
-    
-    # Convert Prices to Numbers
+            item_name = match.group(1).strip()  # "Samba"
+            unit = match.group(2).strip()       # "Rs./kg"
     
-    # Replace text "n.a." with actual None (missing value)
-    df = df.replace({"n.a.": None, "N.A.": None})
+    if item_name in ("n.a.", "N.A."):
+        item_name = None
     
-    # Convert all price columns from text to numbers
-    for col in df.columns[2:]:  # Skip Item and Unit columns
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-
-
-    return df
\ No newline at end of file
+    return item_name, unit
@@ -0,0 +1,132 @@
+"""
+sections.py
+
+Single-pass extraction of several report sections from one PDF.
+
+A CBSL price report lists several commodities (RICE, FISH, VEGETABLES, ...)
+on the same page. Instead of opening and scanning the page once per commodity,
+this engine:
+    1. Opens the PDF once, and finds the page(s) of every registered section
+       with a cheap text probe (each page's text is probed at most once)
+    2. Rebuilds the text lines of just those pages, from the same open PDF
+    3. Slices out every registered section from those lines, and the table
+       header above it (where the markets are named)
+    4. Hands each section's lines and header to the parser registered for it
+
+Extractors register their section when they are imported, e.g. in
+extractors/rice.py:
+
+    register_section("RICE", start_word="RICE", end_word="FISH", parser=parse_rice_section)
+"""
+
+from typing import Callable, NamedTuple
+
+from .pages import OpenPdf, locate_section_pages
+from .parser import parse_price_section
+from .utils import header_lines_above, read_pages_lines, slice_section_pages
+
+
+class Section(NamedTuple):
+    """A report section: the headers around it and the parser for its lines."""
+
+    name: str
+    start_word: str
+    end_word: str
+    parser: Callable
+
+
+# All known sections, in registration order
+SECTION_REGISTRY = {}
+
+
+def parse_generic_section(section_lines, header_lines=None):
+    """The default section parser: parse_price_section, which needs no header."""
+    return parse_price_section(section_lines)
+
+
+def register_section(name, start_word, end_word, parser=parse_generic_section):
+    """
+    Register a section so extract_sections() slices it out of every report.
+
+    Parameters:
+        name: Key used in the returned dictionaries (e.g. "RICE")
+        start_word: Header that marks the beginning of the section
+        end_word: Header that marks the end of the section (None: end of the page)
+        parser: Function taking the section's lines and the header lines above
+            it on its page, and returning a DataFrame (default: parse_generic_section)
+    """
+    SECTION_REGISTRY[name] = Section(name, start_word, end_word, parser)
+    return SECTION_REGISTRY[name]
+
+
+def _resolve_sections(sections):
+    # Importing the extractors registers the built-in sections
+    from . import extractors  # noqa: F401
+
+    if sections is None:
+        return list(SECTION_REGISTRY.values())
+    return [SECTION_REGISTRY[name] if isinstance(name, str) else name for name in sections]
+
+
+def extract_sections(pdf_path, sections=None, page_num=2):
+    """
+    Open the PDF once and return {section_name: section_lines} for every section.
+
+    Parameters:
+        pdf_path: Path to the PDF file
+        sections: Section names (or Section objects) to extract; defaults to all registered
+        page_num: Page to probe first for each section (default: 2)
+
+    Sections whose headers are not found are left out of the result.
+    """
+    return {
+        name: section_lines
+        for name, (_, section_lines) in extract_sections_with_header(
+            pdf_path, sections, page_num
+        ).items()
+    }
+
+
+def extract_sections_with_header(pdf_path, sections=None, page_num=2):
+    """
+    Like extract_sections, but also return the lines above each section's
+    start header on its page, where the table header names the markets.
+
+    Returns {section_name: (header_lines, section_lines)}.
+    """
+    resolved = _resolve_sections(sections)
+    with OpenPdf(pdf_path) as pdf:
+        located = {
+            section.name: locate_section_pages(
+                pdf, section.start_word, section.end_word, page_num
+            )
+            for section in resolved
+        }
+        page_nums = sorted({number for pages in located.values() for number in pages})
+        lines_by_page = dict(zip(page_nums, read_pages_lines(pdf, page_nums)))
+
+    found = {}
+    for section in resolved:
+        pages = [lines_by_page[number] for number in located[section.name]]
+        try:
+            section_lines = slice_section_pages(pages, section.start_word, section.end_word)
+            found[section.name] = (header_lines_above(pages[0], section.start_word), section_lines)
+        except ValueError:
+            print(f"Section {section.name} not found in {pdf_path}")
+    return found
+
+
+def extract_and_parse_sections(pdf_path, sections=None, page_num=2):
+    """
+    Extract every section in one pass and parse each with its own parser.
+
+    Returns a dictionary {section_name: DataFrame}.
+    """
+    resolved = _resolve_sections(sections)
+    extracted = extract_sections_with_header(pdf_path, resolved, page_num)
+    tables = {}
+    for section in resolved:
+        if section.name in extracted:
+            header_lines, section_lines = extracted[section.name]
+            tables[section.name] = section.parser(section_lines, header_lines)
+    return tables
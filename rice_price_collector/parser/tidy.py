@@ -0,0 +1,117 @@
+"""
+tidy.py
+
+Reshapes parsed (wide) price tables into a tidy long format:
+
+    date        item    unit    channel    market   day        price
+    2024-01-02  Samba   Rs./kg  wholesale  pettah   today      230.0
+
+The wide tables have one column per <channel>_<market>_<day> (see
+create_smart_column_names). The reshape works on the numpy block of prices
+directly: the id columns are repeated, the price block is flattened, and
+channel, market and day are categoricals built from the column names. No
+strings are split per row.
+
+Every report repeats the previous report's prices as "yesterday". With
+dedupe=True (the default), a yesterday price is dropped when the previous
+report in the table already has the same price as "today". Yesterday prices
+are kept when they fill a gap or differ from what was published the day
+before. That roughly halves the rows.
+
+    long = to_tidy(process_year_folders_dict(folders))
+"""
+
+import numpy as np
+import pandas as pd
+
+# Columns that are not prices
+ID_COLUMNS = ("date", "item", "unit")
+
+# Wide price columns are named <channel>_<market>_<day>
+PRICE_COLUMN_PARTS = ("channel", "market", "day")
+
+TIDY_COLUMNS = ["date", "item", "unit", "channel", "market", "day", "price"]
+
+# Prices closer than this are the same price (CBSL publishes two decimals)
+PRICE_TOLERANCE = 0.005
+
+
+def price_columns(df):
+    """The <channel>_<market>_<day> columns of a wide table, in order."""
+    return [col for col in df.columns if col not in ID_COLUMNS and col.count("_") == 2]
+
+
+def _categorical_parts(columns, rows):
+    """channel, market and day categoricals for `rows` repetitions of each column."""
+    parts = {}
+    for position, name in enumerate(PRICE_COLUMN_PARTS):
+        values = [col.split("_")[position] for col in columns]
+        codes, categories = pd.factorize(pd.Index(values))
+        parts[name] = pd.Categorical.from_codes(np.tile(codes, rows), categories=categories)
+    return parts
+
+
+def to_tidy(df, dedupe=True):
+    """
+    Reshape a wide price table (one or more reports) into the tidy long format.
+
+    Parameters:
+        df: Parsed prices with "date", "item", "unit" and <channel>_<market>_<day> columns
+        dedupe: Drop "yesterday" prices already published as the previous report's "today"
+
+    Returns:
+        A DataFrame with TIDY_COLUMNS: date as datetime64, item, unit, channel,
+        market and day as categoricals, price as float64. Missing prices and
+        rows without an item are left out. Rows are ordered by date.
+    """
+    columns = price_columns(df)
+    if df.empty or not columns:
+        return _empty_tidy()
+
+    rows = len(df)
+    prices = df[columns].to_numpy(dtype=float).ravel()
+    tidy = pd.DataFrame({
+        "date": np.repeat(pd.to_datetime(df["date"]).to_numpy(), len(columns)),
+        "item": pd.Categorical(np.repeat(df["item"].to_numpy(dtype=object), len(columns))),
+        "unit": pd.Categorical(np.repeat(df["unit"].to_numpy(dtype=object), len(columns))),
+        **_categorical_parts(columns, rows),
+        "price": prices,
+    })
+    tidy = tidy[tidy["price"].notna().to_numpy() & tidy["item"].notna().to_numpy()]
+
+    if dedupe:
+        tidy = _drop_repeated_yesterday(tidy)
+    return tidy.sort_values("date", kind="stable", ignore_index=True)
+
+
+def _empty_tidy():
+    empty = pd.DataFrame({col: pd.Series(dtype="category") for col in TIDY_COLUMNS})
+    empty["date"] = pd.Series(dtype="datetime64[ns]")
+    empty["price"] = pd.Series(dtype=float)
+    return empty
+
+
+def _drop_repeated_yesterday(tidy):
+    """Drop yesterday prices equal to the previous report's today price of the same series."""
+    is_yesterday = (tidy["day"] == "yesterday").to_numpy()
+    if not is_yesterday.any():
+        return tidy
+
+    # The report before each report date
+    report_dates = np.sort(tidy["date"].unique())
+    previous = pd.Series(np.concatenate(([np.datetime64("NaT")], report_dates[:-1])),
+                         index=report_dates)
+
+    series = ["item", "channel", "market"]
+    yesterday = tidy.loc[is_yesterday, series + ["date", "price"]]
+    yesterday = yesterday.assign(date=yesterday["date"].map(previous).to_numpy())
+    today = tidy.loc[(tidy["day"] == "today").to_numpy(), series + ["date", "price"]]
+    today = today.drop_duplicates(series + ["date"])
+
+    matched = yesterday.reset_index().merge(
+        today, on=series + ["date"], how="left", suffixes=("", "_published"),
+    ).set_index("index")
+    repeated = matched.index[
+        (matched["price"] - matched["price_published"]).abs().to_numpy() < PRICE_TOLERANCE
+    ]
+    return tidy.drop(index=repeated)
@@ -0,0 +1,178 @@
+"""
+tokenizer.py
+
+Precompiled, single-pass tokenizer for price table lines.
+
+Turns one merged line of a price section, e.g.
+
+    "SambaRs./kg130.00132.00n.a.135.00"
+
+into its parts:
+
+    ("Samba", "Rs./kg", [130.0, 132.0, None, 135.0])
+
+Prices come out as floats (None for "n.a." or anything unreadable), so the
+DataFrame built from them needs no string-to-number conversion afterwards.
+
+Lines read from a PDF are PositionedLines: strings that also carry the x
+position of each character. For those, tokenize_positioned_line also returns
+where each price sits on the page, which align.py uses to put it in the right
+column.
+"""
+
+import re
+
+import numpy as np
+
+# A new item starts on a line that begins with a letter
+LINE_START = re.compile(r"[A-Za-z]")
+
+# Numbers stuck together: "130.00132.00" -> "130.00 132.00"
+GLUED_NUMBERS = re.compile(r"(\d+\.\d{1,2})(?=\d+\.\d{1,2})")
+
+# Tokens: "n.a.", units (Rs./kg), words, decimal prices and bare integers.
+# Words and units stop right before a glued "Rs." ("SambaRs./kg" -> "Samba", "Rs./kg"),
+# except after "(" where the text is kept as-is.
+TOKEN_PATTERN = re.compile(
+    r"n\.a\.|N\.A\."
+    r"|Rs\./[A-Za-z]+?(?=Rs\.)|Rs\./[A-Za-z]+"
+    r"|[A-Za-z()]+?(?=(?<=[A-Za-z)])Rs\.)|[A-Za-z()]+"
+    r"|\d+\.\d{1,2}|\d+"
+)
+
+
+class PositionedLine(str):
+    """A line of text plus x0s, the x position (left edge) of each of its characters."""
+
+    def __new__(cls, text, x0s):
+        line = super().__new__(cls, text)
+        line.x0s = x0s
+        return line
+
+
+def _join_lines(first, second):
+    """first + " " + second, keeping the character positions when both have them."""
+    joined = first + " " + second
+    if isinstance(first, PositionedLine) and isinstance(second, PositionedLine):
+        return PositionedLine(joined, np.concatenate((first.x0s, [np.nan], second.x0s)))
+    return joined
+
+
+def merge_lines(section_lines):
+    """
+    Combines lines that belong to the same item.
+
+    A line starting with a letter begins a new item; any other line
+    (e.g. the prices wrapped onto the next line) is added to the previous one.
+    Empty lines and the "Marandagahamula" header line are skipped.
+    """
+    merged_lines = []
+    for line in section_lines:
+        if not line.strip() or "Marandagahamula" in line:
+            continue
+        if LINE_START.match(line):
+            merged_lines.append(line)
+        elif merged_lines:
+            merged_lines[-1] = _join_lines(merged_lines[-1], line)
+    return merged_lines
+
+
+def split_glued_numbers(text):
+    """Put a space after every price that is directly followed by another one."""
+    parts = []
+    last = 0
+    for match in GLUED_NUMBERS.finditer(text):
+        parts.append(text[last:match.end()])
+        last = match.end()
+    if not parts:
+        return text
+    parts.append(text[last:])
+    return " ".join(parts)
+
+
+def _source_indexes(line):
+    """
+    For each character of the cleaned line (see tokenize_line), the index of
+    the character of `line` it came from. Spaces added between glued prices
+    map to the first digit of the price after them.
+    """
+    indexes = range(len(line))
+    if "," in line:
+        indexes = [i for i in indexes if line[i] != ","]
+        line = line.replace(",", "")
+    if "..." in line:
+        dropped = set()
+        start = line.find("...")
+        while start >= 0:
+            dropped.update(range(start, start + 3))
+            start = line.find("...", start + 3)
+        indexes = [index for i, index in enumerate(indexes) if i not in dropped]
+        line = line.replace("...", "")
+
+    ends = [match.end() for match in GLUED_NUMBERS.finditer(line)]
+    if not ends:
+        return line, indexes
+    indexes = list(indexes)
+    for end in reversed(ends):
+        indexes.insert(end, indexes[end])
+    parts = [line[start:end] for start, end in zip([0] + ends, ends + [len(line)])]
+    return " ".join(parts), indexes
+
+
+def _split_tokens(tokens):
+    """(item_name, unit, prices) of a line's tokens, or None when it is not a price row."""
+    if len(tokens) < 3:
+        return None
+
+    # Everything before the first "Rs" token is the item name
+    for unit_index, token in enumerate(tokens):
+        if "Rs" in token:
+            break
+    else:
+        return None
+
+    # Only decimal tokens are prices; "n.a." and anything else is missing.
+    # (Digit-led tokens are either "130.00" or a bare integer like "130".)
+    prices = [
+        float(token) if token[0].isdigit() and "." in token else None
+        for token in tokens[unit_index + 1:]
+    ]
+    return " ".join(tokens[:unit_index]).strip(), tokens[unit_index].strip(), prices
+
+
+def tokenize_line(line):
+    """
+    Splits one merged line into (item_name, unit, prices).
+
+    Returns None when the line is not a price row (fewer than three
+    tokens, or no "Rs" unit marker).
+    """
+    clean_line = split_glued_numbers(line.replace(",", "").replace("...", ""))
+    return _split_tokens(TOKEN_PATTERN.findall(clean_line))
+
+
+def tokenize_positioned_line(line):
+    """
+    Like tokenize_line, but also returns each price's x position on the page:
+    (item_name, unit, prices, price_xs), with price_xs a float array (the
+    middle of each price's text; NaN where it is not known).
+
+    Plain strings have no positions: their price_xs is None.
+    """
+    if not isinstance(line, PositionedLine):
+        row = tokenize_line(line)
+        return None if row is None else (*row, None)
+
+    clean_line, indexes = _source_indexes(line)
+    matches = list(TOKEN_PATTERN.finditer(clean_line))
+    row = _split_tokens([match.group() for match in matches])
+    if row is None:
+        return None
+
+    prices = row[2]
+    x0s = line.x0s
+    price_xs = [
+        (x0s[indexes[match.start()]] + x0s[indexes[match.end() - 1]]) / 2
+        for match in matches[len(matches) - len(prices):]
+    ]
+    return (*row, np.array(price_xs, dtype=float))
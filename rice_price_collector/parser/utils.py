@@ -1,37 +1,224 @@
-import pdfplumber
-
-def extract_section_between(pdf_path, start_letters, end_letters, page_num=2):
-    with pdfplumber.open(pdf_path) as pdf:
-        page = pdf.pages[page_num - 1]
-        chars = page.chars
-
-    # Group by approximate line y-position
-    y_map = {}
-    for c in chars:
-        y_key = round(c["top"], -1)
-        y_map.setdefault(y_key, []).append(c["text"])
-    
-    # Rebuild text lines
+from bisect import bisect_right
+
+import numpy as np
+
+from .. import metrics
+from .backends import get_backend, page_chars_from_dicts
+from .config import EXTRACTION_BACKENDS
+from .pages import OpenPdf, locate_section_pages
+from .tokenizer import PositionedLine
+
+# Characters whose tops are within this many points belong to the same line
+# (the same default pdfplumber uses for its own text extraction)
+LINE_Y_TOLERANCE = 3
+
+
+def read_page_lines(pdf_path, page_num=2, backend=None):
+    """
+    Open a PDF once and rebuild the text lines of one page.
+
+    Returns a PageLines list of (y_position, line_text) tuples, sorted top to bottom.
+    """
+    return read_pages_lines(pdf_path, [page_num], backend)[0]
+
+
+def read_pages_lines(pdf_path, page_nums, backend=None):
+    """
+    Open a PDF once and rebuild the text lines of each of the given (1-based) pages.
+
+    Returns one PageLines per page, in the order asked for. Only these pages
+    are read, with the given extraction backend (name or object; default:
+    the first of EXTRACTION_BACKENDS, see backends.py).
+    """
+    backend = get_backend(EXTRACTION_BACKENDS[0] if backend is None else backend)
+    with metrics.timer("pdf_read"), metrics.timer(f"pdf_read_{backend.name}"):
+        pages_chars = backend.read_pages(pdf_path, page_nums)
+
+    with metrics.timer("build_lines"):
+        return [build_page_lines(page_chars) for page_chars in pages_chars]
+
+
+def build_lines(chars, y_tolerance=LINE_Y_TOLERANCE):
+    """Group pdfplumber chars (dicts with "top", "x0" and "text") into (y_position, line_text) tuples."""
+    return build_page_lines(page_chars_from_dicts(chars), y_tolerance)
+
+
+def build_page_lines(page_chars, y_tolerance=LINE_Y_TOLERANCE):
+    """
+    Group a page's chars (a backends.PageChars) into (y_position, line_text) tuples.
+
+    How it works:
+        1. Sorts by top and starts a new line wherever the gap to the previous
+           char is larger than y_tolerance (so lines are not split by fixed 10pt buckets)
+        2. Sorts each line's chars left to right before joining them
+    """
+    tops, x0s, texts = page_chars
+    count = len(texts)
+    if not count:
+        return PageLines([])
+    texts = np.array(texts, dtype=object)
+
+    # Cluster rows by tolerance on the sorted tops
+    by_top = np.argsort(tops, kind="stable")
+    sorted_tops = tops[by_top]
+    row_ids = np.empty(count, dtype=np.int64)
+    row_ids[by_top] = np.concatenate(([0], np.cumsum(np.diff(sorted_tops) > y_tolerance)))
+
+    # Order chars by row, then left to right inside each row
+    order = np.lexsort((x0s, row_ids))
+    row_starts = np.flatnonzero(np.diff(row_ids[order], prepend=-1))
+    row_ends = np.append(row_starts[1:], count)
+    ordered_texts = texts[order]
+    ordered_tops = tops[order]
+    ordered_x0s = x0s[order]
+    # A char's text can be more than one letter (ligatures); each letter gets its x
+    lengths = np.fromiter(map(len, ordered_texts), dtype=np.int64, count=count)
+
+    # Rebuild text lines, keeping each letter's x position (see tokenizer.PositionedLine)
     lines = []
-    for y, texts in sorted(y_map.items()):
-        line_text = "".join(texts).replace("\xa0", "").strip()
-        lines.append((y, line_text))
-    
-    # Find start and end positions
-    def find_line_y(target):
-        for y, text in lines:
-            if all(ch in text for ch in target.replace(" ", "")):  # handles spaced "R I C E"
-                return y
-        return None
-
-    start_y = find_line_y(start_letters)
-    end_y = find_line_y(end_letters)
-    if not start_y or not end_y:
+    for start, end in zip(row_starts, row_ends):
+        line_text = "".join(ordered_texts[start:end])
+        line_x0s = ordered_x0s[start:end]
+        if len(line_text) != end - start:
+            line_x0s = np.repeat(line_x0s, lengths[start:end])
+        lines.append((float(ordered_tops[start:end].min()), _positioned_line(line_text, line_x0s)))
+    return PageLines(lines)
+
+
+def _positioned_line(text, x0s):
+    """The line without non-breaking spaces and surrounding whitespace, with matching x0s."""
+    if "\xa0" in text:
+        x0s = x0s[np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32) != 0xA0]
+        text = text.replace("\xa0", "")
+    stripped = text.strip()
+    if len(stripped) != len(text):
+        left = len(text) - len(text.lstrip())
+        x0s = x0s[left:left + len(stripped)]
+    return PositionedLine(stripped, x0s)
+
+
+class PageLines(list):
+    """
+    A list of (y_position, line_text) tuples plus an index for header lookups.
+
+    The index is built once per page, so finding several section headers
+    (RICE, FISH, ...) does not rescan every line for every header.
+    """
+
+    def __init__(self, lines=()):
+        super().__init__(lines)
+        compact = [text.replace(" ", "") for _, text in self]
+        self._joined = "\n".join(compact)
+        self._offsets = [0]
+        for text in compact[:-1]:
+            self._offsets.append(self._offsets[-1] + len(text) + 1)
+        self._letter_lines = None
+
+    def find_line(self, target):
+        """
+        Return the position of the first line matching a header, or None.
+
+        A line that contains the header itself (e.g. "RICE" or spaced "R I C E")
+        wins. Otherwise falls back to the first line containing all of the
+        header's letters, which tolerates headers split up by the PDF layout.
+        """
+        letters = target.replace(" ", "")
+
+        position = self._joined.find(letters)
+        if position >= 0:
+            return bisect_right(self._offsets, position) - 1
+
+        if self._letter_lines is None:
+            self._letter_lines = {}
+            for i, (_, text) in enumerate(self):
+                for ch in set(text):
+                    self._letter_lines.setdefault(ch, set()).add(i)
+
+        candidates = None
+        for ch in set(letters):
+            matches = self._letter_lines.get(ch, set())
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                return None
+        return min(candidates) if candidates else None
+
+
+def find_line_y(lines, target):
+    """Return the y-position of the first line matching the header, or None."""
+    if not isinstance(lines, PageLines):
+        lines = PageLines(lines)
+    position = lines.find_line(target)
+    return None if position is None else lines[position][0]
+
+
+def slice_section(lines, start_letters, end_letters):
+    """
+    Return the text of the lines strictly between the start and end headers.
+    An end_letters of None means "until the bottom of the page".
+    """
+    if not isinstance(lines, PageLines):
+        lines = PageLines(lines)
+    start_y = find_line_y(lines, start_letters)
+    end_y = find_line_y(lines, end_letters) if end_letters is not None else float("inf")
+    if start_y is None or end_y is None:
         raise ValueError("Could not find start or end header.")
 
     # Collect lines in between
-    section = [txt for y, txt in lines if start_y < y < end_y]
-    return section
+    return [txt for y, txt in lines if start_y < y < end_y]
+
+
+def slice_section_pages(pages, start_letters, end_letters):
+    """
+    slice_section over the PageLines of one page, or of two consecutive pages
+    when the section starts on the first and ends on the second.
+    """
+    if len(pages) == 1:
+        return slice_section(pages[0], start_letters, end_letters)
+
+    first, second = (page if isinstance(page, PageLines) else PageLines(page) for page in pages)
+    start_y = find_line_y(first, start_letters)
+    end_y = find_line_y(second, end_letters)
+    if start_y is None or end_y is None:
+        raise ValueError("Could not find start or end header.")
+    return [txt for y, txt in first if y > start_y] + [txt for y, txt in second if y < end_y]
+
+
+def header_lines_above(lines, start_letters):
+    """Return the text of the lines above the start header (the page's table header)."""
+    start_y = find_line_y(lines, start_letters)
+    if start_y is None:
+        return []
+    return [txt for y, txt in lines if y < start_y]
+
+
+def extract_section_between(pdf_path, start_letters, end_letters, page_num=2, backend=None):
+    """
+    Return the text lines between two headers, wherever the section is in the PDF.
+
+    page_num is only a hint: the page(s) holding both headers are found with a
+    cheap text probe (see pages.py), and only those are read, with the given
+    extraction backend (see read_pages_lines).
+    A section running onto the next page is joined across the page break.
+    """
+    return extract_section_with_header(pdf_path, start_letters, end_letters, page_num, backend)[1]
+
+
+def extract_section_with_header(pdf_path, start_letters, end_letters, page_num=2, backend=None):
+    """
+    Like extract_section_between, but also return the lines above the start
+    header on its page, where the table header names the markets.
+
+    Returns a (header_lines, section_lines) tuple.
+
+    The PDF is opened once with pdfium to locate the section, and the pdfium
+    backend reads the located pages from that same document.
+    """
+    with OpenPdf(pdf_path) as pdf:
+        with metrics.timer("locate_section"):
+            page_nums = locate_section_pages(pdf, start_letters, end_letters, page_num)
+        pages = read_pages_lines(pdf, page_nums, backend)
+    section_lines = slice_section_pages(pages, start_letters, end_letters)
+    return header_lines_above(pages[0], start_letters), section_lines
 
 def fix_missing_columns(price_list, total_columns=10, insert_position=6):
     """
@@ -46,6 +233,10 @@ def fix_missing_columns(price_list, total_columns=10, insert_position=6):
         
         The None values are added after position 6 (after wholesale prices).
     
+    This only looks at the row's length. When the prices' positions on the page
+    are known, align.py puts them in the right columns instead, and uses this
+    rule only for rows it cannot place.
+    
     Parameters:
         price_list: List of prices (may be incomplete)
         total_columns: How many columns we want in total (default: 10)
@@ -58,16 +249,12 @@ def fix_missing_columns(price_list, total_columns=10, insert_position=6):
     price_list = list(price_list)
     
     # Check if we're missing columns
-    if len(price_list) < total_columns:
-        # Calculate how many columns are missing
-        missing_count = total_columns - len(price_list)
-        
+    missing_count = total_columns - len(price_list)
+    if missing_count > 0:
         # Don't insert beyond what we have
         safe_position = min(insert_position, len(price_list))
         
-        # Insert None values at the right position
-        # This is like cutting the list and inserting empty spaces
-        for i in range(missing_count):
-            price_list.insert(safe_position, None)
+        # Insert all the None values at once, by assigning to an empty slice
+        price_list[safe_position:safe_position] = [None] * missing_count
     
-    return price_list
\ No newline at end of file
+    return price_list
@@ -0,0 +1,240 @@
+"""
+writers.py
+
+Writers that consume a stream of per-report DataFrames (see iter_rice_rows)
+and write them straight to disk, one report at a time.
+
+Memory use stays bounded by the size of a single report, however many
+years are exported.
+
+Example:
+    from rice_price_collector.parser import iter_rice_rows, write_parquet_stream
+
+    rows = write_parquet_stream(iter_rice_rows(folders, workers=8), "rice_prices.parquet")
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+
+def _aligned(frames, columns=None):
+    """
+    Yield frames with one consistent column layout.
+
+    The layout is `columns` if given, otherwise the first frame's columns.
+    Missing columns are filled with NaN and extra ones are dropped (with a warning).
+    """
+    for df in frames:
+        if columns is None:
+            columns = list(df.columns)
+        elif list(df.columns) != columns:
+            extra = [col for col in df.columns if col not in columns]
+            if extra:
+                print(f"Dropping unexpected columns {extra}")
+            df = df.reindex(columns=columns)
+        yield df
+
+
+def write_csv_stream(frames, path, columns=None):
+    """
+    Write a stream of DataFrames to one CSV file, appending report by report.
+
+    Parameters:
+        frames: Iterable of DataFrames (e.g. from iter_rice_rows)
+        path: Output CSV file (overwritten)
+        columns: Optional column layout; defaults to the first frame's columns
+
+    Returns:
+        Number of rows written
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    rows = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for df in _aligned(frames, columns):
+            df.to_csv(f, header=rows == 0, index=False)
+            rows += len(df)
+    print(f"Saved {rows} rows → {path.resolve()}")
+    return rows
+
+
+def write_parquet_stream(frames, path, columns=None):
+    """
+    Write a stream of DataFrames to one Parquet file, one row group per report batch.
+
+    Needs pyarrow: pip install "rice_price_collector[parquet]"
+
+    Parameters:
+        frames: Iterable of DataFrames (e.g. from iter_rice_rows)
+        path: Output Parquet file (overwritten)
+        columns: Optional column layout; defaults to the first frame's columns
+
+    Returns:
+        Number of rows written
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    rows = 0
+    writer = None
+    try:
+        for df in _aligned(frames, columns):
+            if writer is None:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                writer = pq.ParquetWriter(path, table.schema)
+            else:
+                # Later reports must match the first one's schema (e.g. all-NaN columns)
+                table = pa.Table.from_pandas(df, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+            rows += len(df)
+    finally:
+        if writer is not None:
+            writer.close()
+    print(f"Saved {rows} rows → {path.resolve()}")
+    return rows
+
+
+# Partitioned Parquet dataset
+
+# Bump when the column types or layout of the Parquet dataset change
+PRICES_SCHEMA_VERSION = "1"
+SCHEMA_VERSION_KEY = b"rice_price_collector.schema_version"
+
+# Columns that are not prices
+KEY_COLUMNS = ("date", "item", "unit")
+
+
+def to_typed_prices(df):
+    """
+    Typed copy of a parsed price table, ready for columnar storage.
+
+        - date: real dates (not strings)
+        - item, unit: category codes
+        - prices: float32 (CBSL prices have two decimals, well inside float32 precision)
+    """
+    typed = df.copy()
+    typed["date"] = pd.to_datetime(typed["date"]).dt.date
+    for col in ("item", "unit"):
+        if col in typed.columns:
+            typed[col] = typed[col].astype("category")
+    price_columns = [col for col in typed.columns if col not in KEY_COLUMNS]
+    typed[price_columns] = typed[price_columns].astype("float32")
+    return typed
+
+
+def _write_month(root, month, frames):
+    """
+    Write one month's rows into root/year=YYYY/month=MM/.
+
+    Rows already stored for the same dates are replaced, other days of the month
+    are kept, and no other month's partition is touched.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    year, month_number = month.split("-")
+    partition = Path(root) / f"year={year}" / f"month={month_number}"
+    partition.mkdir(parents=True, exist_ok=True)
+
+    new_rows = pd.concat(frames, ignore_index=True)
+    new_rows["date"] = new_rows["date"].astype(str)
+
+    old_files = sorted(partition.glob("*.parquet"))
+    if old_files:
+        existing = pd.concat([pd.read_parquet(f) for f in old_files], ignore_index=True)
+        existing["date"] = existing["date"].astype(str)
+        existing = existing[~existing["date"].isin(set(new_rows["date"]))]
+        for col in ("item", "unit"):
+            if col in existing.columns:
+                existing[col] = existing[col].astype(str)
+        new_rows = pd.concat([existing, new_rows], ignore_index=True)
+    new_rows = new_rows.sort_values("date", kind="stable", ignore_index=True)
+
+    table = pa.Table.from_pandas(to_typed_prices(new_rows), preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[SCHEMA_VERSION_KEY] = PRICES_SCHEMA_VERSION.encode()
+    table = table.replace_schema_metadata(metadata)
+
+    # Write under a hidden name (readers skip dot-files), publish it, then drop
+    # the old files. A crash can only leave duplicates, which the next write removes.
+    index = max((int(f.stem.split("-")[-1]) for f in old_files), default=-1) + 1
+    tmp_path = partition / f".part-{index}.parquet.tmp"
+    pq.write_table(table, tmp_path)
+    tmp_path.replace(partition / f"part-{index}.parquet")
+    for old_file in old_files:
+        old_file.unlink()
+
+    return len(new_rows)
+
+
+def write_parquet_dataset(frames, root):
+    """
+    Write a stream of parsed reports to a Parquet dataset partitioned by year and month.
+
+    Layout:
+        root/year=2025/month=01/part-0.parquet
+        root/year=2025/month=02/part-0.parquet
+        ...
+
+    Appending new days only rewrites the (small) partition of the month they
+    fall in; earlier months are never touched. Writing the same day twice
+    replaces it instead of duplicating it.
+
+    Needs pyarrow: pip install "rice_price_collector[parquet]"
+
+    Parameters:
+        frames: Iterable of DataFrames with a "date" column (e.g. from iter_rice_rows)
+        root: Dataset folder
+
+    Returns:
+        Number of new rows written
+    """
+    rows = 0
+    current_month = None
+    buffer = []
+
+    for df in frames:
+        months = df["date"].astype(str).str[:7]
+        for month, part in df.groupby(months, sort=True):
+            if month != current_month and buffer:
+                _write_month(root, current_month, buffer)
+                buffer = []
+            current_month = month
+            buffer.append(part)
+            rows += len(part)
+
+    if buffer:
+        _write_month(root, current_month, buffer)
+
+    print(f"Saved {rows} rows → {Path(root).resolve()}")
+    return rows
+
+
+def read_parquet_dataset(root):
+    """
+    Load a dataset written by write_parquet_dataset as one DataFrame, sorted by date.
+
+    Raises ValueError if it was written with a different schema version.
+    """
+    import pyarrow.parquet as pq
+
+    files = sorted(Path(root).glob("year=*/month=*/*.parquet"))
+    if not files:
+        return pd.DataFrame(columns=list(KEY_COLUMNS))
+
+    version = pq.read_schema(files[0]).metadata.get(SCHEMA_VERSION_KEY, b"").decode()
+    if version != PRICES_SCHEMA_VERSION:
+        raise ValueError(
+            f"Dataset schema version {version!r} does not match {PRICES_SCHEMA_VERSION!r}"
+        )
+
+    df = pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)
+    for col in ("item", "unit"):
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df.sort_values("date", kind="stable", ignore_index=True)
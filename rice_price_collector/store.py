@@ -0,0 +1,224 @@
+"""
+store.py
+
+Local SQLite store of parsed prices, for fast date, item and market queries.
+
+The yearly CSVs hold one wide row per item and report. The store keeps one
+row per price instead, in the tidy format of parser/tidy.py:
+
+    date        item    unit    channel    market   day     price
+    2024-01-02  Samba   Rs./kg  wholesale  pettah   today   230.0
+
+with indexes on date, item and (channel, market), so questions like
+"Samba, wholesale Pettah, January to March 2024" read a few hundred rows
+instead of every year of CSVs.
+
+    with PriceStore("data/processed/rice_prices.sqlite") as store:
+        store.load(iter_rice_rows(folders, workers=8))
+        df = store.query(start="2024-01-01", end="2024-03-31", items=["Samba"],
+                         channels=["wholesale"], markets=["pettah"])
+
+Loading the same day again replaces its prices (an upsert), so incremental
+runs only need to load the new reports. "Yesterday" prices already stored as
+the previous report's "today" are left out (see to_tidy), also when that
+report was loaded by an earlier run. Only the standard
+library's sqlite3 is needed.
+"""
+
+from pathlib import Path
+import sqlite3
+
+import pandas as pd
+
+from .parser.tidy import TIDY_COLUMNS, to_tidy
+
+# Bump when the table layout changes
+STORE_SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    date    TEXT NOT NULL,
+    item    TEXT NOT NULL,
+    unit    TEXT,
+    channel TEXT NOT NULL,
+    market  TEXT NOT NULL,
+    day     TEXT NOT NULL,
+    price   REAL NOT NULL,
+    PRIMARY KEY (date, item, channel, market, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS prices_by_item ON prices (item, date);
+CREATE INDEX IF NOT EXISTS prices_by_market ON prices (channel, market, date);
+"""
+
+UPSERT = """
+INSERT INTO prices (date, item, unit, channel, market, day, price)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (date, item, channel, market, day)
+DO UPDATE SET unit = excluded.unit, price = excluded.price
+"""
+
+# Wide rows reshaped and written at a time by PriceStore.load (reshaping
+# reports one by one costs far more than the inserts themselves)
+LOAD_BATCH_ROWS = 10_000
+
+
+class PriceStore:
+    """
+    SQLite-backed store of prices in long format.
+
+    Parameters:
+        path: Database file (created with its folder if missing)
+        timeout: Seconds to wait for another writer (e.g. a parallel year) to finish
+    """
+
+    def __init__(self, path, timeout=30.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path, timeout=timeout)
+        # WAL lets queries run while a load is writing
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, STORE_SCHEMA_VERSION):
+            raise ValueError(
+                f"Store schema version {version} does not match {STORE_SCHEMA_VERSION}"
+            )
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            self.connection.execute(f"PRAGMA user_version = {STORE_SCHEMA_VERSION}")
+
+    # Loading
+
+    def load(self, frames):
+        """
+        Upsert parsed reports into the store, all in one transaction.
+
+        Parameters:
+            frames: A wide price DataFrame (with a "date" column), or an iterable
+                of them (e.g. from iter_rice_rows)
+
+        Returns:
+            Number of prices written
+        """
+        if isinstance(frames, pd.DataFrame):
+            frames = [frames]
+
+        rows = 0
+        batch, batch_rows, previous = [], 0, None
+        with self.connection:
+            for df in frames:
+                batch.append(df)
+                batch_rows += len(df)
+                if batch_rows >= LOAD_BATCH_ROWS:
+                    written, previous = self._upsert(batch, previous)
+                    rows += written
+                    batch, batch_rows = [], 0
+            if batch:
+                rows += self._upsert(batch, previous)[0]
+        return rows
+
+    def _upsert(self, frames, previous=None):
+        """
+        Reshape and upsert one batch of wide frames.
+
+        previous is the last report of the batch before, so the first report of
+        this batch has its "yesterday" prices deduplicated too. For the first
+        batch of a load it is the latest report already stored before it
+        (see _stored_report_before). Returns the number of prices written and
+        this batch's last report.
+        """
+        if previous is None:
+            first = pd.to_datetime(pd.concat([df["date"] for df in frames])).min()
+            if pd.notna(first):
+                previous = self._stored_report_before(first)
+        wide = pd.concat(frames if previous is None else [previous, *frames], ignore_index=True)
+        tidy = to_tidy(wide)
+        if previous is not None:
+            tidy = tidy[tidy["date"] > pd.to_datetime(previous["date"]).max()]
+
+        records = tidy.astype({"item": object, "unit": object, "channel": object,
+                               "market": object, "day": object})
+        records["date"] = tidy["date"].dt.strftime("%Y-%m-%d")
+        records = records.astype(object).where(records.notna(), None)
+        self.connection.executemany(UPSERT, records.itertuples(index=False, name=None))
+
+        dates = pd.to_datetime(wide["date"])
+        return len(tidy), wide[dates == dates.max()]
+
+    def _stored_report_before(self, date):
+        """
+        The "today" prices stored for the latest date before `date`, as a wide
+        report (date, item, unit and <channel>_<market>_today columns), or None.
+        """
+        before = pd.Timestamp(date).strftime("%Y-%m-%d")
+        stored = pd.read_sql_query(
+            "SELECT date, item, unit, channel, market, price FROM prices "
+            "WHERE day = 'today' AND date = (SELECT MAX(date) FROM prices WHERE date < ?)",
+            self.connection, params=[before],
+        )
+        if stored.empty:
+            return None
+        stored["column"] = stored["channel"] + "_" + stored["market"] + "_today"
+        wide = stored.set_index(["date", "item", "unit", "column"])["price"].unstack("column")
+        return wide.rename_axis(columns=None).reset_index()
+
+    # Queries
+
+    def query(self, start=None, end=None, items=None, channels=None, markets=None, days=None):
+        """
+        Return the matching prices as a DataFrame, sorted by date.
+
+        Parameters:
+            start, end: Inclusive date range ("YYYY-MM-DD", date or Timestamp; None: open)
+            items: Item names to keep (None: all)
+            channels: "wholesale" and/or "retail" (None: both)
+            markets: Market names, e.g. ["pettah", "dambulla"] (None: all)
+            days: "today" and/or "yesterday" (None: both)
+
+        The "date" column is returned as datetime64.
+        """
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("date >= ?")
+            params.append(pd.Timestamp(start).strftime("%Y-%m-%d"))
+        if end is not None:
+            clauses.append("date <= ?")
+            params.append(pd.Timestamp(end).strftime("%Y-%m-%d"))
+        for column, values in (("item", items), ("channel", channels),
+                               ("market", markets), ("day", days)):
+            if values is not None:
+                values = [values] if isinstance(values, str) else list(values)
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+
+        sql = f"SELECT {', '.join(TIDY_COLUMNS)} FROM prices"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY date, item, channel, market, day"
+
+        df = pd.read_sql_query(sql, self.connection, params=params)
+        df["date"] = pd.to_datetime(df["date"])
+        return df
+
+    def dates(self):
+        """Sorted list of the dates ("YYYY-MM-DD") the store has prices for."""
+        rows = self.connection.execute("SELECT DISTINCT date FROM prices ORDER BY date")
+        return [date for (date,) in rows]
+
+    def latest_date(self):
+        """The most recent date in the store, or None when it is empty."""
+        return self.connection.execute("SELECT MAX(date) FROM prices").fetchone()[0]
+
+    # Lifecycle
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,49 @@
+import asyncio
+import os
+import tempfile
+import threading
+
+from rice_price_collector.cli import main
+
+
+def test_cli_download_from_fake_server(capsys):
+    from rice_price_collector.downloader.fake_server import FakeCBSLServer
+
+    server = FakeCBSLServer(reports_per_year=12, page_size=5)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        asyncio.run_coroutine_threadsafe(server.start(), loop).result(timeout=10)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            status = main(["download", "2024", "--raw-dir", tmpdir, "--base-url", server.base_url,
+                           "--concurrency", "4", "--listing-rate", "100"])
+            assert status == 0
+            assert len(os.listdir(os.path.join(tmpdir, "2024"))) == 12
+    finally:
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result(timeout=10)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=10)
+    assert "12 reports found, 12 downloaded" in capsys.readouterr().out
+
+
+def test_cli_parse_writes_format_and_resumes_incrementally(capsys):
+    from benchmarks.pdf_corpus import make_pdf_corpus
+    from rice_price_collector import PriceStore
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        raw, out = os.path.join(tmpdir, "raw"), os.path.join(tmpdir, "out")
+        make_pdf_corpus(raw, years=(2024,), reports_per_year=3)
+        args = ["parse", "--raw-dir", raw, "--output-dir", out, "--workers", "1",
+                "--format", "sqlite", "--incremental"]
+
+        assert main(args) == 0
+        assert "3 reports parsed (0 from cache, 0 failed)" in capsys.readouterr().out
+        with PriceStore(os.path.join(out, "rice_prices.sqlite")) as store:
+            assert store.dates() == ["2024-01-01", "2024-01-02", "2024-01-03"]
+
+        # Nothing new to parse the second time
+        assert main(args) == 0
+        assert "0 reports parsed" in capsys.readouterr().out
+
+        assert main(["parse", "--raw-dir", os.path.join(tmpdir, "missing")]) == 1
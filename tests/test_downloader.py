@@ -4,15 +4,251 @@ import os
 import asyncio
 import pytest
 from rice_price_collector import download_pdfs_to
+from rice_price_collector.downloader.fake_server import FakeCBSLServer
+from rice_price_collector.downloader.transport import AiohttpTransport
 
-@pytest.mark.asyncio
-async def test_download_pdfs_to_creates_files():
+
+async def download_from_fake_server(server, years, outputdir, **kwargs):
+    async with server:
+        async with AiohttpTransport(server.base_url) as transport:
+            await download_pdfs_to(years, outputdir, transport=transport, **kwargs)
+
+
+def test_download_pdfs_to_creates_files():
     # Use a temporary directory for output
     with tempfile.TemporaryDirectory() as tmpdir:
         years = [2024]  # Use a single year for a quick test
-        await download_pdfs_to(years, tmpdir)
+        server = FakeCBSLServer(reports_per_year=12, page_size=5)
+        asyncio.run(download_from_fake_server(server, years, tmpdir))
         # Check that a subdirectory for the year exists and contains files
         year_dir = os.path.join(tmpdir, "2024")
         assert os.path.isdir(year_dir), f"Year directory {year_dir} not created"
         files = os.listdir(year_dir)
         assert any(f.endswith(".pdf") for f in files), "No PDF files downloaded"
+        assert len(files) == 12
+        assert server.stats["pdf"] == 12
+
+
+def test_incremental_download_stops_at_known_reports():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        first = FakeCBSLServer(reports_per_year=12, page_size=5)
+        asyncio.run(download_from_fake_server(first, [2024], tmpdir, incremental=True))
+        assert len(os.listdir(os.path.join(tmpdir, "2024"))) == 12
+
+        # Two new reports were published since: only page 0 needs to be read
+        later = FakeCBSLServer(reports_per_year=14, page_size=5, port=first.port)
+        asyncio.run(download_from_fake_server(later, [2024], tmpdir, incremental=True))
+        assert later.stats["pdf"] == 2
+        assert later.stats["listing"] < first.stats["listing"]
+        assert len(os.listdir(os.path.join(tmpdir, "2024"))) == 14
+
+
+def test_manifest_hashing_runs_off_the_event_loop(monkeypatch):
+    import threading
+    from rice_price_collector.manifest import Manifest
+
+    threads = []
+    record_download = Manifest.record_download
+
+    def recording(self, *args, **kwargs):
+        threads.append(threading.current_thread())
+        return record_download(self, *args, **kwargs)
+
+    monkeypatch.setattr(Manifest, "record_download", recording)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server = FakeCBSLServer(reports_per_year=3, page_size=5)
+        asyncio.run(download_from_fake_server(server, [2024], tmpdir, incremental=True))
+
+    assert len(threads) == 3
+    assert threading.main_thread() not in threads
+
+
+def test_run_download_pipelines_pages_and_downloads(monkeypatch):
+    from datetime import datetime
+    from pathlib import Path
+    from rice_price_collector.downloader import DownloadJob, pdf_downloader
+    from rice_price_collector.downloader.config import YEAR_IDS
+
+    events = []
+    in_flight = {"now": 0, "max": 0}
+
+    async def fake_fetch_page(session, page_num, year_id, controller=None):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        events.append(("page", year_id, page_num))
+        if page_num >= 4:
+            return []
+        day = datetime(2000 + int(year_id), 1, page_num + 1)
+        return [(day, f"https://example.org/{year_id}/{page_num}.pdf")]
+
+    async def fake_download_pdf(session, date_obj, url, output_dir, controller=None):
+        events.append(("download", url))
+        return None, "failed"
+
+    async def fake_resolve_year_ids(session, cache_path, years=None, controller=None):
+        return YEAR_IDS
+
+    monkeypatch.setattr(pdf_downloader, "resolve_year_ids", fake_resolve_year_ids)
+    monkeypatch.setattr(pdf_downloader, "fetch_page", fake_fetch_page)
+    monkeypatch.setattr(pdf_downloader, "_download_pdf", fake_download_pdf)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        job = DownloadJob(years=[2024, 2025], output_dir=tmpdir, listing_rate=None)
+        asyncio.run(pdf_downloader.run_download(job, transport=object()))
+
+    downloads = [e for e in events if e[0] == "download"]
+    assert len(downloads) == 8
+    # Downloads start while later listing pages are still being fetched
+    assert events.index(("download", "https://example.org/88/0.pdf")) < events.index(("page", "88", 4))
+    # Both years are crawled at once, never more than the lookahead per year
+    assert 2 * pdf_downloader.PAGE_LOOKAHEAD >= in_flight["max"] > pdf_downloader.PAGE_LOOKAHEAD
+
+
+def test_download_pdf_resumes_partial_file_and_validates():
+    from datetime import datetime
+    from rice_price_collector.downloader.pdf_downloader import download_pdf
+
+    body = b"%PDF-1.4\n" + b"x" * 5000 + b"\n%%EOF\n"
+    requested_ranges = []
+
+    class FakeContent:
+        def __init__(self, data):
+            self.data = data
+
+        async def iter_chunked(self, size):
+            for i in range(0, len(self.data), size):
+                yield self.data[i:i + size]
+
+    class FakeResponse:
+        def __init__(self, status, data):
+            self.status = status
+            self.headers = {}
+            self.content = FakeContent(data)
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    class FakeSession:
+        def get(self, url, headers=None):
+            byte_range = (headers or {}).get("Range")
+            requested_ranges.append(byte_range)
+            if byte_range:
+                start = int(byte_range.split("=")[1].rstrip("-"))
+                return FakeResponse(206, body[start:])
+            return FakeResponse(200, body)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        date = datetime(2024, 1, 2)
+        # An interrupted earlier run left the first 1000 bytes behind
+        with open(os.path.join(tmpdir, "2024-01-02.pdf.part"), "wb") as f:
+            f.write(body[:1000])
+
+        path = asyncio.run(download_pdf(FakeSession(), date, "https://example.org/a.pdf", tmpdir))
+        assert path == os.path.join(tmpdir, "2024-01-02.pdf")
+        assert requested_ranges == ["bytes=1000-"]
+        with open(path, "rb") as f:
+            assert f.read() == body
+        assert not os.path.exists(path + ".part")
+
+        # A truncated file in the archive is downloaded again from scratch
+        with open(path, "wb") as f:
+            f.write(body[:2000])
+        assert asyncio.run(download_pdf(FakeSession(), date, "https://example.org/a.pdf", tmpdir)) == path
+        assert requested_ranges[-1] is None
+        with open(path, "rb") as f:
+            assert f.read() == body
+
+
+def test_download_retries_server_errors_and_throttling():
+    from rice_price_collector.downloader import DownloadJob, run_download
+    from rice_price_collector.downloader.controller import DownloadController
+
+    async def run(server, outputdir, controller):
+        async with server:
+            async with AiohttpTransport(server.base_url) as transport:
+                return await run_download(
+                    DownloadJob(years=[2024], output_dir=outputdir), transport, controller
+                )
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Every URL fails twice, and bursts above 50 requests/s get 429 + Retry-After
+        server = FakeCBSLServer(reports_per_year=12, page_size=5, fail_first=2,
+                                max_rate=50, retry_after=0.05)
+        controller = DownloadController(listing_rate=None, base_delay=0.01, max_delay=0.05)
+        report = asyncio.run(run(server, tmpdir, controller))
+
+        assert report.ok and report.downloaded == 12
+        assert len(os.listdir(os.path.join(tmpdir, "2024"))) == 12
+        assert server.stats["status_500"] > 0
+        assert controller.retries >= server.stats["status_500"]
+
+
+def test_adaptive_concurrency_is_aimd():
+    from rice_price_collector.downloader.controller import AdaptiveConcurrency
+
+    limiter = AdaptiveConcurrency(initial=4, minimum=1, maximum=6, cooldown=0)
+    for _ in range(4):
+        limiter.record(ok=True, latency=0.1)
+    assert 4.9 < limiter.limit < 5.1  # about +1 per round of requests
+    limiter.record(ok=False)
+    assert limiter.limit < 2.6  # halved
+    limiter.record(ok=True, latency=1.0)  # 10x slower than the best: congestion
+    assert limiter.limit < 1.3
+    for _ in range(100):
+        limiter.record(ok=True, latency=0.1)
+    assert limiter.limit == 6
+
+
+def test_downloader_client_reuses_connections_across_runs():
+    from rice_price_collector.downloader import DownloaderClient
+
+    async def two_runs(server, first_dir, second_dir):
+        async with server:
+            async with DownloaderClient(server.base_url, limit_per_host=4) as client:
+                await download_pdfs_to([2024], first_dir, transport=client)
+                created = client.pool_stats()["connections_created"]
+                await download_pdfs_to([2024], second_dir, transport=client)
+                return created, client.pool_stats()
+
+    with tempfile.TemporaryDirectory() as first_dir, tempfile.TemporaryDirectory() as second_dir:
+        server = FakeCBSLServer(reports_per_year=12, page_size=5)
+        created, stats = asyncio.run(two_runs(server, first_dir, second_dir))
+
+    assert stats["requests"] == server.stats["requests"]
+    assert 0 < created <= 4
+    # The second run rides on the first run's keep-alive connections
+    assert stats["connections_created"] == created
+    assert stats["connections_reused"] > 0
+
+
+def test_run_download_discovers_and_caches_year_ids():
+    import json
+    from rice_price_collector.downloader import DownloadJob, DownloaderClient, run_download
+
+    async def run(server, job):
+        async with server:
+            async with DownloaderClient(server.base_url) as client:
+                return await run_download(job, client)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # A year the built-in table does not know about
+        server = FakeCBSLServer(year_ids={"89": 2026, "88": 2025}, reports_per_year=3)
+        report = asyncio.run(run(server, DownloadJob(years=[2026, 1999], output_dir=tmpdir)))
+
+        assert [(year.year, year.year_id, year.downloaded) for year in report.years] == [(2026, "89", 3)]
+        assert report.unknown_years == [1999] and not report.ok
+        assert report.pool_stats["requests"] == server.stats["requests"]
+        with open(os.path.join(tmpdir, "year_ids.json")) as f:
+            assert json.load(f)["year_ids"] == {"2025": "88", "2026": "89"}
+
+        # Second run: the cached mapping is used and existing files are skipped
+        server = FakeCBSLServer(year_ids={"89": 2026, "88": 2025}, reports_per_year=3)
+        report = asyncio.run(run(server, DownloadJob(years=[2026], output_dir=tmpdir)))
+        assert report.ok and report.skipped == 3 and report.downloaded == 0
+        # No year list request; page 0 plus at most one page of lookahead past the end
+        assert server.stats["listing"] <= 2
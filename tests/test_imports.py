@@ -0,0 +1,30 @@
+import os
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+PROBE = """
+import sys
+import rice_price_collector
+import rice_price_collector.parser
+import rice_price_collector.downloader
+heavy = [m for m in ("pandas", "pdfplumber", "aiohttp", "bs4") if m in sys.modules]
+assert not heavy, heavy
+
+from rice_price_collector import process_year_folders_dict
+assert "pandas" in sys.modules
+from rice_price_collector.downloader import DownloadJob
+assert "DownloadJob" in dir(rice_price_collector.downloader)
+"""
+
+
+def test_package_import_is_lazy_and_side_effect_free():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pythonpath = str(REPO_ROOT) + os.pathsep + os.environ.get("PYTHONPATH", "")
+        env = dict(os.environ, PYTHONPATH=pythonpath)
+        subprocess.run([sys.executable, "-c", PROBE], cwd=tmpdir, env=env, check=True)
+        # Importing the package no longer creates data/ in the working directory
+        assert os.listdir(tmpdir) == []
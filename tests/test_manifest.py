@@ -0,0 +1,30 @@
+import tempfile
+import os
+from rice_price_collector.manifest import Manifest
+
+
+def test_manifest_tracks_downloads_and_parse_status():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        year_dir = os.path.join(tmpdir, "2024")
+        os.makedirs(year_dir)
+        pdf_path = os.path.join(year_dir, "2024-01-02.pdf")
+        with open(pdf_path, "wb") as f:
+            f.write(b"%PDF-1.4\n%Fake PDF content\n")
+
+        manifest = Manifest.for_raw_dir(tmpdir)
+        manifest.record_download(pdf_path, url="https://example.org/a.pdf", date="2024-01-02")
+        assert manifest.needs_parse(pdf_path)
+        manifest.record_parse(pdf_path, "parsed", rows=12)
+        manifest.save()
+
+        # Reloaded from disk, keyed by the path relative to the raw folder
+        reloaded = Manifest.for_raw_dir(tmpdir)
+        assert reloaded.known_urls() == {"https://example.org/a.pdf"}
+        assert not reloaded.needs_parse(pdf_path)
+        assert reloaded.reports["2024/2024-01-02.pdf"]["rows"] == 12
+
+        # A re-downloaded file with different content must be parsed again
+        with open(pdf_path, "ab") as f:
+            f.write(b"%%EOF\n")
+        reloaded.record_download(pdf_path)
+        assert reloaded.needs_parse(pdf_path)
@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+
+from rice_price_collector import metrics, process_year_folders_dict
+
+
+def test_parse_run_metrics_reach_sinks_from_worker_processes(monkeypatch):
+    from benchmarks.pdf_corpus import make_pdf_corpus
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        folders = make_pdf_corpus(os.path.join(tmpdir, "raw"), years=(2024,), reports_per_year=3)
+        with open(os.path.join(folders["2024"], "2024-02-01.pdf"), "wb") as f:
+            f.write(b"not a pdf")
+
+        jsonl_path = os.path.join(tmpdir, "metrics.jsonl")
+        prom_path = os.path.join(tmpdir, "rice.prom")
+        profile_dir = os.path.join(tmpdir, "profiles")
+        monkeypatch.setenv(metrics.PROFILE_ENV, profile_dir)
+        metrics.reset()
+        metrics.configure([metrics.JsonLinesSink(jsonl_path), metrics.PrometheusTextfileSink(prom_path)])
+
+        cwd = os.getcwd()
+        os.chdir(tmpdir)
+        try:
+            df = process_year_folders_dict(folders, workers=2)
+        finally:
+            os.chdir(cwd)
+            metrics.configure(None)
+
+        with open(jsonl_path) as f:
+            record = json.loads(f.read().splitlines()[-1])
+        with open(prom_path) as f:
+            prom = f.read()
+        profiles = sorted(os.listdir(profile_dir))
+
+    counters = record["counters"]
+    assert counters["pdfs_parsed"] == 3
+    assert counters["pdfs_parse_failed"] == 1
+    assert counters["rows_emitted"] == len(df)
+    # Stage timers recorded inside the workers were merged into the parent
+    assert record["timers"]["build_lines"]["count"] == 3
+    assert record["timers"]["parse_pdf"]["count"] == 4
+    assert "parse_run" in record["timers"]
+
+    assert f"rice_price_collector_rows_emitted_total {len(df)}" in prom
+    assert 'rice_price_collector_stage_seconds_count{stage="parse_pdf"} 4' in prom
+    assert profiles == [f"{stem}.prof" for stem in ("2024-01-01", "2024-01-02", "2024-01-03", "2024-02-01")]
+
+
+def test_sinks_from_env_and_collect_scope():
+    sinks = metrics.sinks_from_env("log, jsonl:/tmp/m.jsonl,prometheus:/tmp/r.prom")
+    assert [type(s).__name__ for s in sinks] == ["LoggingSink", "JsonLinesSink", "PrometheusTextfileSink"]
+    assert metrics.sinks_from_env("") == []
+
+    metrics.reset()
+    with metrics.collect() as recorded:
+        metrics.incr("pages_fetched", 2)
+    assert recorded.snapshot()["counters"] == {"pages_fetched": 2}
+    assert "pages_fetched" not in metrics.snapshot()["counters"]
@@ -17,3 +17,518 @@ def test_process_year_folders_dict_returns_dataframe():
         df = process_year_folders_dict(folders)
         # Accept DataFrame or None (if parser can't handle dummy PDF)
         assert df is None or isinstance(df, pd.DataFrame), "Output is not a DataFrame or None"
+
+
+def test_process_year_folders_dict_parallel_tolerates_bad_files():
+    # A broken PDF in a worker process must not abort the other files or years
+    from benchmarks.pdf_corpus import make_pdf_corpus
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        folders = make_pdf_corpus(os.path.join(tmpdir, "raw"), years=(2023, 2024), reports_per_year=3)
+        for year_dir in folders.values():
+            with open(os.path.join(year_dir, f"{os.path.basename(year_dir)}-01-02.pdf"), "wb") as f:
+                f.write(b"%PDF-1.4\n%Fake PDF content\n")
+        serial = process_year_folders_dict(folders, output_dir=tmpdir, workers=1)
+        parallel = process_year_folders_dict(folders, output_dir=tmpdir, workers=2)
+
+    dates = ["2023-01-03", "2023-01-04", "2024-01-01", "2024-01-03"]
+    assert sorted(parallel["date"].unique()) == dates
+    assert parallel["date"].is_monotonic_increasing
+    pd.testing.assert_frame_equal(parallel, serial)
+
+
+def test_parse_cache_roundtrip_and_invalidate():
+    from rice_price_collector.parser import ParseCache
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pdf_path = os.path.join(tmpdir, "2024-01-01.pdf")
+        with open(pdf_path, "wb") as f:
+            f.write(b"%PDF-1.4\n%Fake PDF content\n")
+        cache = ParseCache(os.path.join(tmpdir, "cache"))
+        df = pd.DataFrame({"item": ["Samba"], "unit": ["Rs./kg"], "price": [130.0]})
+
+        assert cache.get(pdf_path, page_number=2) is None
+        cache.put(pdf_path, df, page_number=2)
+        pd.testing.assert_frame_equal(cache.get(pdf_path, page_number=2), df)
+        # Different extraction arguments are a different entry
+        assert cache.get(pdf_path, page_number=3) is None
+
+        assert cache.invalidate(pdf_path, page_number=2) == 1
+        assert cache.get(pdf_path, page_number=2) is None
+
+
+def test_parse_cache_hashes_each_pdf_at_most_once(monkeypatch):
+    from benchmarks.pdf_corpus import make_pdf_corpus
+    from rice_price_collector.manifest import Manifest
+    from rice_price_collector.parser import ParseCache, cache as cache_module
+
+    hashed = []
+    file_sha256 = cache_module.file_sha256
+
+    def counting_sha256(path):
+        hashed.append(os.path.basename(path))
+        return file_sha256(path)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        raw = os.path.join(tmpdir, "raw")
+        folders = make_pdf_corpus(raw, years=(2024,), reports_per_year=2)
+        names = sorted(os.listdir(folders["2024"]))
+        manifest = Manifest.for_raw_dir(raw)
+        manifest.record_download(os.path.join(folders["2024"], names[0]))
+        manifest.save()
+        cache = ParseCache(os.path.join(tmpdir, "cache"))
+
+        monkeypatch.setattr(cache_module, "file_sha256", counting_sha256)
+        # A miss looks up and stores under one hash; the downloaded report's
+        # hash comes from the manifest
+        process_year_folders_dict(folders, output_dir=tmpdir, cache=cache, incremental=True)
+        assert hashed == [names[1]]
+
+        hashed.clear()
+        df = process_year_folders_dict(folders, output_dir=os.path.join(tmpdir, "full"), cache=cache)
+        assert hashed == names
+        assert df is not None and not df.empty
+
+
+def test_extract_sections_reads_page_once(monkeypatch):
+    import pypdfium2 as pdfium
+    from benchmarks.pdf_corpus import build_pdf
+    from rice_price_collector.parser import pages, sections
+
+    page = [(50, 800, "R I C E"), (50, 790, "Samba"), (110, 790, "Rs./kg"), (150, 790, "130.00"),
+            (190, 790, "132.00"), (50, 780, "F I S H"), (50, 770, "Kelawalla"), (110, 770, "Rs./kg"),
+            (150, 770, "1,250.00"), (190, 770, "1,300.00")]
+    opened, probed = [], []
+    document, text = pdfium.PdfDocument, pages.OpenPdf.text
+
+    def counting_document(*args, **kwargs):
+        opened.append(args[0])
+        return document(*args, **kwargs)
+
+    def counting_text(self, index):
+        if index not in self._texts:
+            probed.append(index)
+        return text(self, index)
+
+    monkeypatch.setattr(pdfium, "PdfDocument", counting_document)
+    monkeypatch.setattr(pages.OpenPdf, "text", counting_text)
+    fish = sections.Section("FISH", "FISH", None, sections.parse_price_section)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pdf_path = os.path.join(tmpdir, "report.pdf")
+        with open(pdf_path, "wb") as f:
+            f.write(build_pdf([[(50, 800, "Cover")], page]))
+        found = sections.extract_sections(pdf_path, ["RICE", fish])
+
+    # One open to locate both sections and read their page; each page probed once
+    assert opened == [pdf_path]
+    assert sorted(probed) == sorted(set(probed))
+    assert found == {
+        "RICE": ["SambaRs./kg130.00132.00"],
+        "FISH": ["KelawallaRs./kg1,250.001,300.00"],
+    }
+
+
+def test_section_engine_parses_rice_like_extract_and_parse_rice():
+    from benchmarks.pdf_corpus import make_pdf_corpus
+    from rice_price_collector.parser import extract_and_parse_sections
+    from rice_price_collector.parser.extractors.rice import extract_and_parse_rice
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Seed 0 gives reports of both the 10- and the 8-column layout
+        folders = make_pdf_corpus(tmpdir, years=(2024,), reports_per_year=8)
+        widths = set()
+        for name in sorted(os.listdir(folders["2024"])):
+            pdf_path = os.path.join(folders["2024"], name)
+            expected = extract_and_parse_rice(pdf_path)
+            pd.testing.assert_frame_equal(extract_and_parse_sections(pdf_path, ["RICE"])["RICE"], expected)
+            widths.add(expected.attrs["price_columns"])
+    assert widths == {8, 10}
+
+
+def test_build_lines_sorts_by_x_and_clusters_by_tolerance():
+    from rice_price_collector.parser.utils import build_lines, find_line_y
+
+    def char(text, x0, top):
+        return {"text": text, "x0": x0, "top": top}
+
+    # Out of order on x, and straddling a 10pt bucket boundary (14.9 vs 15.2)
+    chars = [
+        char("C", 30, 14.9), char("R", 10, 15.2), char("E", 40, 15.0), char("I", 20, 14.9),
+        char("b", 20, 30.0), char("a", 10, 30.1),
+    ]
+    lines = build_lines(chars)
+    assert [text for _, text in lines] == ["RICE", "ab"]
+    assert find_line_y(lines, "R I C E") == lines[0][0]
+    assert find_line_y(lines, "FISH") is None
+
+
+def test_tokenize_line_emits_float_prices():
+    from rice_price_collector.parser.tokenizer import tokenize_line
+
+    assert tokenize_line("Kekulu (White)Rs./kg1,250.00130.00n.a.132.5") == (
+        "Kekulu (White)",
+        "Rs./kg",
+        [1250.0, 130.0, None, 132.5],
+    )
+    assert tokenize_line("Wholesale Retail") is None
+
+
+def test_write_csv_stream_aligns_report_columns():
+    from rice_price_collector.parser import write_csv_stream
+
+    frames = iter([
+        pd.DataFrame({"date": ["2024-01-01"], "item": ["Samba"], "price": [130.0]}),
+        pd.DataFrame({"date": ["2024-01-02"], "item": ["Nadu"]}),
+    ])
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "rice.csv")
+        assert write_csv_stream(frames, path) == 2
+        df = pd.read_csv(path)
+        assert list(df.columns) == ["date", "item", "price"]
+        assert df["item"].tolist() == ["Samba", "Nadu"]
+        assert pd.isna(df.loc[1, "price"])
+
+
+def test_parquet_dataset_appends_without_touching_other_months():
+    from rice_price_collector.parser import read_parquet_dataset, write_parquet_dataset
+
+    def report(date, price):
+        return pd.DataFrame({
+            "date": [date, date], "item": ["Samba", "Nadu"], "unit": ["Rs./kg", "Rs./kg"],
+            "price": [price, price + 1],
+        })
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = os.path.join(tmpdir, "rice_prices")
+        write_parquet_dataset([report("2024-01-30", 130.0), report("2024-02-01", 131.0)], root)
+        january = os.path.join(root, "year=2024", "month=01")
+        january_files = {f: os.path.getmtime(os.path.join(january, f)) for f in os.listdir(january)}
+
+        # A new February day plus a re-written one: January's files stay as they are
+        write_parquet_dataset([report("2024-02-01", 140.0), report("2024-02-02", 141.0)], root)
+        assert {f: os.path.getmtime(os.path.join(january, f)) for f in os.listdir(january)} == january_files
+
+        df = read_parquet_dataset(root)
+        assert len(df) == 6
+        assert [str(d) for d in df["date"].unique()] == ["2024-01-30", "2024-02-01", "2024-02-02"]
+        assert df.loc[df["date"].astype(str) == "2024-02-01", "price"].tolist() == [140.0, 141.0]
+        assert df["item"].dtype == "category" and df["unit"].dtype == "category"
+        assert df["price"].dtype == "float32"
+
+
+def test_generated_report_pdfs_parse_end_to_end():
+    from benchmarks.pdf_corpus import make_pdf_corpus
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        folders = make_pdf_corpus(os.path.join(tmpdir, "raw"), years=(2024,), reports_per_year=3)
+        output_dir = os.path.join(tmpdir, "data", "processed")
+        df = process_year_folders_dict(folders, output_dir=output_dir)
+        assert os.path.exists(os.path.join(output_dir, "rice_prices_2024.csv"))
+
+    assert sorted(df["date"].unique()) == ["2024-01-01", "2024-01-02", "2024-01-03"]
+    assert {"item", "unit", "wholesale_pettah_today", "retail_narahenpita_today"} <= set(df.columns)
+    assert df["retail_narahenpita_today"].notna().any()
+
+
+def test_extract_section_finds_shifted_and_spilled_sections():
+    from benchmarks.pdf_corpus import build_pdf
+    from rice_price_collector.parser import extract_section_between, pages
+
+    cover = [(50, 800, "Central Bank of Sri Lanka")]
+    rice_page = [(50, 800, "R I C E"), (50, 780, "Samba"), (110, 780, "Rs./kg"), (150, 780, "230.00"),
+                 (50, 760, "F I S H"), (50, 740, "Kelawalla"), (110, 740, "Rs./kg"), (150, 740, "1,250.00")]
+    spilled_start = [(50, 800, "R I C E"), (50, 780, "Samba"), (110, 780, "Rs./kg"), (150, 780, "230.00")]
+    spilled_end = [(50, 800, "Nadu"), (110, 800, "Rs./kg"), (150, 800, "210.00"), (50, 780, "F I S H")]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        shifted = os.path.join(tmpdir, "shifted.pdf")
+        spilled = os.path.join(tmpdir, "spilled.pdf")
+        with open(shifted, "wb") as f:
+            f.write(build_pdf([cover, cover, rice_page]))
+        with open(spilled, "wb") as f:
+            f.write(build_pdf([cover, spilled_start, spilled_end]))
+
+        pages._layout_cache.clear()
+        assert pages.locate_section_pages(shifted, "RICE", "FISH") == [3]
+        assert extract_section_between(shifted, "RICE", "FISH", 2) == ["SambaRs./kg230.00"]
+        assert pages.locate_section_pages(spilled, "RICE", "FISH") == [2, 3]
+        assert extract_section_between(spilled, "RICE", "FISH", 2) == [
+            "SambaRs./kg230.00", "NaduRs./kg210.00",
+        ]
+
+
+def test_default_extraction_opens_pdf_and_builds_text_page_once(monkeypatch):
+    import pypdfium2 as pdfium
+    from benchmarks.pdf_corpus import make_pdf_corpus
+    from rice_price_collector.parser import pages
+    from rice_price_collector.parser.extractors.rice import extract_and_parse_rice
+
+    opened, textpages = [], []
+    document, get_textpage = pdfium.PdfDocument, pdfium.PdfPage.get_textpage
+
+    def counting_document(*args, **kwargs):
+        opened.append(args[0])
+        return document(*args, **kwargs)
+
+    def counting_textpage(page):
+        textpages.append(page)
+        return get_textpage(page)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        folders = make_pdf_corpus(tmpdir, years=(2024,), reports_per_year=1)
+        pdf_path = os.path.join(folders["2024"], "2024-01-01.pdf")
+        pages._layout_cache.clear()
+        monkeypatch.setattr(pdfium, "PdfDocument", counting_document)
+        monkeypatch.setattr(pdfium.PdfPage, "get_textpage", counting_textpage)
+        df = extract_and_parse_rice(pdf_path)
+
+    # Page 2 is probed for the headers, then its chars are read from the same text page
+    assert not df.empty
+    assert opened == [pdf_path]
+    assert len(textpages) == 1
+
+
+def test_fast_backend_matches_pdfplumber_and_falls_back_per_file():
+    from benchmarks.pdf_corpus import PAGE_TOP, make_pdf_corpus
+    from rice_price_collector import metrics
+    from rice_price_collector.parser.backends import PageChars, get_backend
+    from rice_price_collector.parser.extractors.rice import extract_and_parse_rice
+
+    class MisreadingBackend:
+        """Loses the retail prices below the market header, as a broken fast path might."""
+
+        name = "misreading"
+
+        def read_pages(self, pdf_path, page_nums):
+            pages = get_backend("pdfium").read_pages(pdf_path, page_nums)
+            header_bottom = 842 - PAGE_TOP + 20
+            kept = [(p.x0s < 380) | (p.tops < header_bottom) for p in pages]
+            return [
+                PageChars(p.tops[keep], p.x0s[keep], [t for t, k in zip(p.texts, keep) if k])
+                for p, keep in zip(pages, kept)
+            ]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        folders = make_pdf_corpus(tmpdir, years=(2024,), reports_per_year=3)
+        pdf_files = sorted(os.path.join(folders["2024"], name) for name in os.listdir(folders["2024"]))
+
+        for pdf_path in pdf_files:
+            fast = extract_and_parse_rice(pdf_path, backends=("pdfium",))
+            slow = extract_and_parse_rice(pdf_path, backends=("pdfplumber",))
+            pd.testing.assert_frame_equal(fast, slow)
+
+        with metrics.collect() as recorded:
+            df = extract_and_parse_rice(pdf_files[0], backends=(MisreadingBackend(), "pdfplumber"))
+        pd.testing.assert_frame_equal(df, extract_and_parse_rice(pdf_files[0]))
+
+    assert recorded.snapshot()["counters"] == {"extraction_fallbacks": 1, "extracted_with_pdfplumber": 1}
+
+
+def test_to_tidy_melts_and_drops_repeated_yesterday_prices():
+    from rice_price_collector.parser import to_tidy
+
+    def report(date, samba_today, samba_yesterday):
+        return pd.DataFrame({
+            "date": [date, date],
+            "item": ["Samba", "Nadu"],
+            "unit": ["Rs./kg", "Rs./kg"],
+            "wholesale_pettah_yesterday": [samba_yesterday, 200.0],
+            "wholesale_pettah_today": [samba_today, None],
+            "retail_dambulla_today": [samba_today + 20, 220.0],
+        })
+
+    wide = pd.concat([
+        report("2024-01-02", 230.0, 229.0),
+        report("2024-01-03", 231.0, 230.0),  # yesterday repeats 2024-01-02's today
+        report("2024-01-04", 232.0, 230.5),  # yesterday was revised
+    ], ignore_index=True)
+
+    tidy = to_tidy(wide)
+    assert list(tidy.columns) == ["date", "item", "unit", "channel", "market", "day", "price"]
+    assert all(str(tidy[col].dtype) == "category" for col in ("item", "unit", "channel", "market", "day"))
+
+    samba_yesterday = tidy[(tidy["item"] == "Samba") & (tidy["day"] == "yesterday")]
+    assert samba_yesterday["price"].tolist() == [229.0, 230.5]
+    # Nadu never had a wholesale "today" price, so its yesterday prices all stay
+    assert len(tidy[(tidy["item"] == "Nadu") & (tidy["day"] == "yesterday")]) == 3
+    assert len(to_tidy(wide, dedupe=False)) == len(tidy) + 1
+
+
+def test_header_layout_detection_labels_and_caches_columns(capsys):
+    from rice_price_collector import metrics
+    from rice_price_collector.parser import columns
+    from rice_price_collector.parser.extractors.rice import parse_rice_section
+
+    columns._layout_cache.clear()
+    default = ["Wholesale PricesRetail Prices", "PettahMarandagahamulaPettahDambullaNarahenpita"]
+    without = ["Daily Prices 02.01.2024", "Wholesale PricesRetail Prices",
+               "PettahPettahDambullaNarahenpita"]
+    added = ["Wholesale PricesRetail Prices", "PettahDambullaPettahDambullaNarahenpita"]
+
+    assert columns.create_smart_column_names([], default) == columns.DEFAULT_LAYOUT.columns
+    # Without a header, the default layout is assumed
+    assert columns.create_smart_column_names(["SambaRs./kg230.00"]) == columns.DEFAULT_LAYOUT.columns
+
+    with metrics.collect() as recorded:
+        layout = columns.detect_layout(without)
+        # Another report of the same layout (a different date) reuses the cached schema
+        assert columns.detect_layout(["Daily Prices 03.01.2024"] + without[1:]) is layout
+        assert columns.detect_layout(added).retail == ("pettah", "dambulla", "narahenpita")
+        assert columns.detect_layout(added).wholesale == ("pettah", "dambulla")
+    assert layout.wholesale == ("pettah",)
+    assert recorded.snapshot()["counters"] == {"layouts_detected": 2}
+    assert capsys.readouterr().out.count("New report layout") == 2
+
+    df = parse_rice_section(["SambaRs./kg100.00101.00102.00103.00104.00105.00106.00107.00"], without)
+    assert list(df.columns) == columns.DEFAULT_LAYOUT.columns
+    row = df.iloc[0]
+    assert row["retail_pettah_yesterday"] == 102.0 and row["retail_narahenpita_today"] == 107.0
+    assert pd.isna(row["wholesale_marandagahamula_today"])
+
+    # More prices than the layout has markets for: kept and flagged, not truncated
+    with metrics.collect() as recorded:
+        df = parse_rice_section(
+            ["SambaRs./kg" + "".join(f"{100 + i}.00" for i in range(10))], without,
+        )
+    assert list(df.columns[-2:]) == ["unlabeled_1", "unlabeled_2"]
+    assert recorded.snapshot()["counters"] == {"layout_column_mismatches": 1}
+
+
+def test_layout_fingerprint_ignores_the_dated_page_title():
+    from rice_price_collector import metrics
+    from rice_price_collector.parser import columns
+
+    columns._layout_cache.clear()
+    header = ["Wholesale PricesRetail Prices", "ItemUnitPettahDambullaPettahDambullaNarahenpita"]
+    titles = ["30 July 2025", "29 August 2025", "30 September 2025", "3 October 2025"]
+    with metrics.collect() as recorded:
+        layouts = {
+            columns.detect_layout(
+                [f"Wholesale and Retail Prices: Selected Food Commodities -{title}"] + header,
+                ["Marandagahamula", "SambaRs./kg235.00"],
+            )
+            for title in titles
+        }
+
+    assert len({layout.fingerprint for layout in layouts}) == 1
+    assert recorded.snapshot()["counters"] == {"layouts_detected": 1}
+
+    # The cache keeps the most recently used layouts only
+    for market in ("Pettah", "Dambulla", "Narahenpita") * (columns.MAX_CACHED_LAYOUTS // 3 + 1):
+        header = header + [market]
+        columns.detect_layout(header)
+    assert len(columns._layout_cache) == columns.MAX_CACHED_LAYOUTS
+
+
+def test_rice_markets_come_from_the_real_page_header_and_section_subheader(capsys):
+    from benchmarks.pdf_corpus import PRICE_X, build_pdf
+    from rice_price_collector.parser import columns
+    from rice_price_collector.parser.extractors.rice import extract_and_parse_rice
+
+    def row(y, item, prices):
+        return [(50, y, item), (110, y, "Rs./kg")] + [(PRICE_X[c], y, p) for c, p in enumerate(prices)]
+
+    # Page 2 of 2025-07-30.pdf: the page header names Dambulla as the second
+    # wholesale market; the RICE section's sub-header replaces it with Marandagahamula
+    page = [(50, 820, "Wholesale and Retail Prices: Selected Food Commodities -30 July 2025"),
+            (150, 810, "Wholesale Prices"), (310, 810, "Retail Prices"),
+            (50, 800, "Item"), (110, 800, "Unit"), (150, 800, "Pettah"), (230, 800, "Dambulla"),
+            (310, 800, "Pettah"), (390, 800, "Dambulla"), (470, 800, "Narahenpita")]
+    page += [(x, 790, day) for x in PRICE_X[::2] for day in ["Yesterday"]]
+    page += [(x, 790, "Today") for x in PRICE_X[1::2]]
+    page += [(50, 780, "V E G E T A B L E S")] + row(770, "Beans", [f"{300 + c}.00" for c in range(10)])
+    page += [(50, 760, "R I C E"), (230, 750, "Marandagahamula")]
+    page += row(740, "Samba", ["235.00", "235.00", "234.00", "234.00", "240.00", "240.00",
+                               "245.00", "245.00", "250.00", "250.00"])
+    page += row(730, "Ponni Samba (Imp)", ["230.00", "230.00", "n.a.", "n.a.", "233.00", "233.00",
+                                           "n.a.", "n.a."])
+    page += [(50, 720, "F I S H")]
+
+    columns._layout_cache.clear()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pdf_path = os.path.join(tmpdir, "2025-07-30.pdf")
+        with open(pdf_path, "wb") as f:
+            f.write(build_pdf([[(50, 800, "Central Bank of Sri Lanka")], page]))
+        for backend in ("pdfium", "pdfplumber"):
+            df = extract_and_parse_rice(pdf_path, backends=(backend,)).set_index("item")
+            assert ["item"] + list(df.columns) == columns.DEFAULT_LAYOUT.columns
+            assert df.loc["Samba", "wholesale_marandagahamula_today"] == 234.0
+            assert df.loc["Samba", "retail_dambulla_today"] == 245.0
+            assert df.loc["Ponni Samba (Imp)", "retail_pettah_today"] == 233.0
+
+    # A report of the usual layout is not flagged as a new one
+    assert "New report layout" not in capsys.readouterr().out
+
+
+def test_incremental_csv_append_keeps_rows_under_the_header():
+    import shutil
+    from benchmarks.pdf_corpus import build_pdf, make_pdf_corpus
+
+    xs = [150 + 32 * i for i in range(12)]
+    # A report with a third wholesale market: two more columns than the yearly CSV has
+    page = [(xs[0], 800, "Pettah"), (xs[2], 800, "Dambulla"), (xs[4], 800, "Meegoda"),
+            (xs[6], 800, "Pettah"), (xs[8], 800, "Dambulla"), (xs[10], 800, "Narahenpita"),
+            (50, 780, "R I C E"), (xs[2], 770, "Marandagahamula")]
+    page += [(50, 760, "Samba"), (110, 760, "Rs./kg")]
+    page += [(x, 760, f"{200 + i}.00") for i, x in enumerate(xs)]
+    page += [(50, 750, "F I S H")]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        folders = make_pdf_corpus(os.path.join(tmpdir, "raw"), years=(2024,), reports_per_year=2)
+        year_dir = folders["2024"]
+        output_file = os.path.join(tmpdir, "rice_prices_2024.csv")
+        process_year_folders_dict(folders, output_dir=tmpdir, incremental=True)
+
+        with open(os.path.join(year_dir, "2024-01-03.pdf"), "wb") as f:
+            f.write(build_pdf([[(50, 800, "Cover")], page]))
+        process_year_folders_dict(folders, output_dir=tmpdir, incremental=True)
+        # ...then one of the usual layout again
+        shutil.copy(os.path.join(year_dir, "2024-01-01.pdf"), os.path.join(year_dir, "2024-01-04.pdf"))
+        new_rows = process_year_folders_dict(folders, output_dir=tmpdir, incremental=True)
+
+        df = pd.read_csv(output_file)
+        assert process_year_folders_dict(folders, output_dir=tmpdir, incremental=True) is None
+
+    assert list(df.columns[-2:]) == ["wholesale_meegoda_yesterday", "wholesale_meegoda_today"]
+    assert sorted(df["date"].unique()) == ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"]
+    samba = df[df["date"] == "2024-01-03"].iloc[0]
+    assert samba["wholesale_meegoda_today"] == 205.0 and samba["retail_narahenpita_today"] == 211.0
+    assert df[df["date"] != "2024-01-03"]["wholesale_meegoda_today"].isna().all()
+    appended = df[df["date"] == "2024-01-04"].reset_index(drop=True)
+    pd.testing.assert_frame_equal(appended[list(new_rows.columns)], new_rows, check_dtype=False)
+
+
+def test_prices_are_aligned_to_columns_by_position():
+    from benchmarks.pdf_corpus import PRICE_X, build_pdf
+    from rice_price_collector.parser.extractors.rice import extract_and_parse_rice
+    from rice_price_collector.parser.utils import fix_missing_columns
+
+    def row(y, item, columns):
+        return [(50, y, item), (110, y, "Rs./kg")] + [
+            (PRICE_X[c], y, "1,250.00" if c == 5 else f"{100 + c}.00") for c in columns
+        ]
+
+    header = [(150, 800, "Wholesale Prices"), (310, 800, "Retail Prices"),
+              (150, 790, "Pettah"), (230, 790, "Marandagahamula"), (310, 790, "Pettah"),
+              (390, 790, "Dambulla"), (470, 790, "Narahenpita")]
+    page = header + [(50, 770, "R I C E")]
+    page += row(760, "Samba", range(10)) + row(750, "Nadu", range(10))
+    page += row(740, "Kekulu", [0, 1, 4, 5, 6, 7, 8, 9])  # no Marandagahamula prices
+    page += row(730, "Keeri Samba", [8, 9])  # only retail Narahenpita
+    page += [(50, 720, "F I S H")]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pdf_path = os.path.join(tmpdir, "2024-01-01.pdf")
+        with open(pdf_path, "wb") as f:
+            f.write(build_pdf([page, page]))
+        for backend in ("pdfium", "pdfplumber"):
+            df = extract_and_parse_rice(pdf_path, page_number=1, backends=(backend,)).set_index("item")
+            assert df.loc["Kekulu"].isna().tolist() == [False] + [False] * 2 + [True] * 2 + [False] * 6
+            assert df.loc["Kekulu", "retail_pettah_today"] == 1250.0
+            keeri = df.loc["Keeri Samba"].iloc[1:]
+            assert keeri.notna().tolist() == [False] * 8 + [True] * 2
+            assert keeri["retail_narahenpita_today"] == 109.0
+
+    assert fix_missing_columns([1.0, 2.0, 3.0], total_columns=5, insert_position=2) == [
+        1.0, 2.0, None, None, 3.0,
+    ]
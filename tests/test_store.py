@@ -0,0 +1,79 @@
+import os
+import tempfile
+
+import pandas as pd
+
+from rice_price_collector import PriceStore
+
+
+def _report(date, samba_price):
+    return pd.DataFrame({
+        "date": [date, date],
+        "item": ["Samba", "Nadu"],
+        "unit": ["Rs./kg", "Rs./kg"],
+        "wholesale_pettah_yesterday": [samba_price - 1, 200.0],
+        "wholesale_pettah_today": [samba_price, float("nan")],
+        "retail_dambulla_today": [samba_price + 20, 220.0],
+    })
+
+
+def test_price_store_queries_and_upserts():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "prices.sqlite")
+        with PriceStore(path) as store:
+            assert store.load([_report("2024-01-02", 230.0), _report("2024-02-01", 240.0)]) == 10
+
+            df = store.query(start="2024-01-01", end="2024-01-31", items=["Samba"],
+                             channels="wholesale", markets=["pettah"], days=["today"])
+            assert df["price"].tolist() == [230.0]
+            assert df["date"].tolist() == [pd.Timestamp("2024-01-02")]
+            # The missing Nadu price is not stored
+            assert store.query(items="Nadu", channels="wholesale", days="today").empty
+
+            # Loading a day again replaces its prices instead of duplicating them
+            store.load(_report("2024-02-01", 250.0))
+            assert store.query(start="2024-02-01", items="Samba", markets="dambulla")["price"].tolist() == [270.0]
+            assert len(store.query()) == 10
+
+        with PriceStore(path) as store:
+            assert store.dates() == ["2024-01-02", "2024-02-01"]
+            assert store.latest_date() == "2024-02-01"
+
+
+def test_price_store_dedupes_yesterday_against_stored_reports():
+    first, second = _report("2024-01-02", 230.0), _report("2024-01-03", 231.0)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with PriceStore(os.path.join(tmpdir, "together.sqlite")) as store:
+            store.load([first, second])
+            together = store.query()
+        # One report per run, as the nightly incremental parse loads them
+        with PriceStore(os.path.join(tmpdir, "nightly.sqlite")) as store:
+            store.load(first)
+            assert store.load(second) == 4
+            nightly = store.query()
+
+    pd.testing.assert_frame_equal(nightly, together)
+    # Samba's yesterday price on 2024-01-03 is 2024-01-02's today price: stored once
+    samba = nightly[(nightly["item"] == "Samba") & (nightly["channel"] == "wholesale")]
+    assert sorted(samba["price"]) == [229.0, 230.0, 231.0]
+
+
+def test_batch_extract_loads_sqlite_store():
+    from benchmarks.pdf_corpus import make_pdf_corpus
+    from rice_price_collector import process_year_folders_dict
+    from rice_price_collector.parser import to_tidy
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        folders = make_pdf_corpus(os.path.join(tmpdir, "raw"), years=(2024,), reports_per_year=2)
+        cwd = os.getcwd()
+        os.chdir(tmpdir)
+        try:
+            df = process_year_folders_dict(folders, output_format="sqlite")
+        finally:
+            os.chdir(cwd)
+
+        with PriceStore(os.path.join(tmpdir, "rice_prices.sqlite")) as store:
+            stored = store.query()
+
+    assert len(stored) == len(to_tidy(df))
+    assert sorted(stored["date"].dt.strftime("%Y-%m-%d").unique()) == ["2024-01-01", "2024-01-02"]